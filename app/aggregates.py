@@ -0,0 +1,81 @@
+"""
+Tablas agregadas para la página de análisis de datos
+
+En lugar de enviar al navegador un punto por película, la página dibuja
+tablas precalculadas cuyo tamaño no depende del catálogo:
+
+- Histograma de calificaciones promedio (cubos de 0.25 estrellas).
+- Densidad año × calificación (cubos de YEAR_BIN años y 0.25 estrellas).
+- Número de películas por género.
+- Estadísticas generales (las de calculate_rating_stats).
+
+Las tablas se calculan una vez por huella del dataset y se guardan junto a
+los modelos (ver utils.get_dataset_aggregates).
+"""
+
+import numpy as np
+import pandas as pd
+
+# Versión de las tablas; cambiarla invalida las guardadas
+AGGREGATES_VERSION = 1
+RATING_BIN = 0.25
+RATING_RANGE = (0.0, 5.0)
+YEAR_BIN = 5
+
+
+class DatasetAggregates:
+    """
+    Agregados del catálogo para los gráficos de análisis
+
+    Args:
+        movies_df (pd.DataFrame): DataFrame con year y avg_rating (y opcionalmente rating_count)
+        stats (dict): Estadísticas generales (calculate_rating_stats)
+        genre_counts (pd.Series): Películas por género (get_genre_distribution)
+    """
+
+    def __init__(self, movies_df, stats, genre_counts):
+        self.stats = {key: (value.item() if isinstance(value, np.generic) else value) for key, value in stats.items()}
+        self.genre_counts = genre_counts.copy()
+
+        ratings = movies_df['avg_rating'].to_numpy(dtype=np.float64)
+        if 'rating_count' in movies_df.columns:
+            rated = movies_df['rating_count'].to_numpy() > 0
+        else:
+            rated = ratings > 0
+        self.rated_movies = int(rated.sum())
+
+        rating_edges = np.arange(RATING_RANGE[0], RATING_RANGE[1] + RATING_BIN / 2, RATING_BIN)
+        counts, _ = np.histogram(np.clip(ratings[rated], *RATING_RANGE), bins=rating_edges)
+        self.rating_histogram = pd.DataFrame({
+            'rating': rating_edges[:-1] + RATING_BIN / 2,
+            'count': counts,
+        })
+
+        years = movies_df['year'].to_numpy(dtype=np.float64)
+        has_year = np.isfinite(years)
+        if has_year.any():
+            first = np.floor(years[has_year].min() / YEAR_BIN) * YEAR_BIN
+            last = np.floor(years[has_year].max() / YEAR_BIN) * YEAR_BIN + YEAR_BIN
+            year_edges = np.arange(first, last + YEAR_BIN / 2, YEAR_BIN)
+        else:
+            year_edges = np.array([0.0, YEAR_BIN])
+        density, _, _ = np.histogram2d(
+            years[has_year], np.clip(ratings[has_year], *RATING_RANGE), bins=[year_edges, rating_edges]
+        )
+        self.year_edges = year_edges
+        self.rating_edges = rating_edges
+        # Filas = cubos de años, columnas = cubos de calificación
+        self.year_rating_density = pd.DataFrame(
+            density.astype(np.int64),
+            index=pd.Index(year_edges[:-1].astype(int), name='year'),
+            columns=pd.Index(rating_edges[:-1] + RATING_BIN / 2, name='rating')
+        )
+
+    @property
+    def nbytes(self):
+        """Tamaño aproximado de las tablas (lo que se envía a los gráficos)."""
+        return int(
+            self.rating_histogram.memory_usage(index=False).sum()
+            + self.year_rating_density.to_numpy().nbytes
+            + self.genre_counts.to_numpy().nbytes
+        )
@@ -0,0 +1,602 @@
+"""
+Índice aproximado de vecinos más cercanos (IVF) en NumPy
+
+La búsqueda exacta compara cada consulta con todo el catálogo. El índice
+IVF (*inverted file*) agrupa los vectores con k-means esférico en
+``n_lists`` listas y cada consulta solo recorre las ``n_probe`` listas cuyos
+centroides están más cerca, así que el coste por consulta es del orden de
+``n_probe / n_lists`` del de la búsqueda exacta. Los dos parámetros son el
+compromiso entre exhaustividad (recall) y latencia:
+
+- ``n_lists``: más listas = listas más cortas (por defecto ~4·√N).
+- ``n_probe``: más listas recorridas = más recall y más latencia; se puede
+  cambiar en cada búsqueda sin reconstruir el índice.
+- ``rerank``: si el índice guarda las características originales, se piden
+  ``rerank × K`` candidatos y se reordenan con la similitud exacta.
+
+Los vectores de contenido son dispersos y de 2^18 columnas, así que primero
+se proyectan a ``dim`` dimensiones densas con una proyección aleatoria
+dispersa (``project_features``); los factores de ALS se usan tal cual. La
+proyección pierde precisión, que el reordenamiento exacto recupera.
+
+Uso (tabla de recall@K frente a la búsqueda exacta):
+    python -m app.ann --engine content --probes 1,2,4,8,16,32
+"""
+
+import argparse
+import math
+import os
+import time
+
+import numpy as np
+
+from .neighbors import DEFAULT_BLOCK_BYTES, _block_top_k, l2_normalize_rows
+
+# Versión del formato de to_arrays; cambiarla invalida los índices guardados
+ANN_FORMAT_VERSION = 1
+DEFAULT_N_PROBE = 8
+DEFAULT_DIM = 128
+# Candidatos por vecino pedido que se reordenan con las características exactas
+DEFAULT_RERANK = 4
+# Vectores de entrenamiento por lista (k-means no necesita el catálogo entero)
+TRAIN_POINTS_PER_LIST = 64
+METRICS = ('cosine', 'dot')
+
+
+def default_n_lists(n_items):
+    """Número de listas por defecto: ~4·√N (al menos 1 y como mucho N)."""
+    return int(min(max(1, round(4 * math.sqrt(max(n_items, 1)))), max(n_items, 1)))
+
+
+def project_features(features, dim=DEFAULT_DIM, seed=0, density=4):
+    """
+    Proyectar características dispersas a vectores densos de ``dim`` columnas
+
+    Cada columna original se suma, con signo aleatorio, en ``density``
+    columnas de salida (proyección aleatoria dispersa): los productos
+    escalares se conservan en esperanza y la matriz de proyección ocupa
+    ``n_features × density`` valores. Una matriz densa se devuelve sin
+    proyectar.
+
+    Args:
+        features: Matriz de características (filas = películas)
+        dim (int): Dimensión de salida
+        seed (int): Semilla de la proyección (debe ser la misma para índice y consultas)
+        density (int): Columnas de salida por columna original
+
+    Returns:
+        np.ndarray: Vectores densos (float32) normalizados a norma 1
+    """
+    import scipy.sparse as sp
+
+    if not sp.issparse(features):
+        return l2_normalize_rows(features)
+
+    features = l2_normalize_rows(features)
+    n_features = features.shape[1]
+    rng = np.random.default_rng(seed)
+    columns = rng.integers(0, dim, size=(n_features, density))
+    signs = rng.choice(np.array([-1.0, 1.0], dtype=np.float32), size=(n_features, density))
+    projection = sp.csr_matrix(
+        ((signs / np.sqrt(density)).ravel(), columns.ravel(), np.arange(0, n_features * density + 1, density)),
+        shape=(n_features, dim)
+    )
+    return l2_normalize_rows(np.asarray((features @ projection).toarray(), dtype=np.float32))
+
+
+def _nearest_centroids(vectors, centroids, n_nearest=1):
+    """Posiciones de los ``n_nearest`` centroides de mayor producto escalar (por bloques)."""
+    n_lists = len(centroids)
+    n_nearest = min(n_nearest, n_lists)
+    block_size = max(1, DEFAULT_BLOCK_BYTES // (4 * max(n_lists, 1)))
+    nearest = np.empty((len(vectors), n_nearest), dtype=np.int64)
+    for start in range(0, len(vectors), block_size):
+        scores = vectors[start:start + block_size] @ centroids.T
+        if n_nearest == 1:
+            nearest[start:start + len(scores), 0] = scores.argmax(axis=1)
+        else:
+            nearest[start:start + len(scores)] = np.argpartition(-scores, n_nearest - 1, axis=1)[:, :n_nearest]
+    return nearest
+
+
+def spherical_kmeans(vectors, n_clusters, n_iter=10, seed=0):
+    """
+    k-means esférico: centroides de norma 1 y asignación por producto escalar
+
+    Args:
+        vectors (np.ndarray): Vectores normalizados (float32)
+        n_clusters (int): Número de centroides
+        n_iter (int): Iteraciones de Lloyd
+        seed (int): Semilla de la inicialización
+
+    Returns:
+        np.ndarray: Centroides (n_clusters × dim, float32)
+    """
+    rng = np.random.default_rng(seed)
+    n_clusters = min(n_clusters, len(vectors))
+    centroids = vectors[rng.choice(len(vectors), n_clusters, replace=False)].copy()
+    for _ in range(n_iter):
+        assignment = _nearest_centroids(vectors, centroids)[:, 0]
+        order = np.argsort(assignment, kind='stable')
+        counts = np.bincount(assignment, minlength=n_clusters)
+        sums = np.zeros_like(centroids)
+        used = counts > 0
+        sums[used] = np.add.reduceat(vectors[order], np.cumsum(counts)[used] - counts[used], axis=0)
+        # Las listas vacías se vuelven a sembrar con vectores al azar
+        empty = np.flatnonzero(~used)
+        if len(empty):
+            sums[empty] = vectors[rng.choice(len(vectors), len(empty), replace=False)]
+        centroids = l2_normalize_rows(sums)
+    return centroids
+
+
+def _feature_arrays(features):
+    """Arreglos de una matriz densa o CSR (para guardarla con el índice)."""
+    import scipy.sparse as sp
+
+    if sp.issparse(features):
+        return {'data': features.data, 'indices': features.indices, 'indptr': features.indptr,
+                'shape': np.array(features.shape)}
+    return {'dense': features, 'shape': np.array(features.shape)}
+
+
+def _features_from_arrays(arrays, prefix):
+    """Reconstruir la matriz guardada con _feature_arrays."""
+    import scipy.sparse as sp
+
+    if f'{prefix}dense' in arrays:
+        return np.asarray(arrays[f'{prefix}dense'], dtype=np.float32)
+    return sp.csr_matrix(
+        (arrays[f'{prefix}data'], arrays[f'{prefix}indices'], arrays[f'{prefix}indptr']),
+        shape=tuple(arrays[f'{prefix}shape'])
+    )
+
+
+def _stack_rows(top, bottom):
+    """Apilar dos matrices densas o dispersas por filas."""
+    import scipy.sparse as sp
+
+    if sp.issparse(top):
+        return sp.vstack([top, bottom], format='csr')
+    return np.concatenate([top, bottom])
+
+
+class IVFIndex:
+    """
+    Índice aproximado de vecinos con listas invertidas (IVF)
+
+    Las posiciones de los vectores son las del orden en que se añadieron
+    (las filas de movies_df si se construye con build_ann_index).
+
+    Args:
+        n_lists (int): Número de listas (None para default_n_lists al entrenar)
+        n_probe (int): Listas recorridas por consulta si no se indica otra cosa
+        metric (str): 'cosine' (los vectores se normalizan) o 'dot' (producto escalar)
+        n_iter (int): Iteraciones de k-means al entrenar
+        seed (int): Semilla del entrenamiento
+        rerank (int): Candidatos por vecino reordenados con set_exact_features (1 = sin reordenar)
+    """
+
+    def __init__(self, n_lists=None, n_probe=DEFAULT_N_PROBE, metric='cosine', n_iter=10, seed=0,
+                 rerank=DEFAULT_RERANK):
+        if metric not in METRICS:
+            raise ValueError(f"Métrica desconocida: {metric}")
+        self.n_lists = n_lists
+        self.n_probe = int(n_probe)
+        self.metric = metric
+        self.n_iter = int(n_iter)
+        self.seed = int(seed)
+        self.rerank = max(1, int(rerank))
+        self.exact_features = None
+        self.centroids = None
+        self.n_items = 0
+        self._vectors = np.zeros((0, 0), dtype=np.float32)
+        self._lists = []
+
+    @property
+    def vectors(self):
+        """Vectores guardados, en el orden de sus posiciones."""
+        return self._vectors[:self.n_items]
+
+    @property
+    def dim(self):
+        return None if self.centroids is None else self.centroids.shape[1]
+
+    @property
+    def nbytes(self):
+        total = self.vectors.nbytes + self.centroids.nbytes + sum(ids.nbytes for ids in self._lists)
+        if self.exact_features is not None:
+            total += sum(array.nbytes for array in _feature_arrays(self.exact_features).values())
+        return total
+
+    def __len__(self):
+        return self.n_items
+
+    def _prepare(self, vectors):
+        vectors = np.asarray(vectors, dtype=np.float32)
+        return l2_normalize_rows(vectors) if self.metric == 'cosine' else vectors
+
+    def train(self, vectors, sample_size=None):
+        """
+        Calcular los centroides con k-means sobre una muestra de vectores
+
+        Args:
+            vectors (np.ndarray): Vectores de entrenamiento (n × dim)
+            sample_size (int): Vectores usados (por defecto TRAIN_POINTS_PER_LIST por lista)
+
+        Returns:
+            IVFIndex: El propio índice
+        """
+        # La asignación a listas es por dirección, también con la métrica 'dot'
+        vectors = l2_normalize_rows(np.asarray(vectors, dtype=np.float32))
+        n_lists = self.n_lists or default_n_lists(len(vectors))
+        sample_size = sample_size or n_lists * TRAIN_POINTS_PER_LIST
+        if len(vectors) > sample_size:
+            rng = np.random.default_rng(self.seed)
+            vectors = vectors[np.sort(rng.choice(len(vectors), sample_size, replace=False))]
+        self.centroids = spherical_kmeans(vectors, n_lists, self.n_iter, self.seed)
+        self.n_lists = len(self.centroids)
+        self._vectors = np.zeros((0, self.dim), dtype=np.float32)
+        self._lists = [np.zeros(0, dtype=np.int64) for _ in range(self.n_lists)]
+        self.n_items = 0
+        return self
+
+    def add(self, vectors, features=None):
+        """
+        Añadir vectores al final, sin reentrenar los centroides
+
+        Args:
+            vectors (np.ndarray): Vectores nuevos (n × dim)
+            features: Características originales de los vectores nuevos
+                (obligatorias si el índice tiene exact_features)
+
+        Returns:
+            np.ndarray: Posiciones asignadas a los vectores nuevos
+        """
+        if self.centroids is None:
+            raise ValueError("El índice no está entrenado: llamar antes a train")
+        vectors = self._prepare(vectors)
+        n_new = len(vectors)
+        positions = np.arange(self.n_items, self.n_items + n_new, dtype=np.int64)
+        if n_new == 0:
+            return positions
+        if self.exact_features is not None:
+            if features is None or features.shape[0] != n_new:
+                raise ValueError("Faltan las características originales de los vectores nuevos")
+            self.exact_features = _stack_rows(self.exact_features, l2_normalize_rows(features))
+
+        # Búfer con capacidad doble: añadir pocos vectores no copia el catálogo
+        if self.n_items + n_new > len(self._vectors):
+            capacity = max(self.n_items + n_new, 2 * len(self._vectors))
+            grown = np.empty((capacity, self.dim), dtype=np.float32)
+            grown[:self.n_items] = self.vectors
+            self._vectors = grown
+        self._vectors[self.n_items:self.n_items + n_new] = vectors
+
+        assignment = _nearest_centroids(l2_normalize_rows(vectors), self.centroids)[:, 0]
+        order = np.argsort(assignment, kind='stable')
+        touched, starts = np.unique(assignment[order], return_index=True)
+        for list_id, members in zip(touched, np.split(positions[order], starts[1:])):
+            self._lists[list_id] = np.concatenate([self._lists[list_id], members])
+        self.n_items += n_new
+        return positions
+
+    def set_exact_features(self, features):
+        """
+        Guardar las características originales para reordenar los candidatos
+
+        Args:
+            features: Características (densas o dispersas) con una fila por vector añadido
+        """
+        if features.shape[0] != self.n_items:
+            raise ValueError("Las características deben tener una fila por vector del índice")
+        self.exact_features = l2_normalize_rows(features)
+
+    def _rescore(self, query_features, candidates, k):
+        """Reordenar los candidatos de cada consulta con la similitud exacta."""
+        import scipy.sparse as sp
+
+        n_queries, n_candidates = candidates.shape
+        valid = candidates >= 0
+        left = query_features[np.repeat(np.arange(n_queries), n_candidates)]
+        right = self.exact_features[np.where(valid, candidates, 0).ravel()]
+        if sp.issparse(left):
+            scores = np.asarray(left.multiply(right).sum(axis=1)).ravel()
+        else:
+            scores = np.einsum('ij,ij->i', left, right)
+        scores = scores.reshape(n_queries, n_candidates).astype(np.float32)
+        scores[~valid] = -np.inf
+
+        order = np.argsort(-scores, axis=1, kind='stable')[:, :k]
+        indices = np.take_along_axis(candidates, order, axis=1)
+        scores = np.take_along_axis(scores, order, axis=1)
+        indices[~np.isfinite(scores)] = -1
+        return indices, scores
+
+    def search(self, queries, k, n_probe=None, exclude=None, query_features=None):
+        """
+        Buscar los K vectores más similares a cada consulta
+
+        Las consultas se agrupan por lista: cada lista recorrida se compara
+        de una vez con todas las consultas que la visitan.
+
+        Args:
+            queries (np.ndarray): Vectores de consulta (q × dim)
+            k (int): Vecinos por consulta
+            n_probe (int): Listas recorridas (por defecto self.n_probe)
+            exclude (array-like): Posición a excluir por consulta (p. ej. la propia película)
+            query_features: Características originales de las consultas (para
+                reordenar si el índice tiene exact_features)
+
+        Returns:
+            tuple: (posiciones, similitudes) de forma (q, k) ordenadas de
+            mayor a menor; los huecos se rellenan con -1 y -inf
+        """
+        queries = self._prepare(np.atleast_2d(queries))
+        rescore = self.exact_features is not None and query_features is not None and self.rerank > 1
+        final_k, k = k, (k * self.rerank if rescore else k)
+        n_queries = len(queries)
+        out_indices = np.full((n_queries, k), -1, dtype=np.int64)
+        out_scores = np.full((n_queries, k), -np.inf, dtype=np.float32)
+        if n_queries == 0 or k <= 0 or self.n_items == 0:
+            return out_indices[:, :final_k], out_scores[:, :final_k]
+
+        n_probe = min(n_probe or self.n_probe, self.n_lists)
+        probes = _nearest_centroids(l2_normalize_rows(queries), self.centroids, n_probe)
+        exclude = None if exclude is None else np.asarray(exclude, dtype=np.int64)
+
+        # Invertir consulta → listas en lista → consultas
+        flat_lists = probes.ravel()
+        order = np.argsort(flat_lists, kind='stable')
+        flat_queries = np.repeat(np.arange(n_queries), probes.shape[1])[order]
+        touched, starts = np.unique(flat_lists[order], return_index=True)
+        for list_id, members in zip(touched, np.split(flat_queries, starts[1:])):
+            ids = self._lists[list_id]
+            if len(ids) == 0:
+                continue
+            scores = queries[members] @ self._vectors[ids].T
+            if exclude is not None:
+                scores[exclude[members][:, None] == ids[None, :]] = -np.inf
+
+            # Mezclar los candidatos de esta lista con los mejores hasta ahora
+            candidates = np.concatenate([out_indices[members], np.broadcast_to(ids, scores.shape)], axis=1)
+            candidate_scores = np.concatenate([out_scores[members], scores], axis=1)
+            top = np.argpartition(-candidate_scores, k - 1, axis=1)[:, :k]
+            out_indices[members] = np.take_along_axis(candidates, top, axis=1)
+            out_scores[members] = np.take_along_axis(candidate_scores, top, axis=1)
+
+        order = np.argsort(-out_scores, axis=1, kind='stable')
+        out_indices = np.take_along_axis(out_indices, order, axis=1)
+        out_scores = np.take_along_axis(out_scores, order, axis=1)
+        out_indices[~np.isfinite(out_scores)] = -1
+        if rescore:
+            return self._rescore(l2_normalize_rows(query_features), out_indices, final_k)
+        return out_indices, out_scores
+
+    def search_items(self, rows, k, n_probe=None):
+        """
+        Vecinos de vectores ya guardados (sin incluirse a sí mismos)
+
+        Permite usar el índice donde se espera un NeighborIndex (ver
+        neighbors.top_k_neighbors). Si hay exact_features, los candidatos se
+        reordenan con ellas.
+
+        Args:
+            rows (array-like): Posiciones de los vectores consultados
+            k (int): Vecinos por consulta
+            n_probe (int): Listas recorridas (por defecto self.n_probe)
+
+        Returns:
+            tuple: (posiciones, similitudes) como en search
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        query_features = None if self.exact_features is None else self.exact_features[rows]
+        return self.search(self.vectors[rows], k, n_probe=n_probe, exclude=rows, query_features=query_features)
+
+    def to_arrays(self):
+        """Arreglos que representan el índice (para guardarlo en disco)."""
+        lengths = np.array([len(ids) for ids in self._lists], dtype=np.int64)
+        arrays = {
+            'ann_format_version': np.array(ANN_FORMAT_VERSION),
+            'centroids': self.centroids,
+            'vectors': self.vectors,
+            'list_indptr': np.concatenate([[0], np.cumsum(lengths)]),
+            'list_indices': np.concatenate(self._lists) if self._lists else np.zeros(0, dtype=np.int64),
+            'n_probe': np.array(self.n_probe),
+            'metric': np.array(self.metric),
+            'n_iter': np.array(self.n_iter),
+            'seed': np.array(self.seed),
+            'rerank': np.array(self.rerank),
+        }
+        if self.exact_features is not None:
+            arrays.update({f'exact_{name}': array for name, array in _feature_arrays(self.exact_features).items()})
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        """Reconstruir el índice a partir de los arreglos de to_arrays."""
+        if int(arrays['ann_format_version']) != ANN_FORMAT_VERSION:
+            raise ValueError("Formato de índice aproximado incompatible")
+        centroids = np.asarray(arrays['centroids'], dtype=np.float32)
+        index = cls(len(centroids), int(arrays['n_probe']), str(arrays['metric']),
+                    int(arrays['n_iter']), int(arrays['seed']), int(arrays['rerank']))
+        index.centroids = centroids
+        index._vectors = np.asarray(arrays['vectors'], dtype=np.float32)
+        index.n_items = len(index._vectors)
+        indptr, indices = arrays['list_indptr'], np.asarray(arrays['list_indices'], dtype=np.int64)
+        index._lists = [indices[indptr[i]:indptr[i + 1]] for i in range(len(centroids))]
+        if 'exact_shape' in arrays:
+            index.exact_features = _features_from_arrays(arrays, 'exact_')
+        return index
+
+    def save(self, file_path):
+        """Guardar el índice en un archivo .npz sin comprimir."""
+        with open(file_path, 'wb') as f:
+            np.savez(f, **self.to_arrays())
+
+    @classmethod
+    def load(cls, file_path):
+        """Cargar un índice guardado con save."""
+        with np.load(file_path, allow_pickle=False) as arrays:
+            return cls.from_arrays(arrays)
+
+
+def build_ann_index(vectors, n_lists=None, n_probe=DEFAULT_N_PROBE, metric='cosine', seed=0,
+                    exact_features=None, rerank=DEFAULT_RERANK):
+    """
+    Entrenar un índice IVF y añadirle todos los vectores
+
+    Args:
+        vectors (np.ndarray): Vectores densos (filas = películas)
+        n_lists (int): Número de listas (None para default_n_lists)
+        n_probe (int): Listas recorridas por consulta por defecto
+        metric (str): 'cosine' o 'dot'
+        seed (int): Semilla del entrenamiento
+        exact_features: Características originales para reordenar (None para no reordenar)
+        rerank (int): Candidatos por vecino que se reordenan
+
+    Returns:
+        IVFIndex: Índice con los vectores en el orden de entrada
+    """
+    index = IVFIndex(n_lists=n_lists, n_probe=n_probe, metric=metric, seed=seed, rerank=rerank).train(vectors)
+    index.add(vectors)
+    if exact_features is not None:
+        index.set_exact_features(exact_features)
+    return index
+
+
+def exact_neighbors(features, rows, k):
+    """
+    Vecinos exactos por similitud coseno (la búsqueda por fuerza bruta)
+
+    Args:
+        features: Matriz de características original (densa o dispersa)
+        rows (array-like): Posiciones consultadas
+        k (int): Vecinos por consulta
+
+    Returns:
+        tuple: (posiciones, similitudes, similitudes de todas las películas)
+        para las filas consultadas
+    """
+    import scipy.sparse as sp
+
+    features = l2_normalize_rows(features)
+    rows = np.asarray(rows, dtype=np.int64)
+    block = features[rows] @ features.T
+    block = block.toarray() if sp.issparse(block) else np.asarray(block)
+    block = block.astype(np.float32, copy=False)
+    all_scores = block.copy()
+    top, top_scores = _block_top_k(block, rows, k)
+    return top, top_scores, all_scores
+
+
+def recall_at_k(approx_indices, exact_scores, all_scores, tolerance=1e-5):
+    """
+    Recall@K de una búsqueda aproximada frente a la exacta
+
+    Con empates (p. ej. películas con los mismos géneros) hay muchos
+    conjuntos de K vecinos exactos igual de válidos, así que un vecino
+    devuelto cuenta como acierto si su similitud exacta alcanza la del
+    K-ésimo vecino exacto.
+
+    Args:
+        approx_indices (np.ndarray): Posiciones devueltas (q × K, -1 = hueco)
+        exact_scores (np.ndarray): Similitudes de los K vecinos exactos (q × K)
+        all_scores (np.ndarray): Similitudes exactas con todo el catálogo (q × N)
+        tolerance (float): Margen para comparar similitudes
+
+    Returns:
+        float: Fracción media de aciertos por consulta
+    """
+    threshold = exact_scores[:, -1:] - tolerance
+    valid = approx_indices >= 0
+    found = np.take_along_axis(all_scores, np.where(valid, approx_indices, 0), axis=1)
+    hits = (valid & (found >= threshold)).sum(axis=1)
+    return float(np.mean(hits / exact_scores.shape[1]))
+
+
+def evaluate_operating_points(features, k=10, probes=(1, 2, 4, 8, 16, 32), n_lists=None, dim=DEFAULT_DIM,
+                              n_queries=500, rerank=DEFAULT_RERANK, seed=0):
+    """
+    Medir recall@K y latencia del índice IVF para varios valores de n_probe
+
+    Args:
+        features: Características originales (dispersas de contenido o factores densos)
+        k (int): Vecinos por consulta
+        probes (tuple): Valores de n_probe a medir
+        n_lists (int): Número de listas (None para default_n_lists)
+        dim (int): Dimensión de la proyección (solo características dispersas)
+        n_queries (int): Películas consultadas (muestra aleatoria)
+        rerank (int): Candidatos por vecino reordenados con las características exactas (1 = sin reordenar)
+        seed (int): Semilla de la muestra, la proyección y el entrenamiento
+
+    Returns:
+        dict: build_s, n_lists, exact_ms (por consulta) y una fila por n_probe
+        con recall, latency_ms (por consulta) y scanned (fracción del catálogo recorrida)
+    """
+    n_items = features.shape[0]
+    rng = np.random.default_rng(seed)
+    rows = np.sort(rng.choice(n_items, min(n_queries, n_items), replace=False))
+
+    start = time.perf_counter()
+    index = build_ann_index(project_features(features, dim=dim, seed=seed), n_lists=n_lists, seed=seed,
+                            exact_features=features if rerank > 1 else None, rerank=rerank)
+    build_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    _, exact_scores, all_scores = exact_neighbors(features, rows, k)
+    exact_ms = (time.perf_counter() - start) * 1000.0 / len(rows)
+
+    list_sizes = np.array([len(ids) for ids in index._lists], dtype=np.float64)
+    points = []
+    for n_probe in probes:
+        start = time.perf_counter()
+        indices, _ = index.search_items(rows, k, n_probe=n_probe)
+        latency_ms = (time.perf_counter() - start) * 1000.0 / len(rows)
+        probed = _nearest_centroids(index.vectors[rows], index.centroids, min(n_probe, index.n_lists))
+        points.append({
+            'n_probe': int(n_probe),
+            'recall': recall_at_k(indices, exact_scores, all_scores),
+            'latency_ms': latency_ms,
+            'scanned': float(list_sizes[probed].sum(axis=1).mean() / n_items),
+        })
+    return {'build_s': build_s, 'n_lists': index.n_lists, 'exact_ms': exact_ms, 'points': points}
+
+
+def main():
+    from .utils import DATA_DIR, _hashed_content_features, get_factorization_model, load_movie_data
+
+    parser = argparse.ArgumentParser(description="Recall@K y latencia del índice aproximado (IVF)")
+    parser.add_argument('--data-dir', default=DATA_DIR, help="Directorio con movies.csv, ratings.csv y tags.csv")
+    parser.add_argument('--engine', choices=('content', 'als'), default='content',
+                        help="Vectores indexados: contenido (hashing) o factores de ALS")
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--probes', default="1,2,4,8,16,32", help="Valores de n_probe separados por comas")
+    parser.add_argument('--n-lists', type=int, default=None)
+    parser.add_argument('--dim', type=int, default=DEFAULT_DIM, help="Dimensión de la proyección (contenido)")
+    parser.add_argument('--queries', type=int, default=500)
+    parser.add_argument('--rerank', type=int, default=DEFAULT_RERANK,
+                        help="Candidatos por vecino reordenados con la similitud exacta (1 = sin reordenar)")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    movies_df = load_movie_data(data_dir=args.data_dir)
+    if args.engine == 'content':
+        features = _hashed_content_features(movies_df, os.path.join(args.data_dir, "tags.csv"))
+    else:
+        model = get_factorization_model(movies_df, ratings_path=os.path.join(args.data_dir, "ratings.csv"))
+        features = model.item_factors
+
+    report = evaluate_operating_points(
+        features, k=args.k, probes=[int(p) for p in args.probes.split(',')], n_lists=args.n_lists,
+        dim=args.dim, n_queries=args.queries, rerank=args.rerank, seed=args.seed
+    )
+    print(f"{len(movies_df):,} películas, {report['n_lists']} listas, construcción {report['build_s']:.2f} s")
+    print(f"Búsqueda exacta: {report['exact_ms']:.3f} ms por consulta\n")
+    print(f"{'n_probe':>8}{'recall@' + str(args.k):>12}{'ms/consulta':>14}{'recorrido':>12}")
+    for point in report['points']:
+        print(f"{point['n_probe']:>8}{point['recall']:>12.3f}{point['latency_ms']:>14.3f}{point['scanned']:>11.1%}")
+
+
+if __name__ == "__main__":
+    main()
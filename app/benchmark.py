@@ -0,0 +1,271 @@
+"""
+Benchmarks de rendimiento sobre datasets sintéticos
+
+Mide las funciones principales de app/utils.py a varias escalas (por defecto
+10k películas; admite 100k y 1M) y escribe los resultados en JSON para poder
+comparar versiones. Por cada función se informa:
+
+- Latencia p50/p95/p99, media, mínimo y máximo (ms) de llamadas repetidas.
+- Rendimiento (llamadas por segundo, secuencial).
+- Memoria pico de la primera llamada (MB, con tracemalloc), que incluye la
+  construcción de los índices derivados. tracemalloc solo ve la memoria
+  reservada por Python y NumPy: los búferes internos del lector CSV de
+  pandas no aparecen.
+
+La matriz densa de create_similarity_matrix crece con N², así que solo se
+mide hasta ``--dense-limit`` películas; el índice de vecinos, que la
+reemplaza, hasta ``--index-limit``.
+
+Uso:
+    python -m app.benchmark --sizes 10k,100k,1M --output benchmark.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from .synthetic import TITLE_WORDS, parse_size, write_synthetic_dataset
+from .utils import (
+    create_neighbor_index, create_similarity_matrix, get_genre_distribution, get_movie_recommendations,
+    get_popular_movies, load_movie_data, search_movies
+)
+
+SYNTHETIC_DIR = os.path.join(".cache", "synthetic")
+DENSE_LIMIT = 10_000
+INDEX_LIMIT = 100_000
+
+
+def latency_summary(samples):
+    """
+    Resumir tiempos de llamadas repetidas
+
+    Args:
+        samples (list): Duración de cada llamada en segundos
+
+    Returns:
+        dict: calls, p50/p95/p99/mean/min/max en ms y throughput_per_s
+    """
+    ms = np.asarray(samples, dtype=np.float64) * 1000.0
+    total = ms.sum() / 1000.0
+    return {
+        'calls': len(ms),
+        'p50_ms': float(np.percentile(ms, 50)),
+        'p95_ms': float(np.percentile(ms, 95)),
+        'p99_ms': float(np.percentile(ms, 99)),
+        'mean_ms': float(ms.mean()),
+        'min_ms': float(ms.min()),
+        'max_ms': float(ms.max()),
+        'throughput_per_s': len(ms) / total if total > 0 else None,
+    }
+
+
+def peak_memory(function, *args, **kwargs):
+    """
+    Ejecutar una llamada midiendo su memoria pico con tracemalloc
+
+    Returns:
+        tuple: (resultado, segundos, memoria pico en MB)
+    """
+    tracemalloc.start()
+    try:
+        start = time.perf_counter()
+        result = function(*args, **kwargs)
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, elapsed, peak / 2**20
+
+
+def run_benchmark(name, function, calls, variant=None):
+    """
+    Medir una función: primera llamada con memoria y luego las repeticiones
+
+    Args:
+        name (str): Nombre de la función medida
+        function (callable): Función a llamar
+        calls (list): Argumentos (tupla) de cada llamada; la primera es la "fría"
+        variant (str): Variante medida (p. ej. el tipo de modelo)
+
+    Returns:
+        tuple: (resultado de la primera llamada, registro del benchmark)
+    """
+    first, first_seconds, peak_mb = peak_memory(function, *calls[0])
+    samples = []
+    for args in calls[1:] or calls[:1]:
+        start = time.perf_counter()
+        function(*args)
+        samples.append(time.perf_counter() - start)
+    record = {
+        'function': name,
+        'variant': variant,
+        'first_call_ms': first_seconds * 1000.0,
+        'peak_memory_mb': peak_mb,
+        'latency': latency_summary(samples),
+    }
+    return first, record
+
+
+def skipped(name, reason, variant=None):
+    return {'function': name, 'variant': variant, 'skipped': reason}
+
+
+def ensure_dataset(label, n_movies, data_root, ratings_per_movie, seed):
+    """Generar el dataset sintético de una escala si aún no existe."""
+    data_dir = os.path.join(data_root, label)
+    if not os.path.exists(os.path.join(data_dir, "movies.csv")):
+        print(f"🧪 Generando dataset sintético de {n_movies:,} películas en {data_dir}...")
+        write_synthetic_dataset(data_dir, n_movies, ratings_per_movie, seed)
+    return data_dir
+
+
+def benchmark_size(n_movies, data_dir, queries=200, load_repeat=3, dense_limit=DENSE_LIMIT,
+                   index_limit=INDEX_LIMIT, seed=0):
+    """
+    Medir todas las funciones sobre un dataset
+
+    Args:
+        n_movies (int): Número de películas del dataset
+        data_dir (str): Directorio con movies.csv y ratings.csv
+        queries (int): Llamadas por función de consulta
+        load_repeat (int): Repeticiones de cada carga del dataset
+        dense_limit (int): Máximo de películas para la matriz densa
+        index_limit (int): Máximo de películas para el índice de vecinos
+        seed (int): Semilla de las consultas
+
+    Returns:
+        list: Registros de benchmark
+    """
+    rng = np.random.default_rng(seed)
+    records = []
+
+    # Carga: sin caché (CSV) y con la caché binaria mapeada en memoria
+    _, record = run_benchmark(
+        'load_movie_data', load_movie_data, [(None, data_dir, False)] * (load_repeat + 1), 'csv'
+    )
+    records.append(record)
+    load_movie_data(data_dir=data_dir)  # Asegurar que la caché existe
+    movies_df, record = run_benchmark(
+        'load_movie_data', load_movie_data, [(None, data_dir, True)] * (load_repeat + 1), 'binary_cache'
+    )
+    records.append(record)
+
+    feature_repeat = max(1, load_repeat)
+    if n_movies <= dense_limit:
+        dense, record = run_benchmark(
+            'create_similarity_matrix', create_similarity_matrix, [(movies_df,)] * (feature_repeat + 1), 'dense'
+        )
+        records.append(record)
+    else:
+        dense = None
+        records.append(skipped('create_similarity_matrix', f"más de {dense_limit:,} películas", 'dense'))
+
+    if n_movies <= index_limit:
+        neighbor_index, record = run_benchmark(
+            'create_neighbor_index', create_neighbor_index, [(movies_df,)] * (feature_repeat + 1), 'k=50'
+        )
+        records.append(record)
+    else:
+        neighbor_index = None
+        records.append(skipped('create_neighbor_index', f"más de {index_limit:,} películas", 'k=50'))
+
+    titles = movies_df['title'].to_numpy(dtype=object)
+    sample_titles = titles[rng.integers(0, len(titles), queries + 1)].tolist()
+    for variant, model in (('neighbor_index', neighbor_index), ('dense', dense)):
+        if model is None:
+            records.append(skipped('get_movie_recommendations', "modelo no construido", variant))
+            continue
+        calls = [(movies_df, title, model, 10) for title in sample_titles]
+        records.append(run_benchmark('get_movie_recommendations', get_movie_recommendations, calls, variant)[1])
+
+    words = np.array(TITLE_WORDS, dtype=object)
+    search_queries = [
+        ' '.join(words[rng.integers(0, len(words), rng.integers(1, 3))]) for _ in range(queries + 1)
+    ]
+    calls = [(movies_df, query, 10) for query in search_queries]
+    records.append(run_benchmark('search_movies', search_movies, calls)[1])
+
+    for score in ('avg_rating', 'weighted'):
+        minimums = rng.choice([0, 10, 50, 100], queries + 1)
+        calls = [(movies_df, int(minimum), 20, score) for minimum in minimums]
+        records.append(run_benchmark('get_popular_movies', get_popular_movies, calls, score)[1])
+
+    calls = [(movies_df,)] * (queries + 1)
+    records.append(run_benchmark('get_genre_distribution', get_genre_distribution, calls)[1])
+
+    for record in records:
+        record['size'] = n_movies
+    return records
+
+
+def environment_info():
+    """Versiones y máquina, para comparar resultados entre ejecuciones."""
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'git_commit': commit,
+        'python': sys.version.split()[0],
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+    }
+
+
+def print_summary(records):
+    for record in records:
+        name = record['function'] + (f" [{record['variant']}]" if record['variant'] else "")
+        if 'skipped' in record:
+            print(f"   {name:<48} omitido: {record['skipped']}")
+            continue
+        latency = record['latency']
+        print(f"   {name:<48} p50 {latency['p50_ms']:9.3f} ms  p99 {latency['p99_ms']:9.3f} ms  "
+              f"pico {record['peak_memory_mb']:8.1f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks del recomendador sobre datasets sintéticos")
+    parser.add_argument('--sizes', default="10k", help="Escalas separadas por comas (p. ej. 10k,100k,1M)")
+    parser.add_argument('--queries', type=int, default=200, help="Llamadas por función de consulta")
+    parser.add_argument('--load-repeat', type=int, default=3, help="Repeticiones de carga y construcción")
+    parser.add_argument('--dense-limit', type=int, default=DENSE_LIMIT)
+    parser.add_argument('--index-limit', type=int, default=INDEX_LIMIT)
+    parser.add_argument('--ratings-per-movie', type=float, default=10.0)
+    parser.add_argument('--data-root', default=SYNTHETIC_DIR, help="Directorio de los datasets sintéticos")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default="benchmark-results.json", help="Archivo JSON de resultados")
+    args = parser.parse_args()
+
+    results = {'environment': environment_info(), 'results': []}
+    for label in args.sizes.split(','):
+        label = label.strip()
+        n_movies = parse_size(label)
+        data_dir = ensure_dataset(label, n_movies, args.data_root, args.ratings_per_movie, args.seed)
+        print(f"\n⏱️  {n_movies:,} películas")
+        records = benchmark_size(
+            n_movies, data_dir, queries=args.queries, load_repeat=args.load_repeat,
+            dense_limit=args.dense_limit, index_limit=args.index_limit, seed=args.seed
+        )
+        print_summary(records)
+        results['results'].extend(records)
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"\n✅ Resultados en {args.output}")
+
+
+if __name__ == "__main__":
+    main()
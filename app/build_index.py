@@ -0,0 +1,299 @@
+"""
+Construcción offline del índice de vecinos con varios procesos
+
+Para catálogos grandes (p. ej. ml-25m) el índice se construye fuera de la
+aplicación y se deja en el directorio de modelos, donde get_similarity_model
+lo encuentra con la misma huella que si lo hubiera construido ella:
+
+- Las características (contenido o colaborativas) se calculan una vez y se
+  copian a memoria compartida; los procesos de trabajo las leen de ahí sin
+  recibir copias serializadas.
+- Las filas se reparten en fragmentos (shards) de ``--shard-rows`` películas.
+  Cada fragmento terminado se guarda en ``--work-dir``, así que si la
+  construcción se interrumpe, al relanzarla solo se calculan los que faltan.
+- Al terminar se unen los fragmentos y se guarda el NeighborIndex con
+  save_model.
+
+Uso:
+    python -m app.build_index --data-dir ml-25m --engine content --workers 8
+"""
+
+import argparse
+import glob
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .neighbors import DEFAULT_BLOCK_BYTES, l2_normalize_rows, merge_neighbor_blocks, neighbor_rows
+from .quantization import SCORE_DTYPES
+from .utils import (
+    DATA_DIR, ENGINES, MODEL_DIR, SCORE_DTYPE, _content_features, _hashed_content_features, load_movie_data,
+    save_model, similarity_model_key
+)
+
+BUILD_DIR = os.path.join(".cache", "build")
+# Fragmentos por proceso: más fragmentos reparten mejor la carga y pierden menos al interrumpir
+SHARDS_PER_WORKER = 8
+
+# Estado de cada proceso de trabajo (lo rellena _init_worker)
+_worker = {}
+
+
+def engine_features(movies_df, engine='content', data_dir=DATA_DIR, content_features='hashed'):
+    """
+    Características de un motor (filas = películas), las mismas que usa get_similarity_model
+
+    Args:
+        movies_df (pd.DataFrame): DataFrame con datos de películas
+        engine (str): 'content' o 'collaborative'
+        data_dir (str): Directorio con ratings.csv y tags.csv
+        content_features (str): 'hashed' o 'tfidf' (motor de contenido)
+
+    Returns:
+        scipy.sparse.csr_matrix: Características sin normalizar
+    """
+    if engine == 'content' and content_features == 'hashed':
+        features = _hashed_content_features(movies_df, os.path.join(data_dir, "tags.csv"))
+    elif engine == 'content':
+        features = _content_features(movies_df)
+    elif engine == 'collaborative':
+        from .collaborative import build_rating_matrix, center_by_user, load_ratings
+
+        rating_matrix, _ = build_rating_matrix(
+            load_ratings(os.path.join(data_dir, "ratings.csv")), movies_df['movieId'].to_numpy()
+        )
+        features = center_by_user(rating_matrix).T.tocsr()
+    else:
+        raise ValueError(f"Motor desconocido: {engine}")
+    return features
+
+
+def share_arrays(arrays):
+    """
+    Copiar arreglos a segmentos de memoria compartida
+
+    Args:
+        arrays (dict): Arreglos NumPy por nombre
+
+    Returns:
+        tuple: (segmentos, descripción {nombre: (segmento, forma, dtype)} para attach_arrays)
+    """
+    segments, spec = [], {}
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        segment = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        np.ndarray(array.shape, dtype=array.dtype, buffer=segment.buf)[...] = array
+        segments.append(segment)
+        spec[name] = (segment.name, array.shape, array.dtype.str)
+    return segments, spec
+
+
+def attach_arrays(spec):
+    """
+    Abrir los arreglos de share_arrays sin copiarlos
+
+    Args:
+        spec (dict): Descripción devuelta por share_arrays
+
+    Returns:
+        tuple: (segmentos abiertos, arreglos por nombre)
+    """
+    segments, arrays = [], {}
+    for name, (segment_name, shape, dtype) in spec.items():
+        segment = shared_memory.SharedMemory(name=segment_name)
+        segments.append(segment)
+        arrays[name] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=segment.buf)
+    return segments, arrays
+
+
+def _init_worker(spec, shape, k, min_score, block_size, work_dir):
+    """Abrir las características compartidas una vez por proceso."""
+    import scipy.sparse as sp
+
+    segments, arrays = attach_arrays(spec)
+    _worker.update(
+        segments=segments,
+        features=sp.csr_matrix((arrays['data'], arrays['indices'], arrays['indptr']), shape=shape, copy=False),
+        features_t=sp.csc_matrix((arrays['data_t'], arrays['indices_t'], arrays['indptr_t']),
+                                 shape=(shape[1], shape[0]), copy=False),
+        k=k, min_score=min_score, block_size=block_size, work_dir=work_dir,
+    )
+
+
+def shard_path(work_dir, start):
+    """Archivo de un fragmento (el nombre ordena los fragmentos por fila)."""
+    return os.path.join(work_dir, f"shard-{start:010d}.npz")
+
+
+def _build_shard(start, end):
+    """Calcular y guardar los vecinos de las filas start:end (en un proceso de trabajo)."""
+    began = time.perf_counter()
+    blocks = [
+        neighbor_rows(_worker['features'], _worker['features_t'], block_start,
+                      min(block_start + _worker['block_size'], end), _worker['k'], _worker['min_score'])
+        for block_start in range(start, end, _worker['block_size'])
+    ]
+    path = shard_path(_worker['work_dir'], start)
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    with open(tmp_path, 'wb') as f:
+        np.savez(
+            f, start=np.array(start), end=np.array(end),
+            counts=np.concatenate([counts for counts, _, _ in blocks]),
+            indices=np.concatenate([indices for _, indices, _ in blocks]),
+            scores=np.concatenate([scores for _, _, scores in blocks]),
+        )
+    os.replace(tmp_path, path)
+    return start, end, time.perf_counter() - began
+
+
+def _prepare_work_dir(work_dir, manifest, fresh=False):
+    """
+    Crear el directorio de fragmentos, descartando los de otra construcción
+
+    Returns:
+        set: Filas de inicio de los fragmentos ya terminados
+    """
+    os.makedirs(work_dir, exist_ok=True)
+    manifest_path = os.path.join(work_dir, "manifest.json")
+    previous = None
+    if os.path.exists(manifest_path):
+        with open(manifest_path, encoding='utf-8') as f:
+            previous = json.load(f)
+    if fresh or previous != manifest:
+        for path in glob.glob(os.path.join(work_dir, "shard-*")):
+            os.remove(path)
+        with open(manifest_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f)
+    return {int(os.path.basename(path)[6:16]) for path in glob.glob(os.path.join(work_dir, "shard-*.npz"))}
+
+
+def _format_seconds(seconds):
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours:d}:{minutes:02d}:{seconds:02d}"
+
+
+def build_index_parallel(features, k=50, work_dir=BUILD_DIR, n_workers=None, shard_rows=None, block_size=None,
+                         min_score=0.0, build_id='', fresh=False, progress=print):
+    """
+    Construir el índice de vecinos repartiendo fragmentos entre procesos
+
+    Args:
+        features (scipy.sparse.csr_matrix): Características (filas = películas)
+        k (int): Número de vecinos por película
+        work_dir (str): Directorio de los fragmentos (permite reanudar)
+        n_workers (int): Procesos de trabajo (None para usar todos los núcleos)
+        shard_rows (int): Películas por fragmento (None para SHARDS_PER_WORKER por proceso)
+        block_size (int): Filas por producto dentro de un fragmento (por defecto según DEFAULT_BLOCK_BYTES)
+        min_score (float): Los vecinos con similitud <= min_score se descartan
+        build_id (str): Identificador de los datos (p. ej. la huella); si cambia se descartan los fragmentos
+        fresh (bool): Descartar los fragmentos existentes aunque sean de la misma construcción
+        progress (callable): Función que recibe las líneas de progreso (None para no informar)
+
+    Returns:
+        NeighborIndex: Índice con los K vecinos de cada película
+    """
+    import scipy.sparse as sp
+
+    features = sp.csr_matrix(l2_normalize_rows(features), dtype=np.float32)
+    n_items = features.shape[0]
+    n_workers = n_workers or os.cpu_count() or 1
+    shard_rows = shard_rows or max(1, -(-n_items // (n_workers * SHARDS_PER_WORKER)))
+    block_size = min(block_size or max(1, DEFAULT_BLOCK_BYTES // (4 * max(n_items, 1))), shard_rows)
+    progress = progress or (lambda line: None)
+
+    manifest = {'build_id': build_id, 'n_items': n_items, 'k': k, 'shard_rows': shard_rows, 'min_score': min_score}
+    done = _prepare_work_dir(work_dir, manifest, fresh)
+    shards = [(start, min(start + shard_rows, n_items)) for start in range(0, n_items, shard_rows)]
+    pending = [(start, end) for start, end in shards if start not in done]
+    if len(pending) < len(shards):
+        progress(f"Reanudando: {len(shards) - len(pending)} de {len(shards)} fragmentos ya calculados")
+
+    if pending:
+        features_t = features.T.tocsc()
+        segments, spec = share_arrays({
+            'data': features.data, 'indices': features.indices, 'indptr': features.indptr,
+            'data_t': features_t.data, 'indices_t': features_t.indices, 'indptr_t': features_t.indptr,
+        })
+        del features_t
+        try:
+            began = time.perf_counter()
+            rows_done = 0
+            rows_pending = sum(end - start for start, end in pending)
+            with ProcessPoolExecutor(
+                max_workers=min(n_workers, len(pending)), initializer=_init_worker,
+                initargs=(spec, features.shape, k, min_score, block_size, work_dir)
+            ) as executor:
+                futures = [executor.submit(_build_shard, start, end) for start, end in pending]
+                for finished, future in enumerate(as_completed(futures), 1):
+                    start, end, seconds = future.result()
+                    rows_done += end - start
+                    elapsed = time.perf_counter() - began
+                    rate = rows_done / elapsed if elapsed > 0 else 0.0
+                    eta = (rows_pending - rows_done) / rate if rate > 0 else 0.0
+                    progress(f"[{finished}/{len(pending)}] filas {start:,}-{end:,} en {seconds:.1f} s · "
+                             f"{rate:,.0f} filas/s · restante {_format_seconds(eta)}")
+        finally:
+            for segment in segments:
+                segment.close()
+                segment.unlink()
+
+    blocks = []
+    for start, _ in shards:
+        with np.load(shard_path(work_dir, start)) as shard:
+            blocks.append((shard['counts'], shard['indices'], shard['scores']))
+    return merge_neighbor_blocks(blocks, n_items, k)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Construir el índice de vecinos con varios procesos")
+    parser.add_argument('--data-dir', default=DATA_DIR, help="Directorio con movies.csv, ratings.csv y tags.csv")
+    parser.add_argument('--engine', choices=ENGINES, default='content')
+    parser.add_argument('--features', choices=('hashed', 'tfidf'), default='hashed',
+                        help="Características del motor de contenido")
+    parser.add_argument('--k', type=int, default=50, help="Vecinos por película")
+    parser.add_argument('--workers', type=int, default=None, help="Procesos de trabajo (por defecto, uno por núcleo)")
+    parser.add_argument('--shard-rows', type=int, default=None, help="Películas por fragmento")
+    parser.add_argument('--block-size', type=int, default=None, help="Filas por producto dentro de un fragmento")
+    parser.add_argument('--model-dir', default=MODEL_DIR, help="Directorio de modelos de la aplicación")
+    parser.add_argument('--work-dir', default=None, help="Directorio de fragmentos (por defecto en .cache/build)")
+    parser.add_argument('--fresh', action='store_true', help="No reanudar: recalcular todos los fragmentos")
+    parser.add_argument('--keep-shards', action='store_true', help="No borrar los fragmentos al terminar")
+    parser.add_argument('--score-dtype', choices=SCORE_DTYPES, default=SCORE_DTYPE,
+                        help="Guardar las similitudes cuantizadas (como MOVIE_RECOMMENDER_SCORE_DTYPE en la aplicación)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    movies_df = load_movie_data(data_dir=args.data_dir)
+    ratings_path = os.path.join(args.data_dir, "ratings.csv")
+    tags_path = os.path.join(args.data_dir, "tags.csv")
+    fingerprint, model_path = similarity_model_key(
+        movies_df, k=args.k, model_dir=args.model_dir, engine=args.engine, ratings_path=ratings_path,
+        content_features=args.features, tags_path=tags_path, score_dtype=args.score_dtype
+    )
+    features = engine_features(movies_df, args.engine, args.data_dir, args.features)
+    print(f"📊 {len(movies_df):,} películas, {features.nnz:,} valores no nulos "
+          f"({time.perf_counter() - start:.1f} s de carga y características)")
+
+    work_dir = args.work_dir or os.path.join(BUILD_DIR, f"{args.engine}-{fingerprint[:16]}")
+    index = build_index_parallel(
+        features, k=args.k, work_dir=work_dir, n_workers=args.workers, shard_rows=args.shard_rows,
+        block_size=args.block_size, build_id=fingerprint, fresh=args.fresh
+    )
+    if args.score_dtype:
+        index = index.quantize(args.score_dtype)
+    save_model(index, model_path, fingerprint)
+    if not args.keep_shards:
+        for path in glob.glob(os.path.join(work_dir, "*")):
+            os.remove(path)
+        os.rmdir(work_dir)
+    print(f"✅ Índice guardado en {model_path} ({index.nbytes / 1e6:.1f} MB) "
+          f"en {_format_seconds(time.perf_counter() - start)}")
+
+
+if __name__ == "__main__":
+    main()
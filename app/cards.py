@@ -0,0 +1,82 @@
+"""
+Tarjetas HTML de películas para las páginas de Streamlit
+
+Toda la lista se construye en una sola pasada con operaciones de columnas de
+pandas (sin ``iterrows``) y se emite como un único elemento, de modo que el
+número de mensajes al navegador no crece con el número de resultados. Los
+textos se escapan para que un título con ``<`` o ``&`` no rompa el HTML.
+"""
+
+import html
+import math
+
+import pandas as pd
+
+DEFAULT_PAGE_SIZE = 10
+
+
+def _escaped(values):
+    return values.astype(object).fillna('').astype(str).map(html.escape)
+
+
+def movie_cards_html(movies, detail='year'):
+    """
+    Construir el HTML de una lista de tarjetas de películas
+
+    Args:
+        movies (pd.DataFrame): Películas con title, genres, avg_rating y year/rating_count
+        detail (str): Dato bajo la calificación: 'year' (año) o 'votes' (número de votos)
+
+    Returns:
+        str: HTML de todas las tarjetas
+    """
+    if movies.empty:
+        return ""
+
+    if detail == 'votes':
+        counts = movies['rating_count'] if 'rating_count' in movies.columns else pd.Series(0, index=movies.index)
+        detail_text = '(' + counts.fillna(0).astype('int64').astype(str) + ' votos)'
+    else:
+        years = pd.to_numeric(movies['year'], errors='coerce').round().astype('Int64')
+        detail_text = years.astype(str).where(years.notna(), 'N/A')
+
+    ratings = pd.to_numeric(movies['avg_rating'], errors='coerce').fillna(0).map('{:.1f}'.format)
+
+    # Una columna de texto por película: prefijo fijo + campos + sufijo fijo
+    cards = (
+        '<div class="movie-card">'
+        '<div style="display: flex; justify-content: space-between; align-items: center;">'
+        '<div style="flex: 1;"><h4 style="color: #2c3e50; margin: 0;">'
+        + _escaped(movies['title'])
+        + '</h4><p style="color: #7f8c8d; margin: 5px 0;">'
+        + _escaped(movies['genres'])
+        + '</p></div><div style="text-align: right;">'
+        '<p style="color: #e74c3c; font-weight: bold; margin: 0;">⭐ '
+        + ratings
+        + '</p><p style="color: #95a5a6; font-size: 0.9rem; margin: 0;">'
+        + detail_text.astype(str)
+        + '</p></div></div></div>'
+    )
+    return ''.join(cards.tolist())
+
+
+def page_count(n_items, page_size=DEFAULT_PAGE_SIZE):
+    """Número de páginas necesarias para n_items (al menos una)."""
+    return max(1, math.ceil(n_items / page_size))
+
+
+def paginate(movies, page, page_size=DEFAULT_PAGE_SIZE):
+    """
+    Filas de una página de resultados
+
+    Args:
+        movies (pd.DataFrame): Resultados completos
+        page (int): Número de página, empezando en 1
+        page_size (int): Películas por página
+
+    Returns:
+        pd.DataFrame: Películas de esa página
+    """
+    page = min(max(1, int(page)), page_count(len(movies), page_size))
+    start = (page - 1) * page_size
+    return movies.iloc[start:start + page_size]
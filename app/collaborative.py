@@ -0,0 +1,132 @@
+"""
+Filtrado colaborativo ítem-ítem a partir de ratings.csv
+
+Las calificaciones se guardan en una matriz dispersa usuario × película. A
+cada calificación se le resta el promedio de su usuario (coseno ajustado),
+de modo que dos películas son similares cuando los mismos usuarios las
+valoran por encima (o por debajo) de su media. Los vecinos se calculan por
+bloques con build_neighbor_index, igual que en el motor de contenido.
+"""
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+from .neighbors import build_neighbor_index
+
+RATING_COLUMNS = ['userId', 'movieId', 'rating']
+RATING_DTYPES = {'userId': np.int32, 'movieId': np.int32, 'rating': np.float32}
+
+
+def load_ratings(ratings_path):
+    """
+    Leer las calificaciones con tipos compactos
+
+    Args:
+        ratings_path (str): Ruta a ratings.csv
+
+    Returns:
+        pd.DataFrame: Columnas userId, movieId y rating
+    """
+    return pd.read_csv(ratings_path, usecols=RATING_COLUMNS, dtype=RATING_DTYPES)
+
+
+def build_rating_matrix(ratings_df, movie_ids):
+    """
+    Construir la matriz dispersa usuario × película
+
+    Si un usuario calificó la misma película varias veces vale la última
+    calificación (la de más abajo en el archivo o el registro).
+
+    Args:
+        ratings_df (pd.DataFrame): Calificaciones (userId, movieId, rating)
+        movie_ids (array-like): movieId de cada posición del catálogo; las
+            columnas de la matriz siguen este orden
+
+    Returns:
+        tuple: (scipy.sparse.csr_matrix float32, np.ndarray con los userId de cada fila)
+    """
+    ratings_df = ratings_df.drop_duplicates(['userId', 'movieId'], keep='last')
+    item_positions = pd.Index(np.asarray(movie_ids)).get_indexer(ratings_df['movieId'].to_numpy())
+    known = item_positions >= 0
+    user_ids, user_positions = np.unique(ratings_df['userId'].to_numpy()[known], return_inverse=True)
+
+    matrix = sp.csr_matrix(
+        (ratings_df['rating'].to_numpy(dtype=np.float32)[known], (user_positions, item_positions[known])),
+        shape=(len(user_ids), len(movie_ids)),
+        dtype=np.float32
+    )
+    matrix.sort_indices()
+    return matrix, user_ids
+
+
+class UserRatings:
+    """
+    Calificaciones de cada usuario, consultables por userId
+
+    Args:
+        ratings_df (pd.DataFrame): Calificaciones (userId, movieId, rating)
+        movie_ids (array-like): movieId de cada posición del catálogo
+        ratings_path (str): Archivo del que se leyeron (para saber de dónde vienen)
+    """
+
+    def __init__(self, ratings_df, movie_ids, ratings_path=None):
+        self.matrix, self.user_ids = build_rating_matrix(ratings_df, movie_ids)
+        self.ratings_path = ratings_path
+        self._rows = pd.Index(self.user_ids)
+
+    def __len__(self):
+        return len(self.user_ids)
+
+    def ratings(self, user_id):
+        """
+        Películas calificadas por un usuario
+
+        Args:
+            user_id (int): userId de ratings.csv
+
+        Returns:
+            tuple: (posiciones, calificaciones), o None si el usuario no existe
+        """
+        row = self._rows.get_indexer([user_id])[0]
+        if row < 0:
+            return None
+        start, end = self.matrix.indptr[row], self.matrix.indptr[row + 1]
+        return self.matrix.indices[start:end], self.matrix.data[start:end]
+
+
+def center_by_user(rating_matrix):
+    """
+    Restar a cada calificación el promedio de su usuario
+
+    Args:
+        rating_matrix (scipy.sparse.csr_matrix): Matriz usuario × película
+
+    Returns:
+        scipy.sparse.csr_matrix: Matriz centrada con el mismo patrón de dispersión
+    """
+    rating_matrix = sp.csr_matrix(rating_matrix, dtype=np.float32)
+    counts = np.diff(rating_matrix.indptr)
+    sums = np.asarray(rating_matrix.sum(axis=1)).ravel()
+    means = np.divide(sums, counts, out=np.zeros_like(sums), where=counts > 0)
+
+    centered = rating_matrix.copy()
+    centered.data = centered.data - np.repeat(means, counts).astype(np.float32)
+    return centered
+
+
+def build_item_similarity_index(rating_matrix, k=50, block_size=None, n_jobs=None):
+    """
+    Calcular los K vecinos de cada película con coseno ajustado
+
+    Args:
+        rating_matrix (scipy.sparse.csr_matrix): Matriz usuario × película
+        k (int): Número de vecinos a guardar por película
+        block_size (int): Películas por bloque (None para calcularlo automáticamente)
+        n_jobs (int): Hilos de trabajo (None para usar todos los núcleos)
+
+    Returns:
+        NeighborIndex: Índice de vecinos (solo similitudes positivas)
+    """
+    item_features = center_by_user(rating_matrix).T.tocsr()
+    return build_neighbor_index(item_features, k=k, block_size=block_size, n_jobs=n_jobs)
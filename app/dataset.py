@@ -0,0 +1,285 @@
+"""
+Ingesta del dataset de MovieLens con caché columnar binaria
+
+La primera carga lee movies.csv y ratings.csv, extrae el año, calcula
+``avg_rating``/``rating_count`` y guarda cada columna en un archivo ``.npy``
+con tipos compactos (ids int32, calificaciones float32, géneros como
+categoría). Las cargas siguientes mapean esos archivos en memoria y solo
+reconstruyen la caché cuando cambian los CSV de origen (tamaño o fecha de
+modificación).
+
+Uso:
+    python -m app.dataset [--data-dir "ml-latest-small 2"]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+import pandas as pd
+
+from .metrics import record_cache, timed
+
+# Versión del formato de la caché; cambiarla obliga a reconstruirla
+CACHE_FORMAT_VERSION = 1
+CACHE_DIR = os.path.join(".cache", "dataset")
+# Filas de ratings.csv leídas por bloque durante la ingesta
+DEFAULT_CHUNKSIZE = 1_000_000
+
+NUMERIC_COLUMNS = {
+    'movieId': np.int32,
+    'year': np.float32,
+    'avg_rating': np.float32,
+    'rating_count': np.int32,
+}
+
+
+def source_signature(paths):
+    """
+    Firma de los archivos de origen (tamaño y fecha de modificación)
+
+    Args:
+        paths (list): Rutas de los archivos; los que no existen se registran como None
+
+    Returns:
+        dict: {nombre de archivo: [tamaño, mtime_ns] o None}
+    """
+    signature = {}
+    for path in paths:
+        if os.path.exists(path):
+            stat = os.stat(path)
+            signature[os.path.basename(path)] = [stat.st_size, stat.st_mtime_ns]
+        else:
+            signature[os.path.basename(path)] = None
+    return signature
+
+
+def default_cache_dir(data_dir):
+    """Directorio de caché propio de cada directorio de datos."""
+    key = hashlib.sha1(os.path.abspath(data_dir).encode()).hexdigest()[:12]
+    return os.path.join(CACHE_DIR, key)
+
+
+@timed()
+def aggregate_ratings(ratings_path, chunksize=DEFAULT_CHUNKSIZE):
+    """
+    Calcular promedio y número de calificaciones por película
+
+    Las calificaciones se leen por bloques de ``chunksize`` filas (solo las
+    columnas movieId y rating, en int32/float32) y se acumulan sumas y
+    conteos parciales, de modo que la memoria pico depende del número de
+    películas y no del tamaño de ratings.csv.
+
+    Args:
+        ratings_path (str): Ruta a ratings.csv
+        chunksize (int): Filas por bloque (None para leer el archivo completo)
+
+    Returns:
+        pd.DataFrame: Columnas movieId, avg_rating y rating_count
+    """
+    reader = pd.read_csv(
+        ratings_path, usecols=['movieId', 'rating'],
+        dtype={'movieId': np.int32, 'rating': np.float32},
+        chunksize=chunksize
+    )
+    chunks = [reader] if chunksize is None else reader
+
+    totals = pd.DataFrame(columns=['sum', 'count'], dtype=np.float64)
+    for chunk in chunks:
+        partial = chunk.groupby('movieId')['rating'].agg(['sum', 'count']).astype(np.float64)
+        totals = totals.add(partial, fill_value=0)
+
+    avg_ratings = pd.DataFrame({
+        'movieId': totals.index.to_numpy(dtype=np.int32),
+        'avg_rating': (totals['sum'] / totals['count']).to_numpy(dtype=np.float32),
+        'rating_count': totals['count'].to_numpy(dtype=np.int32),
+    })
+    return avg_ratings
+
+
+@timed()
+def build_movies_frame(movies_path, ratings_path, chunksize=DEFAULT_CHUNKSIZE):
+    """
+    Construir el DataFrame de películas desde los CSV de MovieLens
+
+    Args:
+        movies_path (str): Ruta a movies.csv
+        ratings_path (str): Ruta a ratings.csv (puede no existir)
+        chunksize (int): Filas de ratings.csv por bloque (None para leerlo completo)
+
+    Returns:
+        pd.DataFrame: Películas con year, avg_rating y rating_count en tipos compactos
+    """
+    movies_df = pd.read_csv(movies_path, dtype={'movieId': np.int32, 'title': str, 'genres': str})
+
+    # Extraer año del título
+    movies_df['year'] = pd.to_numeric(
+        movies_df['title'].str.extract(r'\((\d{4})\)', expand=False), errors='coerce'
+    )
+
+    # Calcular rating promedio si existe ratings.csv
+    if os.path.exists(ratings_path):
+        movies_df = movies_df.merge(aggregate_ratings(ratings_path, chunksize), on='movieId', how='left')
+        movies_df['avg_rating'] = movies_df['avg_rating'].fillna(0)
+        movies_df['rating_count'] = movies_df['rating_count'].fillna(0)
+    else:
+        movies_df['avg_rating'] = 0
+        movies_df['rating_count'] = 0
+
+    for column, dtype in NUMERIC_COLUMNS.items():
+        movies_df[column] = movies_df[column].astype(dtype)
+    movies_df['genres'] = movies_df['genres'].fillna('').astype('category')
+    return movies_df
+
+
+@timed()
+def write_dataset_cache(movies_df, cache_dir, signature):
+    """
+    Guardar el DataFrame como columnas binarias
+
+    Se escribe en un directorio temporal que luego reemplaza al anterior, de
+    modo que un lector nunca ve una caché a medio escribir.
+
+    Args:
+        movies_df (pd.DataFrame): DataFrame construido con build_movies_frame
+        cache_dir (str): Directorio de la caché
+        signature (dict): Firma de los archivos de origen
+    """
+    parent = os.path.dirname(os.path.abspath(cache_dir))
+    os.makedirs(parent, exist_ok=True)
+    tmp_dir = f"{cache_dir}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    for column, dtype in NUMERIC_COLUMNS.items():
+        np.save(os.path.join(tmp_dir, f"{column}.npy"), movies_df[column].to_numpy(dtype=dtype))
+
+    # Títulos: texto UTF-8 separado por saltos de línea (los títulos no los contienen)
+    titles = '\n'.join(movies_df['title'].astype(str)).encode('utf-8')
+    np.save(os.path.join(tmp_dir, "title.npy"), np.frombuffer(titles, dtype=np.uint8))
+
+    genres = movies_df['genres'].astype('category')
+    codes_dtype = np.int16 if len(genres.cat.categories) < np.iinfo(np.int16).max else np.int32
+    np.save(os.path.join(tmp_dir, "genres_codes.npy"), genres.cat.codes.to_numpy().astype(codes_dtype))
+
+    meta = {
+        'format_version': CACHE_FORMAT_VERSION,
+        'signature': signature,
+        'n_rows': len(movies_df),
+        'genres_categories': genres.cat.categories.tolist(),
+    }
+    with open(os.path.join(tmp_dir, "meta.json"), 'w', encoding='utf-8') as f:
+        json.dump(meta, f)
+
+    old_dir = f"{cache_dir}.old-{os.getpid()}"
+    if os.path.exists(cache_dir):
+        os.replace(cache_dir, old_dir)
+    os.replace(tmp_dir, cache_dir)
+    shutil.rmtree(old_dir, ignore_errors=True)
+
+
+@timed()
+def read_dataset_cache(cache_dir, signature):
+    """
+    Cargar el DataFrame desde la caché, mapeando las columnas en memoria
+
+    Args:
+        cache_dir (str): Directorio de la caché
+        signature (dict): Firma esperada de los archivos de origen
+
+    Returns:
+        pd.DataFrame: Películas, o None si la caché no existe o está obsoleta
+    """
+    meta_path = os.path.join(cache_dir, "meta.json")
+    try:
+        with open(meta_path, encoding='utf-8') as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if meta.get('format_version') != CACHE_FORMAT_VERSION or meta.get('signature') != signature:
+        return None
+
+    try:
+        columns = {
+            column: np.load(os.path.join(cache_dir, f"{column}.npy"), mmap_mode='r')
+            for column in NUMERIC_COLUMNS
+        }
+        titles = np.load(os.path.join(cache_dir, "title.npy"), mmap_mode='r')
+        codes = np.load(os.path.join(cache_dir, "genres_codes.npy"), mmap_mode='r')
+    except (OSError, ValueError):
+        return None
+
+    title_list = titles.tobytes().decode('utf-8').split('\n') if meta['n_rows'] else []
+    if len(title_list) != meta['n_rows']:
+        return None
+
+    return pd.DataFrame({
+        'movieId': columns['movieId'],
+        'title': title_list,
+        'genres': pd.Categorical.from_codes(np.asarray(codes), categories=meta['genres_categories']),
+        'year': columns['year'],
+        'avg_rating': columns['avg_rating'],
+        'rating_count': columns['rating_count'],
+    }, copy=False)
+
+
+def load_movielens(data_dir, cache_dir=None, use_cache=True, chunksize=DEFAULT_CHUNKSIZE):
+    """
+    Cargar películas de MovieLens usando la caché binaria si está vigente
+
+    Args:
+        data_dir (str): Directorio con movies.csv y ratings.csv
+        cache_dir (str): Directorio de la caché (None para el predeterminado)
+        use_cache (bool): Si es False se leen siempre los CSV
+        chunksize (int): Filas de ratings.csv por bloque al reconstruir
+
+    Returns:
+        pd.DataFrame: Películas, o None si no existe movies.csv
+    """
+    movies_path = os.path.join(data_dir, "movies.csv")
+    ratings_path = os.path.join(data_dir, "ratings.csv")
+    if not os.path.exists(movies_path):
+        return None
+
+    if not use_cache:
+        return build_movies_frame(movies_path, ratings_path, chunksize)
+
+    cache_dir = cache_dir or default_cache_dir(data_dir)
+    signature = source_signature([movies_path, ratings_path])
+    movies_df = read_dataset_cache(cache_dir, signature)
+    record_cache('dataset_binary', movies_df is not None)
+    if movies_df is not None:
+        return movies_df
+
+    movies_df = build_movies_frame(movies_path, ratings_path, chunksize)
+    try:
+        write_dataset_cache(movies_df, cache_dir, signature)
+    except OSError:
+        pass
+    return movies_df
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generar la caché binaria del dataset de MovieLens")
+    parser.add_argument('--data-dir', default="ml-latest-small 2", help="Directorio con los CSV")
+    parser.add_argument('--cache-dir', default=None, help="Directorio de la caché")
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE,
+                        help="Filas de ratings.csv leídas por bloque")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    movies_path = os.path.join(args.data_dir, "movies.csv")
+    ratings_path = os.path.join(args.data_dir, "ratings.csv")
+    movies_df = build_movies_frame(movies_path, ratings_path, args.chunksize)
+    cache_dir = args.cache_dir or default_cache_dir(args.data_dir)
+    write_dataset_cache(movies_df, cache_dir, source_signature([movies_path, ratings_path]))
+    print(f"✅ Caché escrita en {cache_dir}: {len(movies_df):,} películas "
+          f"en {time.perf_counter() - start:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,313 @@
+"""
+Evaluación offline de la calidad de las recomendaciones
+
+Las calificaciones se dividen por fecha: las anteriores al corte (cuantil
+``1 - test_fraction`` de los timestamps) entrenan cada motor y las
+posteriores son la prueba. Para cada usuario con calificaciones en ambos
+lados se recomiendan K películas que no haya visto en entrenamiento y se
+comparan con las que calificó en prueba con al menos ``threshold``
+estrellas (relevantes):
+
+- precision@K: fracción de las K recomendadas que son relevantes.
+- recall@K: fracción de las relevantes que aparecen entre las K.
+- NDCG@K: ganancia acumulada con descuento logarítmico, normalizada por la ideal.
+- coverage: fracción del catálogo que aparece en alguna recomendación.
+
+Los usuarios se puntúan por bloques con operaciones matriciales (un producto
+disperso o denso por bloque) repartidos entre procesos.
+
+Uso:
+    python -m app.evaluation --engines popularity,content,collaborative,als --k 10
+"""
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+from .collaborative import RATING_DTYPES, build_item_similarity_index
+from .factorization import ALSModel
+from .neighbors import DEFAULT_BLOCK_BYTES
+from .utils import DATA_DIR, create_neighbor_index, load_movie_data
+
+EVALUATION_ENGINES = ('popularity', 'content', 'collaborative', 'als')
+DEFAULT_K = 10
+DEFAULT_TEST_FRACTION = 0.2
+DEFAULT_THRESHOLD = 4.0
+
+
+def load_timestamped_ratings(ratings_path):
+    """Leer ratings.csv con timestamp y tipos compactos (la última calificación de cada par)."""
+    dtypes = dict(RATING_DTYPES, timestamp=np.int64)
+    ratings_df = pd.read_csv(ratings_path, usecols=list(dtypes), dtype=dtypes)
+    return ratings_df.drop_duplicates(['userId', 'movieId'], keep='last')
+
+
+def temporal_split(ratings_df, movie_ids, test_fraction=DEFAULT_TEST_FRACTION):
+    """
+    Dividir las calificaciones en entrenamiento y prueba por fecha
+
+    Args:
+        ratings_df (pd.DataFrame): Calificaciones con userId, movieId, rating y timestamp
+        movie_ids (array-like): movieId de cada columna (orden del catálogo)
+        test_fraction (float): Fracción más reciente de calificaciones usada como prueba
+
+    Returns:
+        tuple: (train, test) como csr_matrix usuario × película con las mismas
+        filas, y el timestamp de corte
+    """
+    cutoff = int(np.quantile(ratings_df['timestamp'].to_numpy(), 1.0 - test_fraction))
+    items = pd.Index(np.asarray(movie_ids)).get_indexer(ratings_df['movieId'].to_numpy())
+    known = items >= 0
+    _, users = np.unique(ratings_df['userId'].to_numpy()[known], return_inverse=True)
+    items = items[known]
+    ratings = ratings_df['rating'].to_numpy(dtype=np.float32)[known]
+    is_test = ratings_df['timestamp'].to_numpy()[known] > cutoff
+
+    shape = (int(users.max()) + 1 if len(users) else 0, len(movie_ids))
+    train = sp.csr_matrix((ratings[~is_test], (users[~is_test], items[~is_test])), shape=shape)
+    test = sp.csr_matrix((ratings[is_test], (users[is_test], items[is_test])), shape=shape)
+    train.sum_duplicates()
+    test.sum_duplicates()
+    return train, test, cutoff
+
+
+class PopularityScorer:
+    """Las películas con más calificaciones en entrenamiento, igual para todos."""
+
+    def __init__(self, train):
+        self.counts = np.diff(train.tocsc().indptr).astype(np.float32)
+
+    def score(self, users, train_block):
+        return np.broadcast_to(self.counts, (len(users), len(self.counts))).copy()
+
+
+class ItemItemScorer:
+    """Suma de las similitudes con las películas calificadas, ponderadas por la calificación."""
+
+    def __init__(self, similarity):
+        self.similarity = sp.csr_matrix(similarity, dtype=np.float32)
+
+    def score(self, users, train_block):
+        return (train_block @ self.similarity).toarray()
+
+
+class FactorScorer:
+    """Producto escalar de los factores latentes de usuario y película."""
+
+    def __init__(self, model):
+        self.user_factors = model.user_factors
+        self.item_factors = model.item_factors
+
+    def score(self, users, train_block):
+        return self.user_factors[users] @ self.item_factors.T
+
+
+def fit_scorer(engine, train, movies_df, k_neighbors=50, n_factors=32, n_iterations=10, tags_path=None):
+    """
+    Entrenar un motor con las calificaciones de entrenamiento
+
+    Args:
+        engine (str): 'popularity', 'content', 'collaborative' o 'als'
+        train (scipy.sparse.csr_matrix): Calificaciones de entrenamiento usuario × película
+        movies_df (pd.DataFrame): Catálogo (para las características de contenido)
+        k_neighbors (int): Vecinos por película de los motores ítem-ítem
+        n_factors (int): Factores latentes de ALS
+        n_iterations (int): Iteraciones de ALS
+        tags_path (str): Ruta a tags.csv para el motor de contenido (None para no usar etiquetas)
+
+    Returns:
+        Objeto con un método score(users, train_block)
+    """
+    if engine == 'popularity':
+        return PopularityScorer(train)
+    if engine == 'content':
+        index = create_neighbor_index(movies_df, k=k_neighbors, content_features='hashed', tags_path=tags_path)
+        return ItemItemScorer(index.to_csr())
+    if engine == 'collaborative':
+        return ItemItemScorer(build_item_similarity_index(train, k=k_neighbors).to_csr())
+    if engine == 'als':
+        return FactorScorer(ALSModel(n_factors=n_factors, n_iterations=n_iterations).fit(train))
+    raise ValueError(f"Motor desconocido: {engine}")
+
+
+def evaluate_block(scorer, train, relevant, users, k):
+    """
+    Puntuar un bloque de usuarios y acumular sus métricas
+
+    Args:
+        scorer: Motor entrenado (ver fit_scorer)
+        train (scipy.sparse.csr_matrix): Calificaciones de entrenamiento
+        relevant (scipy.sparse.csr_matrix): Películas relevantes de prueba (1 por película)
+        users (np.ndarray): Filas de los usuarios del bloque
+        k (int): Número de recomendaciones por usuario
+
+    Returns:
+        dict: Sumas de precision, recall y ndcg, número de usuarios y
+        películas recomendadas (únicas)
+    """
+    train_block = train[users]
+    scores = np.asarray(scorer.score(users, train_block), dtype=np.float32)
+    # Excluir lo ya visto en entrenamiento
+    rows = np.repeat(np.arange(len(users)), np.diff(train_block.indptr))
+    scores[rows, train_block.indices] = -np.inf
+
+    k = min(k, scores.shape[1])
+    top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    order = np.argsort(-np.take_along_axis(scores, top, axis=1), axis=1, kind='stable')
+    top = np.take_along_axis(top, order, axis=1)
+    valid = np.isfinite(np.take_along_axis(scores, top, axis=1))
+
+    relevant_block = relevant[users]
+    hits = (np.asarray(relevant_block[np.arange(len(users))[:, None], top].todense()) > 0) & valid
+    n_relevant = np.diff(relevant_block.indptr)
+
+    discounts = 1.0 / np.log2(np.arange(2, k + 2))
+    dcg = (hits * discounts).sum(axis=1)
+    ideal = np.cumsum(discounts)[np.minimum(n_relevant, k) - 1]
+
+    return {
+        'precision': float((hits.sum(axis=1) / k).sum()),
+        'recall': float((hits.sum(axis=1) / n_relevant).sum()),
+        'ndcg': float((dcg / ideal).sum()),
+        'users': len(users),
+        'items': np.unique(top[valid]),
+    }
+
+
+# Estado de cada proceso de trabajo (se fija una vez en el inicializador)
+_worker_state = {}
+
+
+def _init_worker(scorer, train, relevant, k):
+    _worker_state.update(scorer=scorer, train=train, relevant=relevant, k=k)
+
+
+def _evaluate_worker_block(users):
+    state = _worker_state
+    return evaluate_block(state['scorer'], state['train'], state['relevant'], users, state['k'])
+
+
+def evaluate_scorer(scorer, train, test, k=DEFAULT_K, threshold=DEFAULT_THRESHOLD, n_jobs=None,
+                    block_users=None):
+    """
+    Evaluar un motor entrenado sobre todos los usuarios de prueba
+
+    Args:
+        scorer: Motor entrenado (ver fit_scorer)
+        train (scipy.sparse.csr_matrix): Calificaciones de entrenamiento
+        test (scipy.sparse.csr_matrix): Calificaciones de prueba
+        k (int): Número de recomendaciones por usuario
+        threshold (float): Calificación mínima para considerar relevante una película
+        n_jobs (int): Procesos de trabajo (None para todos los núcleos; 1 sin procesos)
+        block_users (int): Usuarios por bloque (None para acotar la memoria del bloque)
+
+    Returns:
+        dict: precision, recall, ndcg, coverage y users evaluados
+    """
+    relevant = test.copy()
+    relevant.data = (relevant.data >= threshold).astype(np.float32)
+    relevant.eliminate_zeros()
+    users = np.flatnonzero((np.diff(relevant.indptr) > 0) & (np.diff(train.indptr) > 0))
+
+    n_items = train.shape[1]
+    if block_users is None:
+        block_users = max(1, DEFAULT_BLOCK_BYTES // (4 * max(n_items, 1)))
+    blocks = [users[start:start + block_users] for start in range(0, len(users), block_users)]
+
+    n_jobs = n_jobs or os.cpu_count() or 1
+    if n_jobs > 1 and len(blocks) > 1:
+        with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker,
+                                 initargs=(scorer, train, relevant, k)) as executor:
+            results = list(executor.map(_evaluate_worker_block, blocks))
+    else:
+        results = [evaluate_block(scorer, train, relevant, block, k) for block in blocks]
+
+    n_users = sum(result['users'] for result in results)
+    recommended = np.unique(np.concatenate([result['items'] for result in results])) if results else []
+    return {
+        'precision': sum(result['precision'] for result in results) / max(n_users, 1),
+        'recall': sum(result['recall'] for result in results) / max(n_users, 1),
+        'ndcg': sum(result['ndcg'] for result in results) / max(n_users, 1),
+        'coverage': len(recommended) / max(n_items, 1),
+        'users': n_users,
+    }
+
+
+def evaluate_engines(movies_df, ratings_path, engines=EVALUATION_ENGINES, k=DEFAULT_K,
+                     test_fraction=DEFAULT_TEST_FRACTION, threshold=DEFAULT_THRESHOLD, n_jobs=None,
+                     block_users=None):
+    """
+    Entrenar y evaluar varios motores con la misma división temporal
+
+    Args:
+        movies_df (pd.DataFrame): Catálogo de películas
+        ratings_path (str): Ruta a ratings.csv (con timestamp); tags.csv se busca en el mismo directorio
+        engines (list): Motores a evaluar
+        k (int): Número de recomendaciones por usuario
+        test_fraction (float): Fracción más reciente de calificaciones usada como prueba
+        threshold (float): Calificación mínima para considerar relevante una película
+        n_jobs (int): Procesos de trabajo para puntuar
+        block_users (int): Usuarios por bloque
+
+    Returns:
+        list: Un diccionario por motor con sus métricas y tiempos (fit_seconds, score_seconds)
+    """
+    train, test, cutoff = temporal_split(
+        load_timestamped_ratings(ratings_path), movies_df['movieId'].to_numpy(), test_fraction
+    )
+    tags_path = os.path.join(os.path.dirname(ratings_path), "tags.csv")
+    report = []
+    for engine in engines:
+        start = time.perf_counter()
+        scorer = fit_scorer(engine, train, movies_df, tags_path=tags_path)
+        fitted = time.perf_counter()
+        metrics = evaluate_scorer(scorer, train, test, k, threshold, n_jobs, block_users)
+        finished = time.perf_counter()
+        report.append({
+            'engine': engine, 'k': k, **metrics,
+            'fit_seconds': fitted - start, 'score_seconds': finished - fitted,
+            'cutoff_timestamp': cutoff,
+        })
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluación offline de los motores de recomendación")
+    parser.add_argument('--data-dir', default=DATA_DIR, help="Directorio con movies.csv y ratings.csv")
+    parser.add_argument('--engines', default=','.join(EVALUATION_ENGINES))
+    parser.add_argument('--k', type=int, default=DEFAULT_K)
+    parser.add_argument('--test-fraction', type=float, default=DEFAULT_TEST_FRACTION)
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="Calificación mínima de una película relevante")
+    parser.add_argument('--n-jobs', type=int, default=None, help="Procesos para puntuar (por defecto todos)")
+    parser.add_argument('--block-users', type=int, default=None, help="Usuarios por bloque")
+    parser.add_argument('--output', default=None, help="Guardar el informe en JSON")
+    args = parser.parse_args()
+
+    movies_df = load_movie_data(data_dir=args.data_dir)
+    ratings_path = os.path.join(args.data_dir, "ratings.csv")
+    report = evaluate_engines(
+        movies_df, ratings_path, engines=args.engines.split(','), k=args.k,
+        test_fraction=args.test_fraction, threshold=args.threshold,
+        n_jobs=args.n_jobs, block_users=args.block_users
+    )
+
+    print(f"{'motor':<14}{'P@K':>8}{'R@K':>8}{'NDCG':>8}{'cobert.':>9}{'usuarios':>10}"
+          f"{'entren. s':>11}{'puntuar s':>11}")
+    for row in report:
+        print(f"{row['engine']:<14}{row['precision']:>8.4f}{row['recall']:>8.4f}{row['ndcg']:>8.4f}"
+              f"{row['coverage']:>9.3f}{row['users']:>10,}{row['fit_seconds']:>11.2f}{row['score_seconds']:>11.2f}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+"""
+Modelo de factores latentes entrenado con ALS (mínimos cuadrados alternos)
+
+Cada usuario y cada película se representan con un vector de
+``n_factors`` dimensiones; la calificación estimada es el promedio global
+más el producto escalar de ambos vectores. El entrenamiento alterna entre
+resolver todos los usuarios con las películas fijas y viceversa, con
+regularización proporcional al número de calificaciones (ALS-WR).
+
+Las filas se resuelven por bloques: las matrices normales de todo un bloque
+se obtienen con un producto disperso y se resuelven con una sola llamada a
+``np.linalg.solve``. Los bloques se reparten entre hilos.
+"""
+
+import copy
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import scipy.sparse as sp
+
+# Calificaciones máximas por bloque (acota la memoria de los productos externos)
+DEFAULT_BLOCK_NNZ = 16384
+
+
+def _row_blocks(indptr, max_nnz):
+    """Dividir las filas en bloques contiguos con como mucho max_nnz entradas."""
+    n_rows = len(indptr) - 1
+    blocks = []
+    start = 0
+    while start < n_rows:
+        end = int(np.searchsorted(indptr, indptr[start] + max_nnz, side='right')) - 1
+        end = min(max(end, start + 1), n_rows)
+        blocks.append((start, end))
+        start = end
+    return blocks
+
+
+def solve_rows(matrix, other_factors, regularization, global_mean=0.0, block=None):
+    """
+    Resolver los factores de un conjunto de filas con los otros factores fijos
+
+    Args:
+        matrix (scipy.sparse.csr_matrix): Calificaciones (filas a resolver × columnas)
+        other_factors (np.ndarray): Factores de las columnas (float32)
+        regularization (float): Regularización por calificación (λ · n_i)
+        global_mean (float): Promedio global que se resta a las calificaciones
+        block (tuple): (inicio, fin) de las filas a resolver (None para todas)
+
+    Returns:
+        np.ndarray: Factores de las filas del bloque (float32)
+    """
+    start, end = block if block is not None else (0, matrix.shape[0])
+    n_factors = other_factors.shape[1]
+    lo, hi = matrix.indptr[start], matrix.indptr[end]
+    columns = matrix.indices[lo:hi]
+    values = matrix.data[lo:hi] - global_mean
+    counts = np.diff(matrix.indptr[start:end + 1])
+    n_rows = end - start
+
+    factors = other_factors[columns]
+    weighted = factors * values[:, None].astype(np.float32)
+    if n_rows == 1:
+        # Una sola fila (p. ej. una película muy calificada): producto matricial directo
+        gram = (factors.T @ factors)[None]
+        rhs = weighted.sum(axis=0)[None]
+    else:
+        # Matriz indicadora fila ← calificación para sumar por segmentos con un producto disperso
+        owners = np.repeat(np.arange(n_rows), counts)
+        indicator = sp.csr_matrix(
+            (np.ones(len(columns), dtype=np.float32), (owners, np.arange(len(columns)))),
+            shape=(n_rows, len(columns))
+        )
+        outer = (factors[:, :, None] * factors[:, None, :]).reshape(len(columns), -1)
+        gram = np.asarray(indicator @ outer).reshape(n_rows, n_factors, n_factors)
+        rhs = np.asarray(indicator @ weighted)
+
+    gram += (regularization * np.maximum(counts, 1))[:, None, None] * np.eye(n_factors, dtype=np.float32)
+    return np.linalg.solve(gram, rhs[:, :, None])[:, :, 0].astype(np.float32)
+
+
+class ALSModel:
+    """
+    Factorización de la matriz usuario × película con ALS
+
+    Args:
+        n_factors (int): Dimensión de los vectores latentes
+        regularization (float): Regularización (λ)
+        n_iterations (int): Iteraciones de ALS (cada una resuelve usuarios y películas)
+        n_jobs (int): Hilos de trabajo (None para usar todos los núcleos)
+        block_nnz (int): Calificaciones máximas por bloque
+        random_state (int): Semilla para la inicialización
+    """
+
+    def __init__(self, n_factors=32, regularization=0.05, n_iterations=10, n_jobs=None,
+                 block_nnz=DEFAULT_BLOCK_NNZ, random_state=0):
+        self.n_factors = n_factors
+        self.regularization = regularization
+        self.n_iterations = n_iterations
+        self.n_jobs = n_jobs
+        self.block_nnz = block_nnz
+        self.random_state = random_state
+        self.global_mean = 0.0
+        self.user_factors = None
+        self.item_factors = None
+
+    def _solve_all(self, matrix, other_factors, executor):
+        blocks = _row_blocks(matrix.indptr, self.block_nnz)
+
+        def solve(block):
+            return solve_rows(matrix, other_factors, self.regularization, self.global_mean, block)
+
+        if executor is None:
+            return np.vstack([solve(block) for block in blocks])
+        return np.vstack(list(executor.map(solve, blocks)))
+
+    def fit(self, rating_matrix):
+        """
+        Entrenar el modelo
+
+        Args:
+            rating_matrix (scipy.sparse.csr_matrix): Matriz usuario × película
+
+        Returns:
+            ALSModel: El propio modelo entrenado
+        """
+        by_user = sp.csr_matrix(rating_matrix, dtype=np.float32)
+        by_user.sum_duplicates()
+        by_item = by_user.T.tocsr()
+        self.global_mean = float(by_user.data.mean()) if by_user.nnz else 0.0
+
+        rng = np.random.default_rng(self.random_state)
+        scale = 1.0 / np.sqrt(self.n_factors)
+        self.user_factors = (rng.standard_normal((by_user.shape[0], self.n_factors)) * scale).astype(np.float32)
+        self.item_factors = (rng.standard_normal((by_user.shape[1], self.n_factors)) * scale).astype(np.float32)
+
+        n_jobs = self.n_jobs or os.cpu_count() or 1
+        executor = ThreadPoolExecutor(max_workers=n_jobs) if n_jobs > 1 else None
+        try:
+            for _ in range(self.n_iterations):
+                self.user_factors = self._solve_all(by_user, self.item_factors, executor)
+                self.item_factors = self._solve_all(by_item, self.user_factors, executor)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+        return self
+
+    def quantize(self, dtype='int8'):
+        """
+        Copia del modelo con los factores cuantizados (ver app/quantization.py)
+
+        Los factores se descuantizan al vuelo al puntuar o al incorporar un
+        usuario; el modelo cuantizado no se debe volver a entrenar.
+
+        Args:
+            dtype (str): 'float16' o 'int8' (con una escala por fila)
+
+        Returns:
+            ALSModel: Modelo con item_factors y user_factors cuantizados
+        """
+        from .quantization import QuantizedMatrix
+
+        quantized = copy.copy(self)
+        quantized.item_factors = QuantizedMatrix.quantize(self.item_factors, dtype)
+        quantized.user_factors = QuantizedMatrix.quantize(self.user_factors, dtype)
+        return quantized
+
+    def fold_in(self, item_positions, ratings):
+        """
+        Calcular el vector de un usuario nuevo sin reentrenar
+
+        Args:
+            item_positions (array-like): Posiciones de las películas calificadas
+            ratings (array-like): Calificaciones correspondientes
+
+        Returns:
+            np.ndarray: Vector latente del usuario (float32)
+        """
+        item_positions = np.asarray(item_positions, dtype=np.int64)
+        matrix = sp.csr_matrix(
+            (np.asarray(ratings, dtype=np.float32), item_positions, [0, len(item_positions)]),
+            shape=(1, self.item_factors.shape[0])
+        )
+        return solve_rows(matrix, self.item_factors, self.regularization, self.global_mean)[0]
+
+    def score(self, user_vector):
+        """
+        Calificación estimada de todas las películas para un usuario
+
+        Args:
+            user_vector (np.ndarray): Vector latente del usuario
+
+        Returns:
+            np.ndarray: Calificación estimada por película (float32)
+        """
+        return self.item_factors @ np.asarray(user_vector, dtype=np.float32) + np.float32(self.global_mean)
+
+    def recommend(self, user_vector, k=10, exclude=None):
+        """
+        Las K películas con mayor calificación estimada
+
+        Args:
+            user_vector (np.ndarray): Vector latente del usuario
+            k (int): Número de películas a devolver
+            exclude (array-like): Posiciones a excluir (p. ej. ya calificadas)
+
+        Returns:
+            tuple: (posiciones, calificaciones estimadas) de mayor a menor
+        """
+        scores = self.score(user_vector)
+        if exclude is not None and len(exclude):
+            scores[np.asarray(exclude, dtype=np.int64)] = -np.inf
+        k = min(k, int(np.isfinite(scores).sum()))
+        if k <= 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+        top = np.argpartition(-scores, k - 1)[:k]
+        order = np.argsort(-scores[top], kind='stable')
+        return top[order], scores[top[order]]
@@ -0,0 +1,250 @@
+"""
+Características de contenido con hashing: géneros, etiquetas y títulos
+
+Cada película se describe con tres fuentes de tokens:
+
+- Géneros de movies.csv (``genre:comedy``).
+- Etiquetas de usuarios de tags.csv (``tag:pixar``), ponderadas por cuántas
+  veces se asignaron (log(1 + n)).
+- Palabras del título sin el año ni palabras vacías (``title:toy``).
+
+Los tokens se proyectan en un espacio fijo de ``n_features`` columnas con
+un hash estable (CRC32), así que no hay vocabulario que ajustar: tags.csv se
+lee por trozos y las películas o etiquetas nuevas se suman a las filas
+existentes sin recalcular nada. Los pesos IDF y la normalización se aplican
+al final, en ``matrix``, a partir de frecuencias que también son sumables.
+"""
+
+import os
+import re
+import zlib
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+N_FEATURES = 2 ** 18
+# Peso de cada fuente en la similitud (cada bloque se normaliza antes de sumarlo)
+FEATURE_WEIGHTS = {'genre': 1.0, 'tag': 1.0, 'title': 0.5}
+TAG_CHUNK_SIZE = 100_000
+NO_GENRES = "(no genres listed)"
+TITLE_STOPWORDS = frozenset({
+    'a', 'an', 'and', 'at', 'by', 'for', 'from', 'in', 'of', 'on', 'or', 'the', 'to', 'with',
+    'de', 'del', 'el', 'la', 'las', 'le', 'les', 'los', 'un', 'une', 'der', 'die', 'das',
+})
+
+_YEAR_SUFFIX = re.compile(r"\s*\(\d{4}(?:[-–]\d{0,4})?\)\s*$")
+_WORD = re.compile(r"[^\W_]+")
+
+
+def hash_tokens(tokens, n_features=N_FEATURES):
+    """
+    Columna de cada token en el espacio de hashing
+
+    El hash se calcula una vez por token distinto; CRC32 da el mismo
+    resultado en cualquier proceso (a diferencia de ``hash``).
+
+    Args:
+        tokens (array-like): Tokens (str)
+        n_features (int): Número de columnas
+
+    Returns:
+        np.ndarray: Columna de cada token (int32)
+    """
+    codes, uniques = pd.factorize(pd.Series(tokens, dtype=object))
+    hashes = np.fromiter(
+        (zlib.crc32(token.encode('utf-8')) for token in uniques), dtype=np.uint32, count=len(uniques)
+    )
+    return (hashes % n_features).astype(np.int32)[codes]
+
+
+def genre_tokens(genres):
+    """
+    Tokens de género de cada película
+
+    Args:
+        genres (pd.Series): Géneros separados por '|'
+
+    Returns:
+        tuple: (posición de la película, token) de cada par
+    """
+    exploded = genres.astype(object).fillna('').str.split('|').explode()
+    exploded = exploded[(exploded != '') & (exploded != NO_GENRES)]
+    positions = np.asarray(exploded.index, dtype=np.int64)
+    return positions, ('genre:' + exploded.str.lower()).to_numpy()
+
+
+def title_tokens(titles):
+    """
+    Palabras de cada título, sin el año final ni palabras vacías
+
+    Args:
+        titles (pd.Series): Títulos (p. ej. "Matrix, The (1999)")
+
+    Returns:
+        tuple: (posición de la película, token) de cada par
+    """
+    words = titles.astype(object).fillna('').str.replace(_YEAR_SUFFIX, '', regex=True)
+    exploded = words.str.lower().str.findall(_WORD).explode().dropna()
+    exploded = exploded[(exploded.str.len() > 1) & ~exploded.isin(TITLE_STOPWORDS)]
+    positions = np.asarray(exploded.index, dtype=np.int64)
+    return positions, ('title:' + exploded).to_numpy()
+
+
+def normalize_tags(tags):
+    """Etiquetas en minúsculas y sin espacios sobrantes (vacías → NaN)."""
+    tags = tags.astype(object).fillna('').astype(str).str.strip().str.lower()
+    return tags.str.replace(r"\s+", " ", regex=True).replace('', np.nan)
+
+
+def iter_tag_chunks(tags_path, chunksize=TAG_CHUNK_SIZE):
+    """
+    Leer tags.csv por trozos (memoria acotada)
+
+    Args:
+        tags_path (str): Ruta a tags.csv
+        chunksize (int): Filas por trozo
+
+    Yields:
+        pd.DataFrame: Columnas movieId y tag
+    """
+    yield from pd.read_csv(
+        tags_path, usecols=['movieId', 'tag'], dtype={'movieId': np.int64, 'tag': object}, chunksize=chunksize
+    )
+
+
+def _idf_weighted(block, n_items):
+    """Aplicar IDF suavizado por columna y normalizar las filas a norma 1."""
+    block = block.tocsr(copy=True)
+    document_frequency = np.bincount(block.indices, minlength=block.shape[1])
+    idf = np.log((1.0 + n_items) / (1.0 + document_frequency)) + 1.0
+    block.data = block.data * idf[block.indices].astype(np.float32)
+    norms = np.sqrt(np.asarray(block.multiply(block).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    return sp.diags((1.0 / norms).astype(np.float32)).dot(block).tocsr()
+
+
+class HashedFeatures:
+    """
+    Características de contenido acumuladas con hashing
+
+    Las filas siguen el orden en que se añadieron las películas (el de
+    movies_df si se construye con build_hashed_features).
+
+    Args:
+        n_features (int): Columnas del espacio de hashing
+    """
+
+    def __init__(self, n_features=N_FEATURES):
+        self.n_features = int(n_features)
+        self.movie_ids = np.zeros(0, dtype=np.int64)
+        self._positions = pd.Index(self.movie_ids)
+        empty = sp.csr_matrix((0, self.n_features), dtype=np.float32)
+        self.genres = empty
+        self.titles = empty
+        self.tag_counts = empty
+
+    @property
+    def n_items(self):
+        return len(self.movie_ids)
+
+    @property
+    def nbytes(self):
+        return sum(block.data.nbytes + block.indices.nbytes + block.indptr.nbytes
+                   for block in (self.genres, self.titles, self.tag_counts))
+
+    def _token_matrix(self, positions, tokens, n_rows, weights=None):
+        columns = hash_tokens(tokens, self.n_features)
+        data = np.ones(len(columns), dtype=np.float32) if weights is None else np.asarray(weights, dtype=np.float32)
+        # Los pares repetidos (misma película y columna) se suman
+        return sp.csr_matrix((data, (positions, columns)), shape=(n_rows, self.n_features))
+
+    def add_movies(self, movies_df):
+        """
+        Añadir películas nuevas al final (las que ya existen se ignoran)
+
+        Args:
+            movies_df (pd.DataFrame): Películas con movieId, title y genres
+        """
+        new_movies = movies_df[~movies_df['movieId'].isin(self._positions)]
+        new_movies = new_movies.drop_duplicates('movieId').reset_index(drop=True)
+        n_new = len(new_movies)
+        if n_new == 0:
+            return
+
+        genres = self._token_matrix(*genre_tokens(new_movies['genres']), n_new)
+        if 'title' in new_movies.columns:
+            titles = self._token_matrix(*title_tokens(new_movies['title']), n_new)
+        else:
+            titles = sp.csr_matrix((n_new, self.n_features), dtype=np.float32)
+
+        self.genres = sp.vstack([self.genres, genres], format='csr')
+        self.titles = sp.vstack([self.titles, titles], format='csr')
+        self.tag_counts = sp.vstack(
+            [self.tag_counts, sp.csr_matrix((n_new, self.n_features), dtype=np.float32)], format='csr'
+        )
+        self.movie_ids = np.concatenate([self.movie_ids, new_movies['movieId'].to_numpy(dtype=np.int64)])
+        self._positions = pd.Index(self.movie_ids)
+
+    def add_tags(self, tags_df):
+        """
+        Sumar asignaciones de etiquetas (las de películas desconocidas se ignoran)
+
+        Args:
+            tags_df (pd.DataFrame): Columnas movieId y tag (una fila por asignación)
+
+        Returns:
+            int: Asignaciones sumadas
+        """
+        tags = normalize_tags(tags_df['tag'])
+        positions = self._positions.get_indexer(tags_df['movieId'])
+        keep = (positions >= 0) & tags.notna().to_numpy()
+        if not keep.any():
+            return 0
+        counts = self._token_matrix(positions[keep], ('tag:' + tags[keep]).to_numpy(), self.n_items)
+        self.tag_counts = (self.tag_counts + counts).tocsr()
+        return int(keep.sum())
+
+    def matrix(self, weights=FEATURE_WEIGHTS):
+        """
+        Matriz de características lista para la similitud coseno
+
+        Cada fuente se pondera con IDF (calculado sobre las películas
+        actuales), se normaliza por fila y se multiplica por su peso. Las
+        etiquetas usan log(1 + veces asignada).
+
+        Args:
+            weights (dict): Peso de 'genre', 'tag' y 'title'
+
+        Returns:
+            scipy.sparse.csr_matrix: Características (filas = películas)
+        """
+        tags = self.tag_counts.copy()
+        tags.data = np.log1p(tags.data)
+        combined = sp.csr_matrix((self.n_items, self.n_features), dtype=np.float32)
+        for name, block in (('genre', self.genres), ('tag', tags), ('title', self.titles)):
+            weight = weights.get(name, 0.0)
+            if weight and block.nnz:
+                combined = combined + weight * _idf_weighted(block, self.n_items)
+        return combined.tocsr()
+
+
+def build_hashed_features(movies_df, tags_path=None, n_features=N_FEATURES, chunksize=TAG_CHUNK_SIZE):
+    """
+    Construir las características de contenido de un catálogo
+
+    Args:
+        movies_df (pd.DataFrame): Películas con movieId, title y genres
+        tags_path (str): Ruta a tags.csv (None o inexistente para no usar etiquetas)
+        n_features (int): Columnas del espacio de hashing
+        chunksize (int): Filas de tags.csv leídas a la vez
+
+    Returns:
+        HashedFeatures: Características alineadas con las filas de movies_df
+    """
+    features = HashedFeatures(n_features)
+    features.add_movies(movies_df)
+    if tags_path and os.path.exists(tags_path):
+        for chunk in iter_tag_chunks(tags_path, chunksize):
+            features.add_tags(chunk)
+    return features
@@ -0,0 +1,139 @@
+"""
+Índice de géneros como máscaras de bits
+
+La columna ``genres`` ("Action|Adventure|Sci-Fi") se analiza una sola vez:
+cada género del vocabulario ocupa un bit y cada película guarda sus géneros
+como una máscara ``uint64`` (varias palabras si hubiera más de 64 géneros).
+Los filtros Y/O/NO se resuelven con operaciones de bits vectorizadas y la
+distribución de géneros es una suma por columnas sobre las combinaciones de
+géneros distintas, ponderadas por su frecuencia.
+"""
+
+import numpy as np
+import pandas as pd
+
+BITS_PER_WORD = 64
+
+
+class GenreIndex:
+    """
+    Géneros de cada película codificados como máscaras de bits
+
+    Args:
+        movies_df (pd.DataFrame): DataFrame con la columna genres
+    """
+
+    def __init__(self, movies_df):
+        # Analizar cada cadena de géneros distinta una sola vez
+        genres = movies_df['genres'].astype('category')
+        categories = genres.cat.categories.astype(str).tolist()
+        parsed = [[genre.strip() for genre in value.split('|') if genre.strip()] for value in categories]
+
+        self.vocabulary = sorted({genre for genre_list in parsed for genre in genre_list})
+        self._positions = {genre: i for i, genre in enumerate(self.vocabulary)}
+        self._lower = {genre.lower(): genre for genre in self.vocabulary}
+        self.n_words = max(1, -(-len(self.vocabulary) // BITS_PER_WORD))
+
+        category_masks = np.zeros((len(categories) + 1, self.n_words), dtype=np.uint64)
+        for code, genre_list in enumerate(parsed):
+            category_masks[code] = self.mask_of(genre_list)
+        # El código -1 (géneros vacíos) apunta a la última fila, sin bits
+        codes = genres.cat.codes.to_numpy()
+        self._codes = np.where(codes >= 0, codes, len(categories))
+        self._category_masks = category_masks
+        self.masks = category_masks[self._codes]
+
+    def __len__(self):
+        return len(self.masks)
+
+    def mask_of(self, genre_list):
+        """
+        Máscara de bits de una lista de géneros del vocabulario
+
+        Args:
+            genre_list (list): Nombres exactos de géneros
+
+        Returns:
+            np.ndarray: Máscara de n_words palabras uint64
+        """
+        mask = np.zeros(self.n_words, dtype=np.uint64)
+        for genre in genre_list:
+            position = self._positions[genre]
+            mask[position // BITS_PER_WORD] |= np.uint64(1) << np.uint64(position % BITS_PER_WORD)
+        return mask
+
+    def resolve(self, name):
+        """
+        Géneros del vocabulario que corresponden a un nombre
+
+        Se busca primero el nombre exacto (sin distinguir mayúsculas) y, si no
+        existe, todos los géneros que lo contienen ("sci" → "Sci-Fi").
+
+        Args:
+            name (str): Nombre o parte del nombre de un género
+
+        Returns:
+            list: Géneros del vocabulario (vacía si no hay coincidencias)
+        """
+        name = name.strip().lower()
+        if name in self._lower:
+            return [self._lower[name]]
+        return [genre for genre in self.vocabulary if name and name in genre.lower()]
+
+    def select(self, any_of=None, all_of=None, none_of=None):
+        """
+        Filtrar películas combinando condiciones de géneros
+
+        Args:
+            any_of (list): La película tiene al menos uno de estos géneros
+            all_of (list): La película tiene todos estos géneros
+            none_of (list): La película no tiene ninguno de estos géneros
+
+        Returns:
+            np.ndarray: Máscara booleana por película
+        """
+        selected = np.ones(len(self.masks), dtype=bool)
+        if any_of is not None:
+            query = self.mask_of(any_of)
+            selected &= ((self.masks & query) != 0).any(axis=1)
+        if all_of:
+            query = self.mask_of(all_of)
+            selected &= ((self.masks & query) == query).all(axis=1)
+        if none_of:
+            query = self.mask_of(none_of)
+            selected &= ((self.masks & query) == 0).all(axis=1)
+        return selected
+
+    def _unpack(self, masks):
+        """Convertir máscaras de bits en una matriz booleana fila × género."""
+        as_bytes = np.ascontiguousarray(masks, dtype='<u8').view(np.uint8).reshape(len(masks), -1)
+        bits = np.unpackbits(as_bytes, axis=1, bitorder='little')
+        return bits[:, :len(self.vocabulary)].astype(bool)
+
+    def membership(self):
+        """
+        Matriz booleana película × género
+
+        Returns:
+            np.ndarray: Matriz (n_películas, len(vocabulary))
+        """
+        return self._unpack(self.masks)
+
+    def counts(self, selected=None):
+        """
+        Número de películas por género
+
+        Args:
+            selected (np.ndarray): Máscara booleana de películas a contar (None para todas)
+
+        Returns:
+            pd.Series: Conteo por género, de mayor a menor
+        """
+        # Películas por combinación de géneros × géneros de cada combinación
+        codes = self._codes if selected is None else self._codes[selected]
+        frequency = np.bincount(codes, minlength=len(self._category_masks))
+        totals = frequency @ self._unpack(self._category_masks).astype(np.int64)
+        counts = pd.Series(totals, index=self.vocabulary, name='count')
+        counts = counts[counts > 0].sort_values(ascending=False, kind='stable')
+        counts.index.name = None
+        return counts
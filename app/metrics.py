@@ -0,0 +1,265 @@
+"""
+Registro de métricas de rendimiento (latencias, contadores y tamaños)
+
+Instrumentación ligera para saber dónde se va el tiempo: latencia por
+función (histogramas), número de llamadas, aciertos/fallos de las cachés y
+tamaño de los resultados. Está desactivada por defecto; se activa con la
+variable de entorno ``MOVIE_RECOMMENDER_METRICS=1`` o con ``enable()``.
+Desactivada, cada función instrumentada solo añade una comprobación de un
+booleano.
+
+Los datos se exportan como diccionario/JSON (``snapshot``) o en el formato
+de texto de Prometheus (``to_prometheus``).
+"""
+
+import bisect
+import functools
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import numpy as np
+
+# Límites superiores de los cubos de los histogramas de latencia (ms)
+LATENCY_BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+# Límites de los cubos de tamaño (bytes o filas): potencias de 4
+SIZE_BUCKETS = tuple(4 ** exponent for exponent in range(16))
+
+_enabled = os.environ.get('MOVIE_RECOMMENDER_METRICS', '').lower() in ('1', 'true', 'yes', 'on')
+
+
+class Histogram:
+    """
+    Histograma acumulativo con cubos fijos
+
+    Args:
+        buckets (tuple): Límites superiores de los cubos, de menor a mayor
+    """
+
+    def __init__(self, buckets):
+        self.buckets = tuple(float(bound) for bound in buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def quantile(self, q):
+        """Estimar un cuantil como el límite superior del cubo que lo contiene."""
+        if self.count == 0:
+            return 0.0
+        position = int(np.searchsorted(np.cumsum(self.counts), q * self.count, side='left'))
+        return self.buckets[position] if position < len(self.buckets) else self.max
+
+    def to_dict(self):
+        return {
+            'count': self.count,
+            'sum': self.total,
+            'mean': self.total / self.count if self.count else 0.0,
+            'p50': self.quantile(0.5),
+            'p95': self.quantile(0.95),
+            'p99': self.quantile(0.99),
+            'max': self.max,
+        }
+
+
+class MetricsRegistry:
+    """Contadores e histogramas identificados por nombre y etiquetas."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+
+    def increment(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, value, buckets=LATENCY_BUCKETS_MS, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(buckets)
+            histogram.observe(value)
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def snapshot(self):
+        """
+        Copia de todas las métricas
+
+        Returns:
+            dict: {'counters': [...], 'histograms': [...]}, cada elemento con
+            name, labels y su valor o resumen
+        """
+        with self._lock:
+            counters = [
+                {'name': name, 'labels': dict(labels), 'value': value}
+                for (name, labels), value in sorted(self._counters.items())
+            ]
+            histograms = [
+                {'name': name, 'labels': dict(labels), **histogram.to_dict()}
+                for (name, labels), histogram in sorted(self._histograms.items())
+            ]
+        return {'counters': counters, 'histograms': histograms}
+
+    def to_prometheus(self, prefix="movie_recommender"):
+        """
+        Métricas en el formato de texto de Prometheus
+
+        Returns:
+            str: Una línea por serie (contadores e histogramas con _bucket/_sum/_count)
+        """
+        def format_labels(labels, extra=()):
+            pairs = list(labels) + list(extra)
+            if not pairs:
+                return ""
+            escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"') for _, value in pairs)
+            return "{" + ",".join(f'{key}="{value}"' for (key, _), value in zip(pairs, escaped)) + "}"
+
+        lines = []
+        with self._lock:
+            for name in sorted({name for name, _ in self._counters}):
+                lines.append(f"# TYPE {prefix}_{name} counter")
+                for (series, labels), value in sorted(self._counters.items()):
+                    if series == name:
+                        lines.append(f"{prefix}_{name}{format_labels(labels)} {value}")
+            for name in sorted({name for name, _ in self._histograms}):
+                lines.append(f"# TYPE {prefix}_{name} histogram")
+                for (series, labels), histogram in sorted(self._histograms.items()):
+                    if series != name:
+                        continue
+                    cumulative = np.cumsum(histogram.counts)
+                    for bound, count in zip(histogram.buckets, cumulative):
+                        lines.append(f"{prefix}_{name}_bucket{format_labels(labels, [('le', f'{bound:g}')])} {count}")
+                    lines.append(f"{prefix}_{name}_bucket{format_labels(labels, [('le', '+Inf')])} {histogram.count}")
+                    lines.append(f"{prefix}_{name}_sum{format_labels(labels)} {histogram.total}")
+                    lines.append(f"{prefix}_{name}_count{format_labels(labels)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+
+def enabled():
+    return _enabled
+
+
+def enable(flag=True):
+    """Activar (o desactivar) la instrumentación en tiempo de ejecución."""
+    global _enabled
+    _enabled = bool(flag)
+
+
+def timed(name=None):
+    """
+    Decorador que registra la latencia y el número de llamadas de una función
+
+    Args:
+        name (str): Nombre de la métrica (por defecto el de la función)
+    """
+    def decorator(function):
+        label = name or function.__name__
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return function(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                registry.observe('function_latency_ms', (time.perf_counter() - start) * 1000.0, function=label)
+                registry.increment('function_calls_total', function=label)
+        return wrapper
+    return decorator
+
+
+@contextmanager
+def timer(name, **labels):
+    """Medir un bloque de código (p. ej. el renderizado de una página)."""
+    if not _enabled:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        registry.observe(f'{name}_latency_ms', (time.perf_counter() - start) * 1000.0, **labels)
+
+
+def record_latency(name, seconds, **labels):
+    """Registrar una duración medida fuera de timed/timer."""
+    if _enabled:
+        registry.observe(f'{name}_latency_ms', seconds * 1000.0, **labels)
+
+
+def increment(name, value=1, **labels):
+    """Sumar a un contador (p. ej. peticiones por ruta y estado)."""
+    if _enabled:
+        registry.increment(name, value, **labels)
+
+
+def record_cache(cache, hit):
+    """Contar un acierto o un fallo de una caché."""
+    if _enabled:
+        registry.increment('cache_hits_total' if hit else 'cache_misses_total', cache=cache)
+
+
+def record_size(payload, size):
+    """Registrar el tamaño de un resultado (filas o bytes, según el nombre)."""
+    if _enabled:
+        registry.observe('payload_size', size, buckets=SIZE_BUCKETS, payload=payload)
+
+
+def cache_summary():
+    """
+    Aciertos y fallos por caché
+
+    Returns:
+        list: Un diccionario por caché con hits, misses y hit_rate
+    """
+    totals = {}
+    for counter in registry.snapshot()['counters']:
+        if counter['name'] in ('cache_hits_total', 'cache_misses_total'):
+            entry = totals.setdefault(counter['labels'].get('cache'), {'hits': 0, 'misses': 0})
+            entry['hits' if counter['name'] == 'cache_hits_total' else 'misses'] += counter['value']
+    return [
+        {'cache': cache, **counts, 'hit_rate': counts['hits'] / (counts['hits'] + counts['misses'])}
+        for cache, counts in sorted(totals.items())
+    ]
+
+
+def latency_summary():
+    """
+    Resumen de latencias por función para mostrarlo en una tabla
+
+    Returns:
+        list: Un diccionario por función con calls, mean/p50/p95/p99/max (ms) y total_ms
+    """
+    rows = []
+    for histogram in registry.snapshot()['histograms']:
+        if histogram['name'] != 'function_latency_ms':
+            continue
+        rows.append({
+            'function': histogram['labels'].get('function'),
+            'calls': histogram['count'],
+            'mean_ms': histogram['mean'],
+            'p50_ms': histogram['p50'],
+            'p95_ms': histogram['p95'],
+            'p99_ms': histogram['p99'],
+            'max_ms': histogram['max'],
+            'total_ms': histogram['sum'],
+        })
+    return sorted(rows, key=lambda row: row['total_ms'], reverse=True)
@@ -0,0 +1,473 @@
+"""
+Índice de vecinos más cercanos para el sistema de recomendación
+
+En lugar de guardar la matriz de similitud completa (N×N), se guardan solo
+los K vecinos más similares de cada película en arreglos compactos al estilo
+CSR: ``indptr`` delimita la fila de cada película dentro de ``indices``
+(posiciones de los vecinos) y ``scores`` (similitudes ordenadas de mayor a
+menor). Las similitudes se pueden guardar cuantizadas (float16, o int8 con
+una escala por fila; ver app/quantization.py) y se descuantizan al leerlas.
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+# Memoria máxima aproximada de un bloque denso de similitudes (bytes)
+DEFAULT_BLOCK_BYTES = 64 * 1024 * 1024
+
+
+class NeighborIndex:
+    """
+    Vecinos más similares de cada película en formato CSR
+
+    Args:
+        indptr (np.ndarray): Inicio de la fila de cada película (n_items + 1)
+        indices (np.ndarray): Posiciones de los vecinos (int32)
+        scores (np.ndarray): Similitud de cada vecino (float32, o float16/int8 cuantizadas)
+        k (int): Número máximo de vecinos por película
+        scales (np.ndarray): Escala de cada fila si scores es int8 (None en otro caso)
+    """
+
+    def __init__(self, indptr, indices, scores, k, scales=None):
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int32)
+        scores = np.asarray(scores)
+        self.scores = scores if scores.dtype in (np.float16, np.int8) else scores.astype(np.float32, copy=False)
+        self.scales = None if scales is None else np.asarray(scales, dtype=np.float32)
+        self.k = int(k)
+
+    @property
+    def n_items(self):
+        return len(self.indptr) - 1
+
+    @property
+    def score_dtype(self):
+        """Tipo con el que se guardan las similitudes ('float32', 'float16' o 'int8')."""
+        return str(self.scores.dtype)
+
+    @property
+    def nbytes(self):
+        scales = 0 if self.scales is None else self.scales.nbytes
+        return self.indptr.nbytes + self.indices.nbytes + self.scores.nbytes + scales
+
+    def __len__(self):
+        return self.n_items
+
+    def to_arrays(self):
+        """Arreglos que representan el índice (para guardarlo en disco)."""
+        arrays = {
+            'indptr': self.indptr,
+            'indices': self.indices,
+            'scores': self.scores,
+            'k': np.array(self.k),
+        }
+        if self.scales is not None:
+            arrays['scales'] = self.scales
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        """Reconstruir el índice a partir de los arreglos de to_arrays."""
+        scales = arrays['scales'] if 'scales' in arrays else None
+        return cls(arrays['indptr'], arrays['indices'], arrays['scores'], int(arrays['k']), scales)
+
+    def quantize(self, dtype='int8'):
+        """
+        Copia del índice con las similitudes cuantizadas
+
+        Args:
+            dtype (str): 'float16' o 'int8' (con una escala por fila)
+
+        Returns:
+            NeighborIndex: Índice con los mismos vecinos y en el mismo orden
+        """
+        from .quantization import quantize_segments
+
+        codes, scales = quantize_segments(self.score_values(), self.indptr, dtype)
+        return NeighborIndex(self.indptr, self.indices, codes, self.k, scales)
+
+    def score_values(self, offsets=None, rows=None):
+        """
+        Similitudes descuantizadas (float32)
+
+        Args:
+            offsets (np.ndarray): Posiciones dentro de scores (None para todas)
+            rows (np.ndarray): Fila de cada posición (o de cada fila de offsets);
+                None para deducirla de indptr
+
+        Returns:
+            np.ndarray: Similitudes con la forma de offsets
+        """
+        if offsets is None:
+            offsets = np.arange(len(self.scores))
+        values = self.scores[offsets].astype(np.float32)
+        if self.scales is not None:
+            if rows is None:
+                rows = np.searchsorted(self.indptr, offsets, side='right') - 1
+            scales = self.scales[rows]
+            values *= scales[:, None] if values.ndim > scales.ndim else scales
+        return values
+
+    def neighbors(self, row):
+        """
+        Obtener los vecinos de una película
+
+        Args:
+            row (int): Posición de la película en el DataFrame
+
+        Returns:
+            tuple: (posiciones, similitudes) ordenadas de mayor a menor
+        """
+        start, end = self.indptr[row], self.indptr[row + 1]
+        scores = self.scores[start:end].astype(np.float32, copy=False)
+        if self.scales is not None:
+            scores = scores * self.scales[row]
+        return self.indices[start:end], scores
+
+    def to_csr(self):
+        """
+        El índice como matriz dispersa película × vecino (sin copiar los
+        arreglos, salvo las similitudes si están cuantizadas)
+
+        Returns:
+            scipy.sparse.csr_matrix: Similitudes (n_items × n_items)
+        """
+        import scipy.sparse as sp
+
+        scores = self.scores if self.score_dtype == 'float32' else self.score_values()
+        return sp.csr_matrix((scores, self.indices, self.indptr), shape=(self.n_items, self.n_items))
+
+
+def l2_normalize_rows(features):
+    """
+    Normalizar las filas de una matriz (densa o dispersa) a norma 1
+
+    Args:
+        features: Matriz de características (filas = películas)
+
+    Returns:
+        Matriz normalizada del mismo tipo; las filas vacías quedan en cero
+    """
+    # SciPy se importa al usarlo: leer un índice guardado no lo necesita
+    import scipy.sparse as sp
+
+    if sp.issparse(features):
+        features = sp.csr_matrix(features, dtype=np.float32)
+        norms = np.sqrt(np.asarray(features.multiply(features).sum(axis=1)).ravel())
+        norms[norms == 0] = 1.0
+        return sp.diags(1.0 / norms).dot(features).tocsr()
+
+    features = np.asarray(features, dtype=np.float32)
+    norms = np.linalg.norm(features, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return features / norms
+
+
+def _block_top_k(block_scores, self_columns, k):
+    """Seleccionar los K mejores vecinos de cada fila de un bloque denso."""
+    n_rows, n_items = block_scores.shape
+    # Excluir la propia película
+    block_scores[np.arange(n_rows), self_columns] = -np.inf
+
+    k = min(k, n_items - 1)
+    if k <= 0:
+        return np.zeros((n_rows, 0), dtype=np.int32), np.zeros((n_rows, 0), dtype=np.float32)
+
+    top = np.argpartition(-block_scores, k - 1, axis=1)[:, :k]
+    top_scores = np.take_along_axis(block_scores, top, axis=1)
+    order = np.argsort(-top_scores, axis=1, kind='stable')
+    return (np.take_along_axis(top, order, axis=1).astype(np.int32),
+            np.take_along_axis(top_scores, order, axis=1))
+
+
+def build_neighbor_index(features, k=50, block_size=None, min_score=0.0, n_jobs=1):
+    """
+    Construir el índice de vecinos procesando la matriz por bloques de filas
+
+    Solo se materializan ``n_jobs`` bloques ``block_size × n_items`` de
+    similitudes a la vez, por lo que la memoria pico no crece de forma
+    cuadrática. Los bloques se reparten entre hilos: los productos dispersos
+    y la selección parcial de NumPy/SciPy liberan el GIL.
+
+    Args:
+        features: Matriz de características (filas = películas)
+        k (int): Número de vecinos a guardar por película
+        block_size (int): Filas por bloque (por defecto según DEFAULT_BLOCK_BYTES)
+        min_score (float): Los vecinos con similitud <= min_score se descartan
+        n_jobs (int): Hilos de trabajo (None para usar todos los núcleos)
+
+    Returns:
+        NeighborIndex: Índice con los K vecinos de cada película
+    """
+    import scipy.sparse as sp
+
+    features = l2_normalize_rows(features)
+    n_items = features.shape[0]
+    if block_size is None:
+        block_size = max(1, DEFAULT_BLOCK_BYTES // (4 * max(n_items, 1)))
+    n_jobs = n_jobs or os.cpu_count() or 1
+
+    features_t = features.T.tocsc() if sp.issparse(features) else features.T
+
+    def compute_block(start):
+        return neighbor_rows(features, features_t, start, min(start + block_size, n_items), k, min_score)
+
+    starts = range(0, n_items, block_size)
+    if n_jobs > 1 and len(starts) > 1:
+        with ThreadPoolExecutor(max_workers=n_jobs) as executor:
+            blocks = list(executor.map(compute_block, starts))
+    else:
+        blocks = [compute_block(start) for start in starts]
+    return merge_neighbor_blocks(blocks, n_items, k)
+
+
+def neighbor_rows(features, features_t, start, end, k, min_score=0.0):
+    """
+    Calcular los K vecinos de un bloque de filas
+
+    Args:
+        features: Características normalizadas (filas = películas)
+        features_t: Su traspuesta (CSC si es dispersa, para multiplicar rápido)
+        start (int): Primera fila del bloque
+        end (int): Fila siguiente a la última
+        k (int): Número de vecinos por película
+        min_score (float): Los vecinos con similitud <= min_score se descartan
+
+    Returns:
+        tuple: (vecinos por fila, posiciones, similitudes) del bloque
+    """
+    import scipy.sparse as sp
+
+    block = features[start:end] @ features_t
+    block = block.toarray() if sp.issparse(block) else np.asarray(block)
+    block = block.astype(np.float32, copy=False)
+
+    top, top_scores = _block_top_k(block, np.arange(start, end), k)
+    keep = top_scores > min_score
+    return keep.sum(axis=1), top[keep], top_scores[keep]
+
+
+def merge_neighbor_blocks(blocks, n_items, k):
+    """
+    Unir bloques de neighbor_rows (en orden de filas) en un NeighborIndex
+
+    Args:
+        blocks (list): Tuplas (vecinos por fila, posiciones, similitudes)
+        n_items (int): Número total de películas
+        k (int): Número máximo de vecinos por película
+
+    Returns:
+        NeighborIndex: Índice con todas las filas
+    """
+    indptr = np.zeros(n_items + 1, dtype=np.int64)
+    if blocks:
+        np.cumsum(np.concatenate([counts for counts, _, _ in blocks]), out=indptr[1:])
+        indices = np.concatenate([indices for _, indices, _ in blocks])
+        scores = np.concatenate([scores for _, _, scores in blocks])
+    else:
+        indices = np.zeros(0, dtype=np.int32)
+        scores = np.zeros(0, dtype=np.float32)
+    return NeighborIndex(indptr, indices, scores, k)
+
+
+def top_k_neighbors(similarity, rows, k, batch_size=None):
+    """
+    Obtener los K vecinos de varias películas en una sola llamada vectorizada
+
+    Con una matriz densa se usa ``argpartition`` (selección parcial) en lugar
+    de ordenar la fila completa; con un NeighborIndex se leen directamente
+    los vecinos ya ordenados, y un índice aproximado (ann.IVFIndex) se
+    consulta con sus propios vectores.
+
+    Args:
+        similarity (np.ndarray | NeighborIndex | IVFIndex): Matriz de similitud o índice de vecinos
+        rows (array-like): Posiciones de las películas consultadas
+        k (int): Número de vecinos por película
+        batch_size (int): Filas densas procesadas a la vez (memoria acotada)
+
+    Returns:
+        tuple: (posiciones, similitudes) de forma (len(rows), k); los huecos
+        se rellenan con -1 y -inf respectivamente
+    """
+    rows = np.asarray(rows, dtype=np.int64)
+    n_queries = len(rows)
+    out_indices = np.full((n_queries, k), -1, dtype=np.int32)
+    out_scores = np.full((n_queries, k), -np.inf, dtype=np.float32)
+    if n_queries == 0 or k <= 0:
+        return out_indices, out_scores
+
+    if hasattr(similarity, 'search_items'):
+        indices, scores = similarity.search_items(rows, k)
+        return indices.astype(np.int32), scores
+
+    if isinstance(similarity, NeighborIndex):
+        starts = similarity.indptr[rows]
+        lengths = np.minimum(similarity.indptr[rows + 1] - starts, k)
+        offsets = starts[:, None] + np.arange(k)
+        valid = np.arange(k) < lengths[:, None]
+        offsets = np.where(valid, offsets, 0)
+        if len(similarity.indices):
+            out_indices[valid] = similarity.indices[offsets][valid]
+            out_scores[valid] = similarity.score_values(offsets, rows)[valid]
+        return out_indices, out_scores
+
+    similarity = np.asarray(similarity)
+    n_items = similarity.shape[1]
+    if batch_size is None:
+        batch_size = max(1, DEFAULT_BLOCK_BYTES // (4 * max(n_items, 1)))
+
+    for start in range(0, n_queries, batch_size):
+        batch_rows = rows[start:start + batch_size]
+        block = similarity[batch_rows].astype(np.float32)
+        top, top_scores = _block_top_k(block, batch_rows, k)
+        out_indices[start:start + len(batch_rows), :top.shape[1]] = top
+        out_scores[start:start + len(batch_rows), :top.shape[1]] = top_scores
+
+    return out_indices, out_scores
+
+
+def seed_scores(similarity, rows, weights, k_neighbors=50):
+    """
+    Sumar las filas de similitud de varias películas semilla, ponderadas
+
+    Con un índice de vecinos solo se leen (y descuantizan) las filas de las
+    semillas y se acumulan con una única suma ponderada por posición: el
+    coste depende de los K vecinos de cada semilla, no del tamaño del
+    catálogo.
+
+    Args:
+        similarity (np.ndarray | NeighborIndex | IVFIndex): Matriz de similitud o índice de vecinos
+        rows (array-like): Posiciones de las semillas (se pueden repetir)
+        weights (array-like): Peso de cada semilla (negativo = alejarse de ella)
+        k_neighbors (int): Vecinos por semilla con un índice aproximado
+
+    Returns:
+        np.ndarray: Puntuación de cada película (float32, n_items)
+    """
+    rows = np.asarray(rows, dtype=np.int64)
+    weights = np.asarray(weights, dtype=np.float32)
+
+    if isinstance(similarity, NeighborIndex) or hasattr(similarity, 'search_items'):
+        # Un índice aproximado calcula las filas de las semillas al vuelo
+        k = similarity.k if isinstance(similarity, NeighborIndex) else k_neighbors
+        indices, scores = top_k_neighbors(similarity, rows, k)
+        valid = indices >= 0
+        weighted = scores[valid] * np.broadcast_to(weights[:, None], scores.shape)[valid]
+        return np.bincount(indices[valid], weights=weighted, minlength=similarity.n_items).astype(np.float32)
+
+    similarity = np.asarray(similarity)
+    return (weights @ similarity[rows].astype(np.float32)).astype(np.float32)
+
+
+def top_k_scores(scores, k, exclude=None):
+    """
+    Las K películas de mayor puntuación positiva
+
+    Args:
+        scores (np.ndarray): Puntuación de cada película
+        k (int): Número de películas a devolver
+        exclude (array-like): Posiciones excluidas (p. ej. las ya vistas)
+
+    Returns:
+        tuple: (posiciones, puntuaciones) de mayor a menor
+    """
+    scores = np.array(scores, dtype=np.float32)
+    if exclude is not None and len(exclude):
+        seen = np.zeros(len(scores), dtype=bool)
+        seen[np.asarray(exclude, dtype=np.int64)] = True
+        scores[seen] = -np.inf
+    # Sin similitud positiva con las semillas no hay motivo para recomendarla
+    scores[~(scores > 0)] = -np.inf
+    k = min(k, int(np.isfinite(scores).sum()))
+    if k <= 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+    top = np.argpartition(-scores, k - 1)[:k]
+    order = np.argsort(-scores[top], kind='stable')
+    return top[order], scores[top[order]]
+
+
+def update_neighbor_index(index, features, changed_rows, block_size=None, min_score=0.0):
+    """
+    Actualizar el índice cuando cambian las características de algunas películas
+
+    Solo se recalculan desde cero las filas de las películas cambiadas y las
+    de las películas cuya lista completa (K vecinos) contenía alguna de
+    ellas; el resto de filas solo puede ganar como vecinas a las películas
+    cambiadas, así que basta con mezclar sus nuevas similitudes con la lista
+    actual. El resultado coincide con reconstruir el índice completo (salvo
+    el orden de los empates).
+
+    Args:
+        index (NeighborIndex): Índice construido con las características anteriores
+        features: Matriz de características actualizada (mismas filas que el índice)
+        changed_rows (array-like): Posiciones de las películas cuyas características cambiaron
+        block_size (int): Filas por bloque (por defecto según DEFAULT_BLOCK_BYTES)
+        min_score (float): Los vecinos con similitud <= min_score se descartan
+
+    Returns:
+        NeighborIndex: Índice nuevo (el original no se modifica)
+    """
+    import scipy.sparse as sp
+
+    changed = np.unique(np.asarray(changed_rows, dtype=np.int64))
+    n_items, k = index.n_items, index.k
+    if len(changed) == 0 or n_items == 0 or k <= 0:
+        return index
+    if features.shape[0] != n_items:
+        raise ValueError("Las características deben tener una fila por película del índice")
+
+    features = l2_normalize_rows(features)
+    if block_size is None:
+        block_size = max(1, DEFAULT_BLOCK_BYTES // (4 * n_items))
+    features_t = features.T.tocsc() if sp.issparse(features) else features.T
+    indices, scores = top_k_neighbors(index, np.arange(n_items), k)
+
+    # Listas completas que contenían una película cambiada: pueden necesitar
+    # un vecino que no estaba entre sus K, así que se recalculan
+    is_changed = np.zeros(n_items, dtype=bool)
+    is_changed[changed] = True
+    contains_changed = (is_changed[np.maximum(indices, 0)] & (indices >= 0)).any(axis=1)
+    full = (indices >= 0).all(axis=1)
+    recompute = is_changed | (contains_changed & full)
+    # En las listas incompletas basta con quitar las entradas obsoletas
+    stale = is_changed[np.maximum(indices, 0)] & (indices >= 0) & ~recompute[:, None]
+    indices[stale] = -1
+    scores[stale] = -np.inf
+
+    merge_rows = np.flatnonzero(~recompute)
+    for start in range(0, len(changed), block_size):
+        rows = changed[start:start + block_size]
+        block = features[rows] @ features_t
+        block = block.toarray() if sp.issparse(block) else np.asarray(block)
+        # Similitud de cada película sin recalcular con las cambiadas del bloque
+        candidates = block[:, merge_rows].T.astype(np.float32)
+        candidates[candidates <= min_score] = -np.inf
+        repeated_rows = np.broadcast_to(rows.astype(np.int32), candidates.shape)
+        merged_indices = np.concatenate([indices[merge_rows], repeated_rows], axis=1)
+        merged_scores = np.concatenate([scores[merge_rows], candidates], axis=1)
+        top = np.argpartition(-merged_scores, k - 1, axis=1)[:, :k]
+        indices[merge_rows] = np.take_along_axis(merged_indices, top, axis=1)
+        scores[merge_rows] = np.take_along_axis(merged_scores, top, axis=1)
+
+    recompute_rows = np.flatnonzero(recompute)
+    for start in range(0, len(recompute_rows), block_size):
+        rows = recompute_rows[start:start + block_size]
+        block = features[rows] @ features_t
+        block = block.toarray() if sp.issparse(block) else np.asarray(block)
+        top, top_scores = _block_top_k(block.astype(np.float32, copy=False), rows, k)
+        top_scores[top_scores <= min_score] = -np.inf
+        indices[rows] = -1
+        scores[rows] = -np.inf
+        indices[rows, :top.shape[1]] = top
+        scores[rows, :top.shape[1]] = top_scores
+
+    # Volver al formato CSR, con cada fila ordenada de mayor a menor
+    order = np.argsort(-scores, axis=1, kind='stable')
+    indices = np.take_along_axis(indices, order, axis=1)
+    scores = np.take_along_axis(scores, order, axis=1)
+    valid = np.isfinite(scores) & (indices >= 0)
+    indptr = np.zeros(n_items + 1, dtype=np.int64)
+    np.cumsum(valid.sum(axis=1), out=indptr[1:])
+    return NeighborIndex(indptr, indices[valid], scores[valid], k)
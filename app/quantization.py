@@ -0,0 +1,256 @@
+"""
+Almacenamiento compacto (cuantizado) de similitudes y vectores
+
+Para ordenar recomendaciones no hace falta la precisión completa de float32.
+Los valores se pueden guardar como:
+
+- ``float16``: la mitad de memoria, sin escalas.
+- ``int8``: una cuarta parte, con un factor de escala por fila
+  (``valor ≈ código × escala``, con la escala = máximo absoluto de la fila / 127).
+
+Los valores se descuantizan al vuelo, solo los que se leen (las filas
+consultadas o un bloque de filas a la vez), nunca la matriz entera.
+
+Uso (memoria y coincidencia de rankings frente a float32):
+    python -m app.quantization --dtypes float16,int8
+"""
+
+import argparse
+import os
+
+import numpy as np
+
+SCORE_DTYPES = ('float16', 'int8')
+INT8_MAX = 127
+# Filas descuantizadas a la vez en los productos (memoria temporal acotada)
+DEQUANTIZE_BLOCK_ROWS = 65_536
+
+
+def _check_dtype(dtype):
+    if dtype not in SCORE_DTYPES:
+        raise ValueError(f"Tipo de cuantización desconocido: {dtype} (usar {', '.join(SCORE_DTYPES)})")
+
+
+def quantize_rows(matrix, dtype='int8'):
+    """
+    Cuantizar una matriz densa fila a fila
+
+    Args:
+        matrix (np.ndarray): Valores (filas × columnas)
+        dtype (str): 'float16' o 'int8'
+
+    Returns:
+        tuple: (códigos, escala por fila float32 o None con float16)
+    """
+    _check_dtype(dtype)
+    matrix = np.asarray(matrix, dtype=np.float32)
+    if dtype == 'float16':
+        return matrix.astype(np.float16), None
+    scales = np.abs(matrix).max(axis=1) / INT8_MAX if matrix.size else np.zeros(len(matrix), dtype=np.float32)
+    scales = np.where(scales > 0, scales, 1.0).astype(np.float32)
+    codes = np.rint(matrix / scales[:, None]).clip(-INT8_MAX, INT8_MAX).astype(np.int8)
+    return codes, scales
+
+
+def quantize_segments(values, indptr, dtype='int8'):
+    """
+    Cuantizar los valores de una matriz CSR con una escala por fila
+
+    Args:
+        values (np.ndarray): Valores de todas las filas, concatenados
+        indptr (np.ndarray): Inicio de cada fila en values (n_filas + 1)
+        dtype (str): 'float16' o 'int8'
+
+    Returns:
+        tuple: (códigos, escala por fila float32 o None con float16)
+    """
+    _check_dtype(dtype)
+    values = np.asarray(values, dtype=np.float32)
+    if dtype == 'float16':
+        return values.astype(np.float16), None
+    counts = np.diff(indptr)
+    scales = np.ones(len(counts), dtype=np.float32)
+    filled = counts > 0
+    if filled.any():
+        row_max = np.maximum.reduceat(np.abs(values), indptr[:-1][filled])
+        scales[filled] = np.where(row_max > 0, row_max / INT8_MAX, 1.0)
+    codes = np.rint(values / np.repeat(scales, counts)).clip(-INT8_MAX, INT8_MAX).astype(np.int8)
+    return codes, scales
+
+
+class QuantizedMatrix:
+    """
+    Matriz densa cuantizada por filas, utilizable donde se espera un np.ndarray
+    de factores (indexar filas y multiplicar por vectores)
+
+    Args:
+        codes (np.ndarray): Códigos (int8 o float16)
+        scales (np.ndarray): Escala de cada fila (None con float16)
+    """
+
+    def __init__(self, codes, scales=None):
+        self.codes = codes
+        self.scales = scales
+
+    @classmethod
+    def quantize(cls, matrix, dtype='int8'):
+        """Cuantizar una matriz densa (ver quantize_rows)."""
+        return cls(*quantize_rows(matrix, dtype))
+
+    @property
+    def shape(self):
+        return self.codes.shape
+
+    @property
+    def dtype(self):
+        return np.dtype(np.float32)
+
+    @property
+    def nbytes(self):
+        return self.codes.nbytes + (0 if self.scales is None else self.scales.nbytes)
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getitem__(self, rows):
+        """Filas descuantizadas (float32)."""
+        values = self.codes[rows].astype(np.float32)
+        if self.scales is not None:
+            scales = self.scales[rows]
+            values *= scales[..., None] if values.ndim > np.ndim(scales) else scales
+        return values
+
+    def __matmul__(self, other):
+        """Producto por un vector o matriz, descuantizando por bloques de filas."""
+        other = np.asarray(other, dtype=np.float32)
+        out = np.empty((len(self),) + other.shape[1:], dtype=np.float32)
+        for start in range(0, len(self), DEQUANTIZE_BLOCK_ROWS):
+            end = min(start + DEQUANTIZE_BLOCK_ROWS, len(self))
+            out[start:end] = self[start:end] @ other
+        return out
+
+    def __array__(self, dtype=None, copy=None):
+        return self[:].astype(dtype or np.float32, copy=False)
+
+
+def overlap_at_k(reference, candidate):
+    """
+    Coincidencia entre dos rankings de K elementos
+
+    Args:
+        reference (list): Listas de posiciones de precisión completa
+        candidate (list): Listas de posiciones con valores cuantizados
+
+    Returns:
+        dict: overlap (fracción media de elementos comunes) e identical
+        (fracción de listas con el mismo orden exacto)
+    """
+    overlaps, identical = [], []
+    for full, quantized in zip(reference, candidate):
+        full, quantized = list(full), list(quantized)
+        if not full:
+            continue
+        overlaps.append(len(set(full) & set(quantized)) / len(full))
+        identical.append(full == quantized)
+    return {
+        'overlap': float(np.mean(overlaps)) if overlaps else 1.0,
+        'identical': float(np.mean(identical)) if identical else 1.0,
+    }
+
+
+def neighbor_index_agreement(index, dtype, seed_sets, k=10):
+    """
+    Memoria y coincidencia de rankings de un NeighborIndex cuantizado
+
+    Con una sola semilla el orden de los vecinos se conserva (se guardan
+    ya ordenados); lo que se mide es la suma ponderada de varias semillas
+    (recomendaciones por usuario o "más como estas").
+
+    Args:
+        index (NeighborIndex): Índice en float32
+        dtype (str): 'float16' o 'int8'
+        seed_sets (list): (posiciones, pesos) de cada consulta
+        k (int): Recomendaciones por consulta
+
+    Returns:
+        dict: bytes en float32 y cuantizado, overlap e identical
+    """
+    from .neighbors import seed_scores, top_k_scores
+
+    quantized = index.quantize(dtype)
+    reference, candidate = [], []
+    for rows, weights in seed_sets:
+        reference.append(top_k_scores(seed_scores(index, rows, weights), k, exclude=rows)[0])
+        candidate.append(top_k_scores(seed_scores(quantized, rows, weights), k, exclude=rows)[0])
+    return {'bytes': index.nbytes, 'quantized_bytes': quantized.nbytes, **overlap_at_k(reference, candidate)}
+
+
+def factor_agreement(model, dtype, users, k=10):
+    """
+    Memoria y coincidencia de rankings de un ALSModel con factores cuantizados
+
+    Args:
+        model (ALSModel): Modelo en float32
+        dtype (str): 'float16' o 'int8'
+        users (array-like): Filas de user_factors a comparar
+        k (int): Recomendaciones por usuario
+
+    Returns:
+        dict: bytes en float32 y cuantizado, overlap e identical
+    """
+    quantized = model.quantize(dtype)
+    reference = [model.recommend(model.user_factors[user], k)[0] for user in users]
+    candidate = [quantized.recommend(quantized.user_factors[user], k)[0] for user in users]
+    return {
+        'bytes': model.item_factors.nbytes + model.user_factors.nbytes,
+        'quantized_bytes': quantized.item_factors.nbytes + quantized.user_factors.nbytes,
+        **overlap_at_k(reference, candidate)
+    }
+
+
+def main():
+    from .utils import (
+        DATA_DIR, get_factorization_model, get_similarity_model, get_user_ratings, load_movie_data
+    )
+
+    parser = argparse.ArgumentParser(description="Memoria y coincidencia de rankings con valores cuantizados")
+    parser.add_argument('--data-dir', default=DATA_DIR, help="Directorio con movies.csv, ratings.csv y tags.csv")
+    parser.add_argument('--dtypes', default="float16,int8", help="Tipos separados por comas")
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--users', type=int, default=200, help="Usuarios de ratings.csv comparados")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    movies_df = load_movie_data(data_dir=args.data_dir)
+    ratings_path = os.path.join(args.data_dir, "ratings.csv")
+    tags_path = os.path.join(args.data_dir, "tags.csv")
+    rng = np.random.default_rng(args.seed)
+
+    # Las consultas son las calificaciones de usuarios reales, como en get_user_recommendations
+    user_ratings = get_user_ratings(movies_df, ratings_path)
+    user_rows = rng.choice(len(user_ratings), min(args.users, len(user_ratings)), replace=False)
+    seed_sets = []
+    for row in user_rows:
+        positions, ratings = user_ratings.ratings(user_ratings.user_ids[row])
+        weights = ratings - ratings.mean()
+        seed_sets.append((positions, weights if np.any(weights) else np.ones_like(ratings)))
+
+    print(f"{'modelo':<16}{'tipo':<9}{'memoria':>16}{'overlap@' + str(args.k):>12}{'mismo orden':>13}")
+    for engine in ('content', 'collaborative'):
+        index = get_similarity_model(movies_df, engine=engine, ratings_path=ratings_path, tags_path=tags_path,
+                                     score_dtype=None)
+        for dtype in args.dtypes.split(','):
+            report = neighbor_index_agreement(index, dtype, seed_sets, args.k)
+            print(f"{engine:<16}{dtype:<9}{report['bytes'] / 1e6:>7.1f} → {report['quantized_bytes'] / 1e6:>5.1f} MB"
+                  f"{report['overlap']:>12.3f}{report['identical']:>13.1%}")
+
+    model = get_factorization_model(movies_df, ratings_path=ratings_path, factor_dtype=None)
+    users = rng.choice(len(model.user_factors), min(args.users, len(model.user_factors)), replace=False)
+    for dtype in args.dtypes.split(','):
+        report = factor_agreement(model, dtype, users, args.k)
+        print(f"{'als':<16}{dtype:<9}{report['bytes'] / 1e6:>7.1f} → {report['quantized_bytes'] / 1e6:>5.1f} MB"
+              f"{report['overlap']:>12.3f}{report['identical']:>13.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Rankings precalculados para las películas populares
+
+Al construir el índice se ordenan una sola vez las películas calificadas por
+cada puntuación disponible:
+
+- ``avg_rating``: el promedio simple.
+- ``weighted``: promedio bayesiano al estilo IMDB,
+  ``v / (v + m) · R + m / (v + m) · C``, donde ``v`` es el número de
+  calificaciones de la película, ``R`` su promedio, ``C`` el promedio global
+  y ``m`` el número de votos "a priori". Evita que películas con una sola
+  calificación de 5 estrellas encabecen la lista.
+
+Una consulta ``(min_ratings, limit)`` recorre el orden ya calculado por
+tramos crecientes hasta reunir ``limit`` películas, sin volver a ordenar.
+"""
+
+import numpy as np
+
+SCORES = ('avg_rating', 'weighted')
+# Cuantil del número de calificaciones que se usa como votos a priori (m)
+DEFAULT_PRIOR_QUANTILE = 0.9
+
+
+class RankingIndex:
+    """
+    Órdenes precalculados de las películas por puntuación
+
+    Args:
+        movies_df (pd.DataFrame): DataFrame con avg_rating (y opcionalmente rating_count)
+        prior_votes (float): Votos a priori (m) del promedio bayesiano; por
+            defecto el cuantil DEFAULT_PRIOR_QUANTILE de rating_count
+    """
+
+    def __init__(self, movies_df, prior_votes=None):
+        avg_rating = movies_df['avg_rating'].to_numpy(dtype=np.float64)
+        if 'rating_count' in movies_df.columns:
+            counts = movies_df['rating_count'].to_numpy(dtype=np.float64)
+        else:
+            # Sin conteos todas las películas cumplen cualquier mínimo
+            counts = np.full(len(avg_rating), np.inf)
+
+        eligible = np.flatnonzero(avg_rating > 0)
+        finite = np.isfinite(counts[eligible])
+        if finite.any() and counts[eligible][finite].sum() > 0:
+            eligible_counts = counts[eligible][finite]
+            self.global_mean = float(np.average(avg_rating[eligible][finite], weights=eligible_counts))
+            self.prior_votes = float(
+                np.quantile(eligible_counts, DEFAULT_PRIOR_QUANTILE) if prior_votes is None else prior_votes
+            )
+        else:
+            self.global_mean = float(avg_rating[eligible].mean()) if len(eligible) else 0.0
+            self.prior_votes = 0.0 if prior_votes is None else float(prior_votes)
+
+        self.scores = {
+            'avg_rating': avg_rating,
+            'weighted': self.weighted_rating(avg_rating, counts),
+        }
+        self.orders = {}
+        self.ordered_counts = {}
+        for name, values in self.scores.items():
+            order = eligible[np.argsort(-values[eligible], kind='stable')]
+            self.orders[name] = order
+            self.ordered_counts[name] = counts[order]
+        # Conteos ordenados de menor a mayor: cuántas películas cumplen un mínimo (búsqueda binaria)
+        self._sorted_counts = np.sort(counts[eligible])
+
+    def weighted_rating(self, avg_rating, counts):
+        """
+        Promedio bayesiano de cada película
+
+        Args:
+            avg_rating (np.ndarray): Promedio de cada película
+            counts (np.ndarray): Número de calificaciones de cada película
+
+        Returns:
+            np.ndarray: Puntuación ponderada
+        """
+        if self.prior_votes <= 0:
+            return avg_rating.copy()
+        counts = np.where(np.isfinite(counts), counts, 0.0)
+        total = counts + self.prior_votes
+        return (counts / total) * avg_rating + (self.prior_votes / total) * self.global_mean
+
+    def count_at_least(self, min_ratings):
+        """Número de películas calificadas con al menos min_ratings calificaciones."""
+        return len(self._sorted_counts) - int(np.searchsorted(self._sorted_counts, min_ratings, side='left'))
+
+    def top(self, min_ratings=10, limit=20, score='avg_rating'):
+        """
+        Las mejores películas con un mínimo de calificaciones
+
+        Args:
+            min_ratings (int): Número mínimo de calificaciones
+            limit (int): Número máximo de resultados
+            score (str): 'avg_rating' o 'weighted'
+
+        Returns:
+            np.ndarray: Posiciones de las películas, de mayor a menor puntuación
+        """
+        if score not in self.orders:
+            raise ValueError(f"Puntuación desconocida: {score}")
+        wanted = min(limit, self.count_at_least(min_ratings))
+        if wanted <= 0:
+            return np.zeros(0, dtype=np.int64)
+
+        order = self.orders[score]
+        counts = self.ordered_counts[score]
+        found = []
+        n_found = 0
+        start = 0
+        step = max(4 * wanted, 256)
+        while n_found < wanted and start < len(order):
+            end = start + step
+            segment = order[start:end][counts[start:end] >= min_ratings]
+            found.append(segment)
+            n_found += len(segment)
+            start = end
+            step *= 2
+        return np.concatenate(found)[:wanted]
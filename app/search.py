@@ -0,0 +1,157 @@
+"""
+Motor de búsqueda de títulos basado en trigramas
+
+Cada título normalizado se descompone en trigramas de caracteres por palabra
+(al estilo de pg_trgm: ``"  toy "`` → ``"  t"``, ``" to"``, ``"toy"``,
+``"oy "``). Un índice invertido en formato CSR asocia cada trigrama con las
+películas que lo contienen, de modo que una consulta solo visita las listas
+de sus propios trigramas. El año se indexa como una palabra más, así que
+"1999" o "matrix 1999" también encuentran películas por su año. El ranking
+combina la cobertura de la consulta, la similitud de Jaccard con el título,
+una bonificación si la consulta aparece literalmente y, como desempate, la
+popularidad.
+"""
+
+import numpy as np
+
+from .titles import normalize_title, split_title
+
+# Peso de la similitud de Jaccard frente a la cobertura de la consulta
+JACCARD_WEIGHT = 0.3
+# Bonificación cuando la consulta aparece literalmente en el título
+PHRASE_BONUS = 0.5
+# Candidatas por resultado pedido que se revisan para la bonificación de frase
+PHRASE_CANDIDATES = 4
+# Peso máximo del desempate por popularidad (menor que cualquier diferencia de trigramas)
+POPULARITY_WEIGHT = 1e-3
+
+
+def trigrams(text):
+    """
+    Obtener el conjunto de trigramas de un texto normalizado
+
+    Args:
+        text (str): Texto normalizado (minúsculas, sin puntuación)
+
+    Returns:
+        set: Trigramas de cada palabra, con dos espacios al inicio y uno al final
+    """
+    grams = set()
+    for word in text.split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class SearchIndex:
+    """
+    Índice invertido de trigramas sobre los títulos de las películas
+
+    Args:
+        movies_df (pd.DataFrame): DataFrame con la columna title (y opcionalmente rating_count)
+    """
+
+    def __init__(self, movies_df):
+        self.n_items = len(movies_df)
+        vocabulary = {}
+        gram_ids, doc_ids = [], []
+        self.texts = []
+        self.doc_sizes = np.zeros(self.n_items, dtype=np.int32)
+
+        for position, title in enumerate(movies_df['title'].fillna('').astype(str)):
+            main_title, alt_title, year = split_title(title)
+            text = normalize_title(main_title)
+            if alt_title:
+                text = f"{text} {normalize_title(alt_title)}"
+            if year:
+                text = f"{text} {year}"
+            self.texts.append(text)
+            grams = trigrams(text)
+            self.doc_sizes[position] = len(grams)
+            for gram in grams:
+                gram_ids.append(vocabulary.setdefault(gram, len(vocabulary)))
+            doc_ids.extend([position] * len(grams))
+
+        gram_ids = np.asarray(gram_ids, dtype=np.int32)
+        doc_ids = np.asarray(doc_ids, dtype=np.int32)
+        order = np.argsort(gram_ids, kind='stable')
+        self.vocabulary = vocabulary
+        self.postings = doc_ids[order]
+        self.indptr = np.zeros(len(vocabulary) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(gram_ids, minlength=len(vocabulary)), out=self.indptr[1:])
+
+        rating_counts = movies_df['rating_count'] if 'rating_count' in movies_df.columns else None
+        self.set_popularity(rating_counts)
+
+    def set_popularity(self, rating_counts):
+        """
+        Actualizar el desempate por popularidad sin reconstruir el índice
+
+        Args:
+            rating_counts (array-like): Calificaciones de cada película (None para no desempatar)
+        """
+        if rating_counts is None:
+            popularity = np.zeros(self.n_items)
+        else:
+            popularity = np.log1p(np.nan_to_num(np.asarray(rating_counts, dtype=np.float64)))
+            if popularity.max(initial=0) > 0:
+                popularity = popularity / popularity.max()
+        # Se sustituye el arreglo entero: las búsquedas en curso ven el anterior o el nuevo
+        self.popularity = (POPULARITY_WEIGHT * popularity).astype(np.float32)
+
+    def search(self, query, limit=10, min_similarity=0.3):
+        """
+        Buscar las películas más parecidas a una consulta
+
+        Args:
+            query (str): Texto de búsqueda (tolera errores de escritura)
+            limit (int): Número máximo de resultados
+            min_similarity (float): Fracción mínima de trigramas de la consulta
+                presentes en el título
+
+        Returns:
+            tuple: (posiciones, puntuaciones) ordenadas de mejor a peor
+        """
+        main_title, _, year = split_title(query)
+        query_text = normalize_title(main_title)
+        if year:
+            query_text = f"{query_text} {year}"
+        query_grams = trigrams(query_text)
+        empty = np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+        if not query_grams or limit <= 0:
+            return empty
+
+        gram_ids = [self.vocabulary[gram] for gram in query_grams if gram in self.vocabulary]
+        if not gram_ids:
+            return empty
+
+        postings = np.concatenate([
+            self.postings[self.indptr[gram_id]:self.indptr[gram_id + 1]] for gram_id in gram_ids
+        ])
+        # Contar solo sobre las películas que aparecen en las listas, no sobre todo el catálogo
+        candidates, shared = np.unique(postings, return_counts=True)
+        keep = shared >= min_similarity * len(query_grams)
+        candidates, shared = candidates[keep], shared[keep]
+        if len(candidates) == 0:
+            return empty
+
+        shared = shared.astype(np.float32)
+        coverage = shared / len(query_grams)
+        jaccard = shared / (len(query_grams) + self.doc_sizes[candidates] - shared)
+        scores = coverage + JACCARD_WEIGHT * jaccard + self.popularity[candidates]
+
+        # Revisar la frase literal solo en las mejores candidatas
+        n_phrase = limit * PHRASE_CANDIDATES
+        if len(candidates) > n_phrase:
+            top = np.argpartition(-scores, n_phrase - 1)[:n_phrase]
+            candidates, scores = candidates[top], scores[top]
+        scores = scores + PHRASE_BONUS * np.fromiter(
+            (query_text in self.texts[position] for position in candidates),
+            dtype=np.float32, count=len(candidates)
+        )
+
+        if len(candidates) > limit:
+            top = np.argpartition(-scores, limit - 1)[:limit]
+            candidates, scores = candidates[top], scores[top]
+        order = np.argsort(-scores, kind='stable')
+        return candidates[order], scores[order]
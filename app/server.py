@@ -0,0 +1,472 @@
+"""
+Servicio HTTP de recomendaciones (JSON), independiente de Streamlit
+
+Expone las funciones de app/utils.py para otros servicios. Los datos y los
+modelos se cargan una sola vez por proceso, en segundo plano; mientras tanto
+``/ready`` responde 503 para que el balanceador no envíe tráfico. Para
+escalar horizontalmente basta con lanzar más procesos detrás del balanceador.
+
+Endpoints (GET):
+    /health                                   El proceso está vivo
+    /ready                                    Datos y modelos cargados
+    /search?q=matrix&limit=10                 Búsqueda de títulos
+    /similar?title=Toy Story&n=5&engine=content
+    /similar?movieId=1&n=5                    Películas similares
+    /recommend?movieId=1&movieId=260&n=10     Parecidas a varias películas
+    /recommend?userId=42&n=10&engine=collaborative
+                                              Para un usuario de ratings.csv
+    /popular?min_ratings=50&limit=20&score=weighted
+    /genre?genre=Action&also=Comedy&exclude=Drama&limit=20
+    /metrics                                  Métricas (JSON) y micro-batching
+    /metrics?format=prometheus                Métricas en texto de Prometheus
+
+Con ``--batch-window-ms`` las peticiones de películas similares que llegan
+juntas se agrupan y se resuelven en una sola pasada (ver app/batching.py).
+
+Uso:
+    python -m app.server --port 8000 --workers 8 --timeout 5 [--batch-window-ms 2 --max-batch 64]
+"""
+
+import argparse
+import json
+import math
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+
+from . import metrics
+from .batching import DEFAULT_MAX_BATCH, neighbor_batcher
+from .ranking import SCORES
+from .utils import (
+    DATA_DIR, _find_movie_position, get_available_engines, get_genre_index, get_movie_recommendations, get_movies_by_genre,
+    get_multi_seed_recommendations, get_popular_movies, get_ranking_index, get_search_index, get_similarity_model,
+    get_title_index, get_user_ratings, get_user_recommendations, load_movie_data, search_movies
+)
+
+RECORD_COLUMNS = ['movieId', 'title', 'genres', 'year', 'avg_rating', 'rating_count']
+MAX_LIMIT = 100
+
+
+class BadRequest(ValueError):
+    """Parámetros inválidos en la petición (respuesta 400)."""
+
+
+class NotFound(LookupError):
+    """La película pedida no existe (respuesta 404)."""
+
+
+def _to_json_value(value):
+    """Convertir valores de NumPy/pandas a tipos serializables en JSON."""
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float):
+        # Los promedios se guardan en float32: redondear evita ruido como 2.200000047683716
+        return None if math.isnan(value) else round(value, 4)
+    return value
+
+
+def movie_records(movies):
+    """
+    Convertir un DataFrame de películas en una lista de diccionarios
+
+    Args:
+        movies (pd.DataFrame): Películas a serializar
+
+    Returns:
+        list: Un diccionario por película con las columnas de RECORD_COLUMNS
+    """
+    columns = [column for column in RECORD_COLUMNS if column in movies.columns]
+    values = zip(*(movies[column].tolist() for column in columns))
+    return [{column: _to_json_value(value) for column, value in zip(columns, row)} for row in values]
+
+
+class RecommenderService:
+    """
+    Datos y modelos compartidos por todas las peticiones del proceso
+
+    Args:
+        data_dir (str): Directorio del dataset de MovieLens
+        engines (list): Motores a precargar (None para todos los disponibles)
+        batch_window_ms (float): Ventana de micro-batching de /similar (None para desactivarlo)
+        max_batch (int): Tamaño máximo de cada lote
+    """
+
+    def __init__(self, data_dir=DATA_DIR, engines=None, batch_window_ms=None, max_batch=DEFAULT_MAX_BATCH):
+        self.data_dir = data_dir
+        self.ratings_path = os.path.join(data_dir, "ratings.csv")
+        self.tags_path = os.path.join(data_dir, "tags.csv")
+        self.engines = engines
+        self.batch_window_ms = batch_window_ms
+        self.max_batch = max_batch
+        self.batchers = {}
+        self.movies_df = None
+        self.error = None
+        self.loaded_at = None
+        self.load_seconds = None
+        self._ready = threading.Event()
+
+    @property
+    def ready(self):
+        return self._ready.is_set()
+
+    def load(self):
+        """Cargar datos, índices y modelos (se llama una vez al arrancar)."""
+        try:
+            start = time.perf_counter()
+            movies_df = load_movie_data(data_dir=self.data_dir)
+            get_title_index(movies_df)
+            get_search_index(movies_df)
+            get_genre_index(movies_df)
+            get_ranking_index(movies_df)
+            available = get_available_engines(self.ratings_path)
+            if 'collaborative' in available:
+                get_user_ratings(movies_df, self.ratings_path)
+            self.engines = [engine for engine in (self.engines or available) if engine in available]
+            for engine in self.engines:
+                model = get_similarity_model(
+                    movies_df, engine=engine, ratings_path=self.ratings_path, tags_path=self.tags_path
+                )
+                if self.batch_window_ms is not None:
+                    self.batchers[engine] = neighbor_batcher(model, self.batch_window_ms, self.max_batch)
+            self.movies_df = movies_df
+            self.loaded_at = time.time()
+            self.load_seconds = time.perf_counter() - start
+            self._ready.set()
+        except Exception as exc:  # El estado queda visible en /ready
+            self.error = repr(exc)
+            raise
+
+    def start_loading(self):
+        """Cargar en segundo plano para que /health responda desde el primer momento."""
+        thread = threading.Thread(target=self.load, name="model-loader", daemon=True)
+        thread.start()
+        return thread
+
+    def health(self, params):
+        return {'status': 'ok'}
+
+    def readiness(self, params):
+        status = {
+            'ready': self.ready,
+            'engines': self.engines if self.ready else [],
+            'movies': len(self.movies_df) if self.ready else 0,
+        }
+        if self.error:
+            status['error'] = self.error
+        return status
+
+    def metrics(self, params):
+        return {
+            'enabled': metrics.enabled(),
+            'registry': metrics.registry.snapshot(),
+            'batching': {engine: batcher.metrics() for engine, batcher in self.batchers.items()},
+        }
+
+    def close(self):
+        for batcher in self.batchers.values():
+            batcher.close()
+
+    def search(self, params):
+        query = _get_str(params, 'q')
+        limit = _get_int(params, 'limit', 10)
+        return {'query': query, 'results': movie_records(search_movies(self.movies_df, query, limit=limit))}
+
+    def similar(self, params, timeout=None):
+        engine = _get_str(params, 'engine', 'content')
+        if engine not in self.engines:
+            raise BadRequest(f"Motor no disponible: {engine}")
+        n = _get_int(params, 'n', 5)
+        movie = _get_int(params, 'movieId', None) if 'movieId' in params else _get_str(params, 'title')
+        position = _find_movie_position(self.movies_df, movie)
+        if position is None:
+            raise NotFound(f"Película no encontrada: {movie}")
+
+        if engine in self.batchers:
+            # El lote se resuelve en el hilo del planificador; aquí solo se espera el resultado
+            future = self.batchers[engine].submit((position, n))
+            try:
+                positions = future.result(timeout=timeout)
+            except FutureTimeout:
+                future.cancel()
+                raise
+            recommendations = self.movies_df.iloc[positions]
+        else:
+            model = get_similarity_model(
+                self.movies_df, engine=engine, ratings_path=self.ratings_path, tags_path=self.tags_path
+            )
+            recommendations = get_movie_recommendations(self.movies_df, movie, model, n)
+        return {'movie': movie, 'engine': engine, 'results': movie_records(recommendations)}
+
+    def recommend(self, params):
+        engine = _get_str(params, 'engine', 'content')
+        if engine not in self.engines:
+            raise BadRequest(f"Motor no disponible: {engine}")
+        n = _get_int(params, 'n', 10)
+        model = get_similarity_model(
+            self.movies_df, engine=engine, ratings_path=self.ratings_path, tags_path=self.tags_path
+        )
+        if 'userId' in params:
+            user_id = _get_int(params, 'userId', None)
+            if get_user_ratings(self.movies_df, self.ratings_path).ratings(user_id) is None:
+                raise NotFound(f"Usuario no encontrado: {user_id}")
+            recommendations = get_user_recommendations(
+                self.movies_df, user_id, model, ratings_path=self.ratings_path, n_recommendations=n
+            )
+            return {'userId': user_id, 'engine': engine, 'results': movie_records(recommendations)}
+
+        try:
+            seeds = [int(value) for value in params.get('movieId', [])]
+        except ValueError:
+            raise BadRequest("El parámetro 'movieId' debe ser un entero")
+        if not seeds:
+            raise BadRequest("Falta el parámetro 'movieId' o 'userId'")
+        recommendations = get_multi_seed_recommendations(self.movies_df, seeds, model, n)
+        return {'seeds': seeds, 'engine': engine, 'results': movie_records(recommendations)}
+
+    def popular(self, params):
+        score = _get_str(params, 'score', 'avg_rating')
+        if score not in SCORES:
+            raise BadRequest(f"Puntuación desconocida: {score} (usar {', '.join(SCORES)})")
+        popular = get_popular_movies(
+            self.movies_df,
+            min_ratings=_get_int(params, 'min_ratings', 10),
+            limit=_get_int(params, 'limit', 20),
+            score=score
+        )
+        return {'score': score, 'results': movie_records(popular)}
+
+    def by_genre(self, params):
+        genres = [_get_str(params, 'genre')] + params.get('also', [])
+        movies = get_movies_by_genre(
+            self.movies_df, genres, limit=_get_int(params, 'limit', 20),
+            match='all', exclude=params.get('exclude', [])
+        )
+        return {'genres': genres, 'results': movie_records(movies)}
+
+
+def _get_str(params, name, default=None):
+    values = params.get(name)
+    if not values or not values[0].strip():
+        if default is None:
+            raise BadRequest(f"Falta el parámetro '{name}'")
+        return default
+    return values[0].strip()
+
+
+def _get_int(params, name, default):
+    values = params.get(name)
+    if not values:
+        return default
+    try:
+        value = int(values[0])
+    except ValueError:
+        raise BadRequest(f"El parámetro '{name}' debe ser un entero")
+    if name in ('limit', 'n') and not 0 < value <= MAX_LIMIT:
+        raise BadRequest(f"El parámetro '{name}' debe estar entre 1 y {MAX_LIMIT}")
+    return value
+
+
+class RecommenderHandler(BaseHTTPRequestHandler):
+    """Traduce cada petición GET a una llamada del RecommenderService."""
+
+    server_version = "MovieRecommender/1.0"
+    protocol_version = "HTTP/1.1"
+
+    ROUTES = {
+        '/health': ('health', False),
+        '/ready': ('readiness', False),
+        '/search': ('search', True),
+        '/similar': ('similar', True),
+        '/recommend': ('recommend', True),
+        '/popular': ('popular', True),
+        '/genre': ('by_genre', True),
+        '/metrics': ('metrics', False),
+    }
+
+    def setup(self):
+        # Tiempo máximo de espera del socket, el de este servidor
+        self.timeout = self.server.request_timeout
+        super().setup()
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        route = self.ROUTES.get(url.path.rstrip('/') or '/')
+        if route is None:
+            return self._send(404, {'error': f"Ruta desconocida: {url.path}"})
+
+        method_name, needs_data = route
+        service = self.server.service
+        if needs_data and not service.ready:
+            return self._send(503, {'error': "El servicio aún está cargando los modelos"})
+
+        params = parse_qs(url.query)
+        if method_name == 'metrics' and params.get('format') == ['prometheus']:
+            return self._send(200, metrics.registry.to_prometheus(), content_type='text/plain; version=0.0.4')
+
+        timeout = self.server.request_timeout
+        try:
+            if method_name == 'similar' and service.batchers:
+                # Con micro-batching no se ocupa un hilo de cálculo por petición
+                payload = service.similar(params, timeout=timeout)
+            else:
+                future = self.server.compute_pool.submit(getattr(service, method_name), params)
+                try:
+                    payload = future.result(timeout=timeout)
+                except FutureTimeout:
+                    future.cancel()
+                    raise
+        except FutureTimeout:
+            return self._send(504, {'error': "Tiempo de respuesta agotado"})
+        except BadRequest as exc:
+            return self._send(400, {'error': str(exc)})
+        except NotFound as exc:
+            return self._send(404, {'error': str(exc)})
+        except Exception as exc:
+            return self._send(500, {'error': repr(exc)})
+
+        status = 503 if method_name == 'readiness' and not payload['ready'] else 200
+        self._send(status, payload)
+
+    def _send(self, status, payload, content_type='application/json'):
+        if isinstance(payload, str):
+            body = payload.encode('utf-8')
+        else:
+            body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        route = urlparse(self.path).path.rstrip('/') or '/'
+        metrics.increment('http_requests_total', route=route if route in self.ROUTES else 'other', status=status)
+        metrics.record_size('http_response_bytes', len(body))
+        self.send_response(status)
+        self.send_header('Content-Type', f'{content_type}; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class RecommenderHTTPServer(HTTPServer):
+    """
+    Servidor HTTP con un pool acotado de hilos para atender conexiones
+
+    Las conexiones que no caben en el pool esperan en una cola acotada; las
+    que llegan con la cola llena se rechazan con 503 en vez de acumularse
+    (el tiempo máximo solo empieza a contar cuando un hilo las atiende).
+
+    Args:
+        address (tuple): (host, puerto)
+        service (RecommenderService): Servicio con los datos cargados
+        workers (int): Conexiones atendidas en paralelo
+        request_timeout (float): Segundos máximos por petición (cálculo y socket)
+        verbose (bool): Registrar cada petición en stderr
+        max_pending (int): Conexiones en espera de un hilo (None para 4 × workers)
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address, service, workers=8, request_timeout=5.0, verbose=False, max_pending=None):
+        self.service = service
+        self.request_timeout = request_timeout
+        self.verbose = verbose
+        self.max_pending = 4 * workers if max_pending is None else max_pending
+        self.request_queue_size = max(5, 4 * workers)
+        self.connection_pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="http")
+        self.compute_pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="compute")
+        # Plazas en el pool: las que se atienden más las que esperan
+        self._slots = threading.BoundedSemaphore(workers + self.max_pending)
+        super().__init__(address, RecommenderHandler)
+
+    def process_request(self, request, client_address):
+        if not self._slots.acquire(blocking=False):
+            self._reject(request)
+            return
+        try:
+            self.connection_pool.submit(self._handle, request, client_address)
+        except RuntimeError:  # El pool ya se cerró
+            self._slots.release()
+            self.shutdown_request(request)
+
+    def _handle(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+            self._slots.release()
+
+    def _reject(self, request):
+        """Responder 503 sin ocupar un hilo (la cola de espera está llena)."""
+        body = json.dumps({'error': "Servicio saturado, reintentar más tarde"}, ensure_ascii=False).encode('utf-8')
+        head = (
+            "HTTP/1.1 503 Service Unavailable\r\n"
+            "Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            "Retry-After: 1\r\n"
+            "Connection: close\r\n\r\n"
+        )
+        metrics.increment('http_requests_total', route='rejected', status=503)
+        try:
+            request.settimeout(self.request_timeout)
+            request.sendall(head.encode('ascii') + body)
+        except OSError:
+            pass
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self.connection_pool.shutdown(wait=False)
+        self.compute_pool.shutdown(wait=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servicio HTTP de recomendaciones de películas")
+    parser.add_argument('--host', default="127.0.0.1")
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--workers', type=int, default=8, help="Peticiones atendidas en paralelo")
+    parser.add_argument('--timeout', type=float, default=5.0, help="Segundos máximos por petición")
+    parser.add_argument('--max-pending', type=int, default=None,
+                        help="Conexiones en espera de un worker antes de responder 503 (por defecto 4 × workers)")
+    parser.add_argument('--data-dir', default=DATA_DIR, help="Directorio del dataset de MovieLens")
+    parser.add_argument('--engines', default=None,
+                        help="Motores a cargar separados por comas (por defecto todos los disponibles)")
+    parser.add_argument('--batch-window-ms', type=float, default=None,
+                        help="Agrupar peticiones de /similar que lleguen en esta ventana (desactivado por defecto)")
+    parser.add_argument('--max-batch', type=int, default=DEFAULT_MAX_BATCH, help="Tamaño máximo de cada lote")
+    parser.add_argument('--metrics', action='store_true',
+                        help="Activar la instrumentación (latencias, cachés y tamaños en /metrics)")
+    parser.add_argument('--verbose', action='store_true', help="Registrar cada petición")
+    args = parser.parse_args()
+
+    if args.metrics:
+        metrics.enable()
+    engines = args.engines.split(',') if args.engines else None
+    service = RecommenderService(
+        data_dir=args.data_dir, engines=engines,
+        batch_window_ms=args.batch_window_ms, max_batch=args.max_batch
+    )
+    service.start_loading()
+
+    server = RecommenderHTTPServer(
+        (args.host, args.port), service,
+        workers=args.workers, request_timeout=args.timeout, verbose=args.verbose, max_pending=args.max_pending
+    )
+    print(f"🎬 Servicio de recomendaciones en http://{args.host}:{args.port} ({args.workers} workers)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+"""
+Informe del tiempo de arranque de la aplicación de Streamlit
+
+Lanza un intérprete nuevo con ``python -X importtime`` (así nada está ya
+importado ni en caché) y mide, por separado:
+
+- La importación de Streamlit, que ``streamlit run`` paga una sola vez al
+  arrancar el servidor, antes de ejecutar el script.
+- Las importaciones del script comunes a todas las páginas (pandas, app.utils).
+- La carga del dataset y de los índices compartidos (views.common.load_data) y
+  la aplicación del registro de calificaciones (refresh_ratings), como en cada página.
+- La importación propia de cada página, que solo se paga al abrirla.
+
+El tiempo hasta la primera pintura de una página es la suma de las tres
+últimas partes. Las importaciones se desglosan por paquete de primer nivel para ver
+quién se lleva el tiempo.
+
+Uso:
+    python -m app.startup --pages home,analysis
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+from .views import PAGES
+
+# Objetivo de tiempo hasta la primera pintura de la página de inicio
+TARGET_MS = 1000.0
+# Importaciones del script que necesita cualquier página
+BASE_MODULES = ('pandas', 'app.utils', 'app.views.common')
+MARKER = "@@startup:"
+
+# Se ejecuta en el intérprete nuevo; los marcadores separan las fases en stderr
+_PROBE = """
+import json, sys, time
+marker = {marker!r}
+sys.stderr.write(marker + "server\\n")
+server_start = time.perf_counter()
+import streamlit
+start = time.perf_counter()
+sys.stderr.write(marker + "imports\\n")
+{base_imports}
+imported = time.perf_counter()
+sys.stderr.write(marker + "data\\n")
+from app.views.common import load_data, refresh_ratings
+load_data()
+refresh_ratings()
+loaded = time.perf_counter()
+pages = {{}}
+for page in {pages!r}:
+    sys.stderr.write(marker + page + "\\n")
+    page_start = time.perf_counter()
+    __import__('app.views.' + page)
+    pages[page] = (time.perf_counter() - page_start) * 1000.0
+print(json.dumps({{'server_ms': (start - server_start) * 1000.0, 'imports_ms': (imported - start) * 1000.0, 'data_ms': (loaded - imported) * 1000.0, 'pages_ms': pages}}))
+"""
+
+
+def parse_importtime(lines):
+    """
+    Interpretar la salida de ``python -X importtime``
+
+    Args:
+        lines (iterable): Líneas de stderr
+
+    Returns:
+        list: Un diccionario por módulo con module, self_ms, cumulative_ms y depth
+    """
+    entries = []
+    for line in lines:
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line.split(":", 1)[1].split("|", 2)
+        stripped = name.lstrip()
+        entries.append({
+            'module': stripped.rstrip(),
+            'self_ms': int(self_us) / 1000.0,
+            'cumulative_ms': int(cumulative_us) / 1000.0,
+            # Python sangra dos espacios por nivel de anidamiento (uno de separación)
+            'depth': (len(name) - len(stripped) - 1) // 2,
+        })
+    return entries
+
+
+def package_breakdown(entries, limit=10):
+    """
+    Sumar el tiempo propio de importación por paquete de primer nivel
+
+    Args:
+        entries (list): Resultado de parse_importtime
+        limit (int): Paquetes a devolver (los más lentos)
+
+    Returns:
+        list: (paquete, ms) ordenados de mayor a menor
+    """
+    totals = {}
+    for entry in entries:
+        package = entry['module'].split('.')[0]
+        totals[package] = totals.get(package, 0.0) + entry['self_ms']
+    return sorted(totals.items(), key=lambda item: item[1], reverse=True)[:limit]
+
+
+def measure_startup(pages=('home',), cwd=None, python=sys.executable):
+    """
+    Medir el arranque en un intérprete nuevo
+
+    Args:
+        pages (tuple): Módulos de app.views a medir (p. ej. 'home', 'analysis')
+        cwd (str): Directorio desde el que se lanza la app (DATA_DIR es relativo a él)
+        python (str): Intérprete a usar
+
+    Returns:
+        dict: Tiempos por fase (ms), desglose de importaciones y total por página
+    """
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [root, os.environ.get('PYTHONPATH')])))
+    probe = _PROBE.format(
+        marker=MARKER,
+        base_imports="\n".join(f"import {module}" for module in BASE_MODULES),
+        pages=list(pages),
+    )
+    result = subprocess.run(
+        [python, "-X", "importtime", "-c", probe], capture_output=True, text=True, env=env, cwd=cwd, check=False
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"La medición falló:\n{result.stderr[-2000:]}")
+
+    # Repartir las líneas de importtime entre las fases según los marcadores
+    # (lo anterior al primer marcador es el arranque del propio intérprete)
+    phases = {'interpreter': []}
+    current = phases['interpreter']
+    for line in result.stderr.splitlines():
+        if line.startswith(MARKER):
+            current = phases.setdefault(line[len(MARKER):], [])
+        else:
+            current.append(line)
+
+    timings = json.loads(result.stdout.strip().splitlines()[-1])
+    base = parse_importtime(phases['imports'])
+    report = {
+        'server_ms': timings['server_ms'],
+        'server_by_package': package_breakdown(parse_importtime(phases['server']), limit=5),
+        'imports_ms': timings['imports_ms'],
+        'data_ms': timings['data_ms'],
+        'imports_by_package': package_breakdown(base),
+        'pages': {},
+    }
+    for page in pages:
+        entries = parse_importtime(phases.get(page, []))
+        report['pages'][page] = {
+            'import_ms': timings['pages_ms'][page],
+            'new_modules': len(entries),
+            'imports_by_package': package_breakdown(entries, limit=5),
+            'first_paint_ms': timings['imports_ms'] + timings['data_ms'] + timings['pages_ms'][page],
+        }
+    return report
+
+
+def print_report(report):
+    """Imprimir el informe de measure_startup en forma de tabla."""
+    print(f"Streamlit (servidor):  {report['server_ms']:8.1f} ms")
+    for package, ms in report['server_by_package']:
+        print(f"    {package:<28}{ms:8.1f} ms")
+    print(f"Importaciones comunes: {report['imports_ms']:8.1f} ms")
+    for package, ms in report['imports_by_package']:
+        print(f"    {package:<28}{ms:8.1f} ms")
+    print(f"Carga de datos e índices: {report['data_ms']:5.1f} ms")
+    print()
+    print(f"{'Página':<18}{'importación':>14}{'módulos':>10}{'primera pintura':>18}")
+    for page, info in report['pages'].items():
+        print(f"{page:<18}{info['import_ms']:>11.1f} ms{info['new_modules']:>10}{info['first_paint_ms']:>15.1f} ms")
+        for package, ms in info['imports_by_package']:
+            print(f"    {package:<28}{ms:8.1f} ms")
+    if 'home' in report['pages']:
+        first_paint = report['pages']['home']['first_paint_ms']
+        status = "dentro del objetivo" if first_paint <= TARGET_MS else "por encima del objetivo"
+        print(f"\nInicio: {first_paint:.0f} ms hasta la primera pintura ({status} de {TARGET_MS:.0f} ms)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tiempo de arranque e importación de las páginas")
+    parser.add_argument('--pages', default=",".join(PAGES.values()), help="Páginas separadas por comas")
+    parser.add_argument('--cwd', default=None, help="Directorio desde el que se lanza la app (el del dataset)")
+    parser.add_argument('--json', action='store_true', help="Imprimir el informe en JSON")
+    args = parser.parse_args()
+
+    report = measure_startup(tuple(args.pages.split(",")), cwd=args.cwd)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""
+Generador de datasets sintéticos con el formato de MovieLens
+
+Produce movies.csv y ratings.csv con distribuciones parecidas a las de
+MovieLens para medir el rendimiento a escalas que el dataset real no cubre:
+
+- Géneros: de 1 a 4 por película, elegidos según la frecuencia de cada
+  género en ml-latest-small (Drama y Comedy dominan; Film-Noir es raro).
+- Calificaciones: el número por película sigue una cola larga (Zipf), de
+  modo que pocas películas concentran muchas calificaciones; los valores van
+  de 0.5 a 5 en pasos de 0.5 con la distribución global de MovieLens y un
+  sesgo de calidad propio de cada película.
+
+Uso:
+    python -m app.synthetic --movies 100k --output-dir .cache/synthetic/100k
+"""
+
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+# Frecuencia de cada género en ml-latest-small
+GENRE_WEIGHTS = {
+    'Drama': 4361, 'Comedy': 3756, 'Thriller': 1894, 'Action': 1828, 'Romance': 1596,
+    'Adventure': 1263, 'Crime': 1199, 'Sci-Fi': 980, 'Horror': 978, 'Fantasy': 779,
+    'Children': 664, 'Animation': 611, 'Mystery': 573, 'Documentary': 440, 'War': 382,
+    'Musical': 334, 'Western': 167, 'IMAX': 158, 'Film-Noir': 87,
+}
+# Probabilidad de que una película tenga 1, 2, 3 o 4 géneros
+GENRES_PER_MOVIE = [0.33, 0.36, 0.22, 0.09]
+NO_GENRES = '(no genres listed)'
+NO_GENRES_RATE = 0.0035
+
+RATING_VALUES = np.arange(1, 11) / 2
+RATING_WEIGHTS = np.array([1370, 2811, 1791, 7551, 5550, 20047, 13136, 26818, 8551, 13211], dtype=np.float64)
+
+TITLE_WORDS = (
+    "love story night day man woman dark knight star war world city dead life return last first "
+    "great little big house king queen secret lost time road home blood fire water moon sun "
+    "summer winter girl boy family dream heart ghost island river mountain shadow game money "
+    "american french party wedding school death angel devil street"
+).split()
+
+SIZE_SUFFIXES = {'k': 1_000, 'm': 1_000_000}
+
+
+def parse_size(value):
+    """Convertir '10k', '1M' o '2500' en un entero."""
+    value = str(value).strip().lower()
+    if value and value[-1] in SIZE_SUFFIXES:
+        return int(float(value[:-1]) * SIZE_SUFFIXES[value[-1]])
+    return int(value)
+
+
+def generate_movies(n_movies, rng):
+    """
+    Generar el DataFrame de películas
+
+    Args:
+        n_movies (int): Número de películas
+        rng (np.random.Generator): Generador aleatorio
+
+    Returns:
+        pd.DataFrame: Columnas movieId, title y genres
+    """
+    # Títulos de 1 a 4 palabras con año; algunos con el artículo al final
+    n_words = rng.integers(1, 5, n_movies)
+    words = np.array(TITLE_WORDS, dtype=object)[rng.integers(0, len(TITLE_WORDS), (n_movies, 4))]
+    titles = pd.Series(words[:, 0]).str.title()
+    for position in range(1, 4):
+        extra = pd.Series(words[:, position]).str.title()
+        titles = titles.where(n_words <= position, titles + ' ' + extra)
+    titles = titles.where(rng.random(n_movies) > 0.08, titles + ', The')
+    years = rng.integers(1915, 2019, n_movies).astype(str)
+    titles = titles + ' (' + years + ')'
+
+    # Géneros sin repetición ponderados por frecuencia (top-k con ruido de Gumbel)
+    names = np.array(sorted(GENRE_WEIGHTS), dtype=object)
+    log_weights = np.log(np.array([GENRE_WEIGHTS[name] for name in names], dtype=np.float64))
+    keys = log_weights - np.log(-np.log(rng.random((n_movies, len(names)))))
+    order = np.argsort(-keys, axis=1)[:, :len(GENRES_PER_MOVIE)]
+    n_genres = rng.choice(np.arange(1, len(GENRES_PER_MOVIE) + 1), n_movies, p=GENRES_PER_MOVIE)
+    # Orden alfabético dentro de cada película, como en MovieLens
+    chosen = np.where(np.arange(len(GENRES_PER_MOVIE)) < n_genres[:, None], order, len(names))
+    chosen.sort(axis=1)
+    padded = np.append(names, '')[chosen]
+    genres = pd.Series(padded[:, 0])
+    for position in range(1, len(GENRES_PER_MOVIE)):
+        column = pd.Series(padded[:, position])
+        genres = genres.where(column == '', genres + '|' + column)
+    genres[rng.random(n_movies) < NO_GENRES_RATE] = NO_GENRES
+
+    movie_ids = np.arange(1, n_movies + 1, dtype=np.int64)
+    return pd.DataFrame({'movieId': movie_ids, 'title': titles.to_numpy(), 'genres': genres.to_numpy()})
+
+
+def generate_ratings(movie_ids, ratings_per_movie, rng, n_users=None):
+    """
+    Generar calificaciones con popularidad de cola larga
+
+    Args:
+        movie_ids (np.ndarray): Ids de las películas
+        ratings_per_movie (float): Calificaciones promedio por película
+        rng (np.random.Generator): Generador aleatorio
+        n_users (int): Número de usuarios (None para uno cada 15 películas)
+
+    Returns:
+        pd.DataFrame: Columnas userId, movieId, rating y timestamp
+    """
+    n_movies = len(movie_ids)
+    n_ratings = int(n_movies * ratings_per_movie)
+    n_users = n_users or max(10, n_movies // 15)
+
+    # Popularidad Zipf sobre un orden aleatorio de películas
+    popularity = 1.0 / np.arange(1, n_movies + 1) ** 0.9
+    popularity = popularity[rng.permutation(n_movies)]
+    movies = rng.choice(n_movies, n_ratings, p=popularity / popularity.sum())
+
+    # Distribución global de MovieLens desplazada por la calidad de cada película
+    base = rng.choice(len(RATING_VALUES), n_ratings, p=RATING_WEIGHTS / RATING_WEIGHTS.sum())
+    quality = np.round(rng.normal(0, 0.8, n_movies)).astype(np.int64)
+    steps = np.clip(base + quality[movies], 0, len(RATING_VALUES) - 1)
+
+    ratings = pd.DataFrame({
+        'userId': rng.integers(1, n_users + 1, n_ratings, dtype=np.int64),
+        'movieId': movie_ids[movies],
+        'rating': RATING_VALUES[steps],
+        'timestamp': rng.integers(828_000_000, 1_540_000_000, n_ratings, dtype=np.int64),
+    })
+    return ratings.drop_duplicates(['userId', 'movieId'])
+
+
+def write_synthetic_dataset(output_dir, n_movies, ratings_per_movie=10.0, seed=0):
+    """
+    Escribir movies.csv y ratings.csv sintéticos
+
+    Args:
+        output_dir (str): Directorio de salida
+        n_movies (int): Número de películas
+        ratings_per_movie (float): Calificaciones promedio por película
+        seed (int): Semilla
+
+    Returns:
+        dict: Número de películas y de calificaciones escritas
+    """
+    rng = np.random.default_rng(seed)
+    os.makedirs(output_dir, exist_ok=True)
+    movies = generate_movies(n_movies, rng)
+    movies.to_csv(os.path.join(output_dir, "movies.csv"), index=False)
+    ratings = generate_ratings(movies['movieId'].to_numpy(), ratings_per_movie, rng)
+    ratings.to_csv(os.path.join(output_dir, "ratings.csv"), index=False)
+    return {'movies': len(movies), 'ratings': len(ratings)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generar un dataset sintético con el formato de MovieLens")
+    parser.add_argument('--movies', default="10k", help="Número de películas (admite 10k, 1M)")
+    parser.add_argument('--ratings-per-movie', type=float, default=10.0)
+    parser.add_argument('--output-dir', default=None, help="Por defecto .cache/synthetic/<movies>")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    n_movies = parse_size(args.movies)
+    output_dir = args.output_dir or os.path.join(".cache", "synthetic", args.movies)
+    start = time.perf_counter()
+    written = write_synthetic_dataset(output_dir, n_movies, args.ratings_per_movie, args.seed)
+    print(f"✅ {written['movies']:,} películas y {written['ratings']:,} calificaciones en {output_dir} "
+          f"({time.perf_counter() - start:.1f} s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""
+Índice de títulos normalizados para resolver películas en O(1)
+
+Los títulos de MovieLens tienen la forma ``Matrix, The (1999)`` o
+``Shanghai Triad (Yao a yao yao dao waipo qiao) (1995)``. El índice guarda
+cada título normalizado (sin año, en minúsculas, con el artículo al inicio y
+sin signos de puntuación) junto con su título alternativo, de modo que
+"The Matrix", "matrix, the" y "The Matrix (1999)" resuelven a la misma fila.
+"""
+
+import bisect
+import re
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+YEAR_PATTERN = re.compile(r'\s*\((\d{4})(?:[-–]\d{0,4})?\)\s*$')
+ALT_TITLE_PATTERN = re.compile(r'\s*\(([^()]*)\)\s*$')
+ARTICLE_PATTERN = re.compile(
+    r'^(.*), (the|a|an|la|le|les|el|los|las|il|lo|der|die|das|l\')$'
+)
+NON_ALNUM_PATTERN = re.compile(r'[^0-9a-z]+')
+
+
+def split_title(title):
+    """
+    Separar un título de MovieLens en (título, título alternativo, año)
+
+    Args:
+        title (str): Título tal como aparece en movies.csv
+
+    Returns:
+        tuple: (título principal, título alternativo o None, año o None)
+    """
+    title = title.strip()
+    year = None
+    match = YEAR_PATTERN.search(title)
+    if match:
+        year = int(match.group(1))
+        title = title[:match.start()]
+
+    alt_title = None
+    match = ALT_TITLE_PATTERN.search(title)
+    if match and match.start() > 0:
+        alt_title = match.group(1)
+        title = title[:match.start()]
+    return title, alt_title, year
+
+
+def normalize_title(title):
+    """
+    Normalizar un título para comparaciones exactas
+
+    Args:
+        title (str): Título sin año
+
+    Returns:
+        str: Título en minúsculas, sin acentos ni puntuación y con el
+        artículo final ("Matrix, The") movido al inicio
+    """
+    title = unicodedata.normalize('NFKD', title)
+    title = ''.join(ch for ch in title if not unicodedata.combining(ch)).lower().strip()
+    match = ARTICLE_PATTERN.match(title)
+    if match:
+        title = f"{match.group(2)} {match.group(1)}"
+    return NON_ALNUM_PATTERN.sub(' ', title).strip()
+
+
+class TitleIndex:
+    """
+    Búsquedas exactas por título normalizado y por movieId
+
+    Args:
+        movies_df (pd.DataFrame): DataFrame con las columnas movieId y title
+    """
+
+    def __init__(self, movies_df):
+        titles = movies_df['title'].fillna('').astype(str).tolist()
+        self.normalized = []
+        self.years = np.full(len(titles), -1, dtype=np.int32)
+        self._by_title = {}
+
+        for position, title in enumerate(titles):
+            main_title, alt_title, year = split_title(title)
+            if year is not None:
+                self.years[position] = year
+            key = normalize_title(main_title)
+            self.normalized.append(key)
+            self._by_title.setdefault(key, []).append(position)
+            if alt_title:
+                alt_key = normalize_title(alt_title)
+                if alt_key and alt_key != key:
+                    self._by_title.setdefault(alt_key, []).append(position)
+
+        self._sorted_keys = sorted(self._by_title)
+        self._by_id = pd.Index(movies_df['movieId'].to_numpy())
+
+    def __len__(self):
+        return len(self.normalized)
+
+    def position_of_id(self, movie_id):
+        """
+        Posición de una película a partir de su movieId
+
+        Args:
+            movie_id (int): Identificador de la película
+
+        Returns:
+            int: Posición en el DataFrame, o None si no existe
+        """
+        position = self._by_id.get_indexer([movie_id])[0]
+        return int(position) if position >= 0 else None
+
+    def positions_of_ids(self, movie_ids):
+        """
+        Posiciones de varias películas a partir de sus movieId (vectorizado)
+
+        Args:
+            movie_ids (array-like): Identificadores de las películas
+
+        Returns:
+            np.ndarray: Posición de cada una (-1 si no existe)
+        """
+        return self._by_id.get_indexer(np.asarray(movie_ids)).astype(np.int64)
+
+    def _pick(self, positions, year):
+        """Elegir la primera candidata, prefiriendo la del año indicado."""
+        if year is not None:
+            for position in positions:
+                if self.years[position] == year:
+                    return position
+        return positions[0]
+
+    def resolve(self, title, year=None):
+        """
+        Encontrar la película que corresponde a un título
+
+        Primero se busca la coincidencia exacta del título normalizado (O(1));
+        si no existe, el título como prefijo (búsqueda binaria) y por último
+        como subcadena. Entre varias candidatas se prefiere la del año
+        indicado (o el que aparezca en el propio título) y después la primera
+        del archivo.
+
+        Args:
+            title (str): Título con o sin año
+            year (int): Año para desambiguar remakes y títulos repetidos
+
+        Returns:
+            int: Posición en el DataFrame, o None si no existe
+        """
+        main_title, _, title_year = split_title(title)
+        year = year if year is not None else title_year
+        key = normalize_title(main_title)
+        if not key:
+            return None
+
+        positions = self._by_title.get(key)
+        if positions:
+            return self._pick(positions, year)
+
+        candidates = []
+        position = bisect.bisect_left(self._sorted_keys, key)
+        while position < len(self._sorted_keys) and self._sorted_keys[position].startswith(key):
+            candidates.extend(self._by_title[self._sorted_keys[position]])
+            position += 1
+        if not candidates:
+            for other in self._sorted_keys:
+                if key in other:
+                    candidates.extend(self._by_title[other])
+        if not candidates:
+            return None
+        return self._pick(sorted(candidates), year)
@@ -0,0 +1,467 @@
+"""
+Actualizaciones incrementales cuando llegan calificaciones nuevas
+
+Las calificaciones nuevas no reescriben ratings.csv: se añaden a un registro
+de solo anexado (``ratings-log.csv``, junto a ratings.csv). IncrementalRatings
+lee del registro solo los bytes que aún no ha visto y aplica los cambios
+sobre el DataFrame compartido:
+
+- ``avg_rating`` y ``rating_count`` se actualizan en O(delta) a partir de
+  sumas y conteos por película; crear IncrementalRatings no lee ratings.csv.
+- Solo se descartan las estructuras derivadas que dependen de las
+  calificaciones (rankings y agregados de análisis); al índice de búsqueda
+  solo se le actualiza la popularidad.
+- Opcionalmente se mantiene el índice colaborativo: la matriz usuario ×
+  película se carga entera y cada calificación se actualiza en su sitio,
+  pero recalcular las filas de las películas afectadas (ver
+  neighbors.update_neighbor_index) recorre la matriz completa, O(nnz) por
+  actualización. El índice nuevo se publica en la caché de modelos del proceso.
+
+La compactación añade el registro a ratings.csv, lo vacía, reescribe la
+caché binaria del dataset y guarda el índice colaborativo con la nueva
+huella, de modo que la siguiente carga no reconstruye nada.
+
+Cada par (usuario, película) tiene una sola calificación: si un usuario
+vuelve a calificar una película, la nueva sustituye a la anterior en el
+promedio (el conteo no cambia) y en la matriz de calificaciones. Sin la
+matriz, la calificación anterior se busca en un diccionario con los pares
+del registro y los de ratings.csv de cada usuario, que se leen (una pasada
+por trozos) la primera vez que el usuario aparece. Al compactar,
+ratings.csv se reescribe sin los pares repetidos.
+
+Uso:
+    python -m app.updates append --input nuevas.csv
+    python -m app.updates append --rating 1 296 4.5
+    python -m app.updates status
+    python -m app.updates compact --neighbors
+"""
+
+import argparse
+import io
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from .dataset import DEFAULT_CHUNKSIZE, default_cache_dir, load_movielens, source_signature, write_dataset_cache
+from .neighbors import update_neighbor_index
+from .utils import (
+    DATA_DIR, MODEL_DIR, SCORE_DTYPE, get_similarity_model, similarity_model_key, store_model,
+    update_rating_columns
+)
+
+LOG_NAME = "ratings-log.csv"
+LOG_COLUMNS = ['userId', 'movieId', 'rating', 'timestamp']
+LOG_DTYPES = {'userId': np.int32, 'movieId': np.int32, 'rating': np.float32, 'timestamp': np.int64}
+# Estructuras derivadas que cambian con las calificaciones
+RATING_STRUCTURES = ('ranking', 'rating_order', 'aggregates', 'user_ratings')
+
+
+def log_path(data_dir=DATA_DIR):
+    """Ruta del registro de calificaciones de un directorio de datos."""
+    return os.path.join(data_dir, LOG_NAME)
+
+
+def append_ratings(path, ratings_df):
+    """
+    Añadir calificaciones al final del registro
+
+    Args:
+        path (str): Ruta del registro
+        ratings_df (pd.DataFrame): userId, movieId, rating y opcionalmente
+            timestamp (por defecto la hora actual)
+
+    Returns:
+        int: Calificaciones añadidas
+    """
+    missing = {'userId', 'movieId', 'rating'} - set(ratings_df.columns)
+    if missing:
+        raise ValueError(f"Faltan columnas: {', '.join(sorted(missing))}")
+    rows = ratings_df.copy()
+    if 'timestamp' not in rows.columns:
+        rows['timestamp'] = int(time.time())
+    rows = rows[LOG_COLUMNS].astype(LOG_DTYPES)
+
+    write_header = not os.path.exists(path) or os.path.getsize(path) == 0
+    with open(path, 'a', encoding='utf-8', newline='') as f:
+        rows.to_csv(f, header=write_header, index=False)
+        f.flush()
+        os.fsync(f.fileno())
+    return len(rows)
+
+
+def read_log(path, offset=0):
+    """
+    Leer las calificaciones del registro a partir de un desplazamiento
+
+    Solo se leen líneas completas: una escritura a medias se leerá en la
+    siguiente llamada.
+
+    Args:
+        path (str): Ruta del registro
+        offset (int): Bytes ya leídos (0 para leerlo desde el principio)
+
+    Returns:
+        tuple: (pd.DataFrame con LOG_COLUMNS, nuevo desplazamiento)
+    """
+    try:
+        with open(path, 'rb') as f:
+            f.seek(offset)
+            data = f.read()
+    except FileNotFoundError:
+        data = b""
+    end = data.rfind(b"\n") + 1
+    if end == 0:
+        return pd.DataFrame({column: pd.Series(dtype=dtype) for column, dtype in LOG_DTYPES.items()}), offset
+    ratings_df = pd.read_csv(
+        io.BytesIO(data[:end]), header=0 if offset == 0 else None, names=LOG_COLUMNS, dtype=LOG_DTYPES
+    )
+    return ratings_df, offset + end
+
+
+class IncrementalRatings:
+    """
+    Aplicar el registro de calificaciones sobre un DataFrame ya cargado
+
+    Args:
+        movies_df (pd.DataFrame): Películas con avg_rating y rating_count (se modifica)
+        data_dir (str): Directorio con movies.csv, ratings.csv y el registro
+        track_neighbors (bool): Mantener también el índice colaborativo
+        k (int): Vecinos por película del índice colaborativo
+        model_dir (str): Directorio de los artefactos (None para no usar disco)
+        cache_dir (str): Caché binaria del dataset que se reescribe al compactar (None para la predeterminada)
+    """
+
+    def __init__(self, movies_df, data_dir=DATA_DIR, track_neighbors=False, k=50, model_dir=MODEL_DIR,
+                 cache_dir=None):
+        if 'rating_count' not in movies_df.columns:
+            raise ValueError("El DataFrame no tiene rating_count (se cargó sin ratings.csv)")
+        self.movies_df = movies_df
+        self.data_dir = data_dir
+        self.log_path = log_path(data_dir)
+        self.movies_path = os.path.join(data_dir, "movies.csv")
+        self.ratings_path = os.path.join(data_dir, "ratings.csv")
+        self.k = k
+        self.model_dir = model_dir
+        self.cache_dir = cache_dir or default_cache_dir(data_dir)
+        self.offset = 0
+        self.applied = 0
+        self._log_id = None
+        self._lock = threading.RLock()
+        self._positions = pd.Index(movies_df['movieId'].to_numpy())
+
+        # Las columnas de la caché binaria están mapeadas en memoria (solo
+        # lectura): se copian una vez para poder escribir en ellas
+        for column in ('avg_rating', 'rating_count'):
+            movies_df[column] = movies_df[column].to_numpy(copy=True)
+        self._replaced = False
+
+        # Calificación vigente de cada par (userId, movieId) que ha pasado por
+        # el registro o de los usuarios ya consultados en ratings.csv
+        self._known = {}
+        self._known_users = set()
+        self.rating_matrix = None
+        if track_neighbors:
+            # El índice colaborativo necesita la matriz usuario × película
+            # completa, que además sirve para consultar calificaciones previas
+            from .collaborative import build_rating_matrix, load_ratings
+
+            if os.path.exists(self.ratings_path):
+                ratings_df = load_ratings(self.ratings_path)
+            else:
+                ratings_df = pd.DataFrame({'userId': [], 'movieId': [], 'rating': []})
+            self.rating_matrix, user_ids = build_rating_matrix(ratings_df, movies_df['movieId'].to_numpy())
+            self._users = pd.Index(user_ids)
+            self._sums = np.asarray(self.rating_matrix.sum(axis=0, dtype=np.float64)).ravel()
+            self._counts = np.bincount(self.rating_matrix.indices, minlength=len(movies_df)).astype(np.float64)
+        else:
+            # Sin la matriz, las sumas salen de las columnas del DataFrame: el
+            # error inicial (el redondeo de avg_rating a float32) no se acumula
+            self._counts = movies_df['rating_count'].to_numpy(dtype=np.float64)
+            self._sums = movies_df['avg_rating'].to_numpy(dtype=np.float64) * self._counts
+
+        self.neighbor_index = None
+        if track_neighbors:
+            # Copia de trabajo en float32: las filas se recalculan sin arrastrar
+            # el error de cuantización (se cuantiza solo al publicar)
+            self.neighbor_index = get_similarity_model(
+                movies_df, k=k, model_dir=model_dir, engine='collaborative', ratings_path=self.ratings_path,
+                score_dtype=None
+            )
+
+    def pending(self):
+        """Bytes del registro que aún no se han aplicado."""
+        try:
+            size = os.path.getsize(self.log_path)
+        except FileNotFoundError:
+            return 0
+        return max(size - self.offset, 0)
+
+    def refresh(self):
+        """
+        Aplicar las calificaciones que se añadieron al registro desde la última llamada
+
+        Returns:
+            dict: Resumen de apply, o None si no había nada nuevo
+        """
+        with self._lock:
+            try:
+                stat = os.stat(self.log_path)
+            except FileNotFoundError:
+                return None
+            # Si otro proceso compactó el registro, el archivo es nuevo
+            if (stat.st_dev, stat.st_ino) != self._log_id or stat.st_size < self.offset:
+                self._log_id = (stat.st_dev, stat.st_ino)
+                self.offset = 0
+            if stat.st_size == self.offset:
+                return None
+            ratings_df, self.offset = read_log(self.log_path, self.offset)
+            return self.apply(ratings_df) if len(ratings_df) else None
+
+    def apply(self, ratings_df):
+        """
+        Aplicar calificaciones nuevas (O(delta) para promedios y conteos)
+
+        Args:
+            ratings_df (pd.DataFrame): userId, movieId y rating
+
+        Returns:
+            dict: ratings (aplicadas), ignored (películas desconocidas),
+            replaced (calificaciones que sustituyen a otra anterior),
+            movies (películas actualizadas) y neighbor_rows (filas recalculadas)
+        """
+        with self._lock:
+            positions = self._positions.get_indexer(ratings_df['movieId'].to_numpy())
+            known = positions >= 0
+            # Dentro del lote también vale la última calificación de cada par
+            delta = pd.DataFrame({
+                'userId': ratings_df['userId'].to_numpy()[known],
+                'position': positions[known],
+                'rating': ratings_df['rating'].to_numpy(dtype=np.float32)[known],
+            }).drop_duplicates(['userId', 'position'], keep='last')
+            user_ids = delta['userId'].to_numpy()
+            positions = delta['position'].to_numpy()
+            ratings = delta['rating'].to_numpy()
+
+            # Calificación anterior de cada par (0 si no existía)
+            previous = self._set_ratings(user_ids, positions, ratings)
+            replaced = int((previous > 0).sum()) + int(known.sum()) - len(delta)
+            self._replaced = self._replaced or replaced > 0
+
+            np.add.at(self._sums, positions, ratings.astype(np.float64) - previous)
+            np.add.at(self._counts, positions, (previous == 0).astype(np.float64))
+            touched = np.unique(positions)
+            update_rating_columns(
+                self.movies_df, touched, self._sums[touched] / self._counts[touched], self._counts[touched],
+                RATING_STRUCTURES
+            )
+
+            neighbor_rows = 0
+            if self.neighbor_index is not None and len(positions):
+                neighbor_rows = self._update_neighbors(self._users.get_indexer(user_ids))
+            self.applied += int(known.sum())
+            return {
+                'ratings': int(known.sum()),
+                'ignored': int((~known).sum()),
+                'replaced': replaced,
+                'movies': len(touched),
+                'neighbor_rows': neighbor_rows,
+            }
+
+    def _set_ratings(self, user_ids, positions, ratings):
+        """
+        Guardar la calificación vigente de cada par y devolver la anterior
+
+        Con la matriz, los pares que ya existen se actualizan en su sitio y
+        solo se reconstruye si aparecen pares nuevos. Sin ella, las de cada
+        usuario se buscan en ratings.csv la primera vez que aparece.
+
+        Returns:
+            np.ndarray: Calificación anterior de cada par (0 si no existía)
+        """
+        if self.rating_matrix is None:
+            self._load_known(user_ids)
+            movie_ids = self._positions[positions]
+            keys = list(zip(user_ids.tolist(), movie_ids.tolist()))
+            previous = np.fromiter((self._known.get(key, 0.0) for key in keys), dtype=np.float32, count=len(keys))
+            self._known.update(zip(keys, ratings.tolist()))
+            return previous
+
+        import scipy.sparse as sp
+
+        new_users = pd.unique(user_ids[self._users.get_indexer(user_ids) < 0])
+        if len(new_users):
+            self._users = self._users.append(pd.Index(new_users))
+            self.rating_matrix.resize((len(self._users), self.rating_matrix.shape[1]))
+        rows = self._users.get_indexer(user_ids)
+        matrix = self.rating_matrix
+        # Posición de cada par en data (los índices de cada fila están ordenados)
+        offsets = np.empty(len(rows), dtype=np.int64)
+        for i, (row, column) in enumerate(zip(rows, positions)):
+            start, end = matrix.indptr[row], matrix.indptr[row + 1]
+            offsets[i] = start + np.searchsorted(matrix.indices[start:end], column)
+        exists = offsets < matrix.indptr[rows + 1]
+        exists[exists] = matrix.indices[offsets[exists]] == positions[exists]
+        previous = np.zeros(len(rows), dtype=np.float32)
+        previous[exists] = matrix.data[offsets[exists]]
+        matrix.data[offsets[exists]] = ratings[exists]
+        if not exists.all():
+            self.rating_matrix = (matrix + sp.csr_matrix(
+                (ratings[~exists], (rows[~exists], positions[~exists])), shape=matrix.shape, dtype=np.float32
+            )).tocsr()
+        return previous
+
+    def _load_known(self, user_ids):
+        """Leer de ratings.csv (una pasada por trozos) las calificaciones de los usuarios aún no consultados."""
+        pending = set(pd.unique(user_ids).tolist()) - self._known_users
+        if not pending or not os.path.exists(self.ratings_path):
+            self._known_users.update(pending)
+            return
+        from .collaborative import RATING_COLUMNS, RATING_DTYPES
+
+        for chunk in pd.read_csv(self.ratings_path, usecols=RATING_COLUMNS, dtype=RATING_DTYPES,
+                                 chunksize=DEFAULT_CHUNKSIZE):
+            chunk = chunk[chunk['userId'].isin(pending)]
+            # Las calificaciones del registro ya guardadas son más recientes
+            for key, rating in zip(zip(chunk['userId'].tolist(), chunk['movieId'].tolist()), chunk['rating'].tolist()):
+                self._known.setdefault(key, rating)
+        self._known_users.update(pending)
+
+    def _update_neighbors(self, rows):
+        """Recalcular las filas del índice de las películas afectadas por los usuarios de rows."""
+        from .collaborative import center_by_user
+
+        # Al cambiar el promedio de un usuario cambian todas sus calificaciones
+        # centradas, así que se ven afectadas todas las películas que calificó
+        affected = np.unique(self.rating_matrix[np.unique(rows)].indices)
+        item_features = center_by_user(self.rating_matrix).T.tocsr()
+        self.neighbor_index = update_neighbor_index(self.neighbor_index, item_features, affected)
+
+        # Solo en memoria: el artefacto en disco debe seguir a ratings.csv
+        fingerprint, _ = similarity_model_key(
+            self.movies_df, k=self.k, model_dir=None, engine='collaborative', ratings_path=self.ratings_path
+        )
+        store_model(fingerprint, None, self._published_index())
+        return len(affected)
+
+    def _published_index(self):
+        """El índice tal como lo espera get_similarity_model (cuantizado si SCORE_DTYPE lo indica)."""
+        return self.neighbor_index.quantize(SCORE_DTYPE) if SCORE_DTYPE else self.neighbor_index
+
+    def compact(self):
+        """
+        Volcar el registro en ratings.csv y vaciarlo
+
+        Returns:
+            int: Calificaciones añadidas a ratings.csv
+        """
+        with self._lock:
+            if not os.path.exists(self.log_path):
+                return 0
+            # Los escritores que lleguen a partir de aquí crean un registro nuevo
+            compacting = f"{self.log_path}.compacting"
+            os.replace(self.log_path, compacting)
+            remaining, _ = read_log(compacting, self.offset)
+            if len(remaining):
+                self.apply(remaining)
+            ratings_df, _ = read_log(compacting)
+
+            base_exists = os.path.exists(self.ratings_path)
+            columns = list(pd.read_csv(self.ratings_path, nrows=0).columns) if base_exists else LOG_COLUMNS
+            if self._replaced:
+                self._rewrite_ratings(ratings_df, columns)
+            else:
+                self._append_ratings(ratings_df, columns, base_exists)
+            os.remove(compacting)
+            self.offset = 0
+            self._log_id = None
+            self._replaced = False
+
+            # La caché binaria y el índice colaborativo ya reflejan el registro:
+            # se guardan con la firma nueva de ratings.csv
+            try:
+                write_dataset_cache(
+                    self.movies_df, self.cache_dir,
+                    source_signature([self.movies_path, self.ratings_path])
+                )
+            except OSError:
+                pass
+            if self.neighbor_index is not None:
+                fingerprint, model_path = similarity_model_key(
+                    self.movies_df, k=self.k, model_dir=self.model_dir, engine='collaborative',
+                    ratings_path=self.ratings_path
+                )
+                store_model(fingerprint, model_path, self._published_index())
+            return len(ratings_df)
+
+    def _append_ratings(self, ratings_df, columns, base_exists):
+        """Añadir las calificaciones del registro al final de ratings.csv."""
+        missing_newline = False
+        if base_exists and os.path.getsize(self.ratings_path) > 0:
+            with open(self.ratings_path, 'rb') as tail:
+                tail.seek(-1, os.SEEK_END)
+                missing_newline = tail.read(1) != b"\n"
+        with open(self.ratings_path, 'ab') as f:
+            if missing_newline:
+                f.write(b"\n")
+            f.write(ratings_df.reindex(columns=columns).to_csv(index=False, header=not base_exists).encode('utf-8'))
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _rewrite_ratings(self, ratings_df, columns):
+        """Reescribir ratings.csv con una sola fila por par (la última) cuando hay recalificaciones."""
+        frames = [pd.read_csv(self.ratings_path)] if os.path.exists(self.ratings_path) else []
+        combined = pd.concat(frames + [ratings_df.reindex(columns=columns)], ignore_index=True)
+        combined = combined.drop_duplicates(['userId', 'movieId'], keep='last')
+        partial = f"{self.ratings_path}.partial"
+        with open(partial, 'w', encoding='utf-8', newline='') as f:
+            combined.to_csv(f, index=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(partial, self.ratings_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Registro incremental de calificaciones")
+    parser.add_argument('command', choices=['append', 'status', 'compact'])
+    parser.add_argument('--data-dir', default=DATA_DIR, help="Directorio con movies.csv y ratings.csv")
+    parser.add_argument('--input', default=None, help="CSV con userId, movieId, rating (y timestamp)")
+    parser.add_argument('--rating', nargs=3, action='append', metavar=('USER', 'MOVIE', 'RATING'),
+                        help="Calificación suelta (se puede repetir)")
+    parser.add_argument('--neighbors', action='store_true',
+                        help="Al compactar, actualizar también el índice colaborativo")
+    args = parser.parse_args()
+    path = log_path(args.data_dir)
+
+    if args.command == 'append':
+        frames = [pd.read_csv(args.input)] if args.input else []
+        if args.rating:
+            frames.append(pd.DataFrame(
+                [(int(user), int(movie), float(rating)) for user, movie, rating in args.rating],
+                columns=['userId', 'movieId', 'rating']
+            ))
+        if not frames:
+            parser.error("append necesita --input o --rating")
+        added = sum(append_ratings(path, frame) for frame in frames)
+        print(f"✅ {added:,} calificaciones añadidas a {path}")
+    elif args.command == 'status':
+        pending, _ = read_log(path)
+        print(f"{path}: {len(pending):,} calificaciones pendientes de compactar")
+    else:
+        start = time.perf_counter()
+        movies_df = load_movielens(args.data_dir)
+        if movies_df is None:
+            parser.error(f"No existe {os.path.join(args.data_dir, 'movies.csv')}")
+        updater = IncrementalRatings(movies_df, args.data_dir, track_neighbors=args.neighbors)
+        summary = updater.refresh()
+        compacted = updater.compact()
+        print(f"✅ {compacted:,} calificaciones compactadas en ratings.csv "
+              f"({summary['movies'] if summary else 0:,} películas, "
+              f"{summary['neighbor_rows'] if summary else 0:,} filas de vecinos) "
+              f"en {time.perf_counter() - start:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
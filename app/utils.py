@@ -4,18 +4,60 @@ Utilidades para el sistema de recomendación de películas
 
 import pandas as pd
 import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity
-from sklearn.feature_extraction.text import TfidfVectorizer
+import hashlib
+import json
 import pickle
 import os
-import re
+import threading
+import weakref
 
-def load_movie_data(file_path=None):
+from .aggregates import AGGREGATES_VERSION, DatasetAggregates
+from .ann import DEFAULT_DIM, DEFAULT_RERANK, IVFIndex, build_ann_index, project_features
+from .dataset import load_movielens
+from .genres import GenreIndex
+from .metrics import record_cache, record_size, timed, timer
+from .neighbors import NeighborIndex, build_neighbor_index, seed_scores, top_k_neighbors, top_k_scores
+from .ranking import RankingIndex
+from .search import SearchIndex
+from .titles import TitleIndex
+
+# Dataset de MovieLens
+DATA_DIR = "ml-latest-small 2"
+MOVIES_PATH = os.path.join(DATA_DIR, "movies.csv")
+RATINGS_PATH = os.path.join(DATA_DIR, "ratings.csv")
+TAGS_PATH = os.path.join(DATA_DIR, "tags.csv")
+
+# Motores de recomendación disponibles
+ENGINES = ('content', 'collaborative')
+
+# Versión del formato de los modelos guardados; cambiarla invalida los artefactos previos
+MODEL_FORMAT_VERSION = 1
+MODEL_DIR = os.path.join(".cache", "models")
+# Tipo de las similitudes y factores en memoria: None (float32), 'float16' o 'int8'
+SCORE_DTYPE = os.environ.get('MOVIE_RECOMMENDER_SCORE_DTYPE') or None
+
+# Modelos ya construidos en este proceso (compartidos entre sesiones de Streamlit)
+_model_cache = {}
+_model_cache_lock = threading.Lock()
+_model_build_locks = {}
+
+# Estructuras derivadas de cada DataFrame (índices de títulos, etc.), por id del objeto
+_derived_cache = {}
+# Reentrante: una estructura puede construirse a partir de otras del mismo DataFrame
+_derived_cache_lock = threading.RLock()
+
+@timed()
+def load_movie_data(file_path=None, data_dir=DATA_DIR, use_cache=True):
     """
     Cargar datos de películas desde el dataset de MovieLens
     
+    La primera carga genera una caché columnar binaria (ver app/dataset.py);
+    las siguientes la mapean en memoria mientras los CSV no cambien.
+    
     Args:
         file_path (str): Ruta al archivo CSV con datos de películas
+        data_dir (str): Directorio del dataset de MovieLens
+        use_cache (bool): Usar la caché binaria del dataset
         
     Returns:
         pd.DataFrame: DataFrame con los datos de películas
@@ -24,30 +66,8 @@ def load_movie_data(file_path=None):
         return pd.read_csv(file_path)
     else:
         # Cargar dataset de MovieLens
-        movies_path = "ml-latest-small 2/movies.csv"
-        ratings_path = "ml-latest-small 2/ratings.csv"
-        
-        if os.path.exists(movies_path):
-            movies_df = pd.read_csv(movies_path)
-            
-            # Extraer año del título
-            movies_df['year'] = movies_df['title'].str.extract(r'\((\d{4})\)')
-            movies_df['year'] = pd.to_numeric(movies_df['year'], errors='coerce')
-            
-            # Calcular rating promedio si existe ratings.csv
-            if os.path.exists(ratings_path):
-                ratings_df = pd.read_csv(ratings_path)
-                avg_ratings = ratings_df.groupby('movieId')['rating'].agg(['mean', 'count']).reset_index()
-                avg_ratings.columns = ['movieId', 'avg_rating', 'rating_count']
-                
-                # Unir con películas
-                movies_df = movies_df.merge(avg_ratings, on='movieId', how='left')
-                movies_df['avg_rating'] = movies_df['avg_rating'].fillna(0)
-                movies_df['rating_count'] = movies_df['rating_count'].fillna(0)
-            else:
-                movies_df['avg_rating'] = 0
-                movies_df['rating_count'] = 0
-            
+        movies_df = load_movielens(data_dir, use_cache=use_cache)
+        if movies_df is not None:
             return movies_df
         else:
             # Datos de ejemplo como fallback
@@ -77,10 +97,47 @@ def load_movie_data(file_path=None):
             }
             return pd.DataFrame(movies_data)
 
+@timed('tfidf_features')
+def _content_features(movies_df, feature_column='genres'):
+    """
+    Vectorizar una columna de características con TF-IDF
+    
+    Args:
+        movies_df (pd.DataFrame): DataFrame con datos de películas
+        feature_column (str): Columna a vectorizar
+        
+    Returns:
+        scipy.sparse.csr_matrix: Matriz TF-IDF (filas = películas)
+    """
+    # scikit-learn tarda ~2 s en importarse: solo se carga al construir un modelo
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    tfidf = TfidfVectorizer(stop_words='english')
+    return tfidf.fit_transform(movies_df[feature_column].astype(object).fillna(''))
+
+@timed('hashed_features')
+def _hashed_content_features(movies_df, tags_path=TAGS_PATH):
+    """
+    Características con hashing de géneros, etiquetas (tags.csv) y títulos
+    
+    Args:
+        movies_df (pd.DataFrame): DataFrame con datos de películas
+        tags_path (str): Ruta a tags.csv (si no existe se usan solo géneros y títulos)
+        
+    Returns:
+        scipy.sparse.csr_matrix: Características (filas = películas)
+    """
+    from .features import build_hashed_features
+    
+    return build_hashed_features(movies_df, tags_path).matrix()
+
+@timed()
 def create_similarity_matrix(movies_df, feature_column='genres'):
     """
     Crear matriz de similitud basada en una columna de características
     
+    La matriz es densa (N×N); para catálogos grandes usar create_neighbor_index.
+    
     Args:
         movies_df (pd.DataFrame): DataFrame con datos de películas
         feature_column (str): Columna a usar para calcular similitud
@@ -88,52 +145,418 @@ def create_similarity_matrix(movies_df, feature_column='genres'):
     Returns:
         np.ndarray: Matriz de similitud coseno
     """
-    tfidf = TfidfVectorizer(stop_words='english')
-    tfidf_matrix = tfidf.fit_transform(movies_df[feature_column])
+    from sklearn.metrics.pairwise import cosine_similarity
+
+    tfidf_matrix = _content_features(movies_df, feature_column)
     return cosine_similarity(tfidf_matrix, tfidf_matrix)
 
+@timed()
+def create_neighbor_index(movies_df, feature_column='genres', k=50, block_size=None,
+                          content_features='tfidf', tags_path=TAGS_PATH):
+    """
+    Crear índice con los K vecinos más similares de cada película
+    
+    Las similitudes se calculan por bloques de filas, así que la memoria pico
+    queda acotada aunque el catálogo crezca.
+    
+    Args:
+        movies_df (pd.DataFrame): DataFrame con datos de películas
+        feature_column (str): Columna a usar para calcular similitud
+        k (int): Número de vecinos a guardar por película
+        block_size (int): Filas por bloque (None para calcularlo automáticamente)
+        content_features (str): 'tfidf' (feature_column) o 'hashed' (géneros, etiquetas y títulos)
+        tags_path (str): Ruta a tags.csv (solo con 'hashed')
+        
+    Returns:
+        NeighborIndex: Índice disperso de vecinos
+    """
+    if content_features == 'hashed':
+        features = _hashed_content_features(movies_df, tags_path)
+    elif content_features == 'tfidf':
+        features = _content_features(movies_df, feature_column)
+    else:
+        raise ValueError(f"Características desconocidas: {content_features}")
+    return build_neighbor_index(features, k=k, block_size=block_size)
+
+def _derived_structure(movies_df, name, builder):
+    """
+    Obtener una estructura derivada de un DataFrame, construyéndola una vez
+    
+    La estructura vive mientras viva el DataFrame. Si el DataFrame se modifica
+    después de construirla hay que llamar a invalidate_derived_structures.
+    Cada estructura tiene su propio candado, así que una construcción lenta
+    (p. ej. leer ratings.csv) no bloquea las consultas a las demás.
+    
+    Args:
+        movies_df (pd.DataFrame): DataFrame con datos de películas
+        name (str): Nombre de la estructura
+        builder (callable): Función que la construye a partir del DataFrame
+        
+    Returns:
+        Estructura construida por builder
+    """
+    key = id(movies_df)
+    with _derived_cache_lock:
+        entry = _derived_cache.get(key)
+        if entry is None or entry['ref']() is not movies_df:
+            def _evict(ref, key=key):
+                with _derived_cache_lock:
+                    if key in _derived_cache and _derived_cache[key]['ref'] is ref:
+                        del _derived_cache[key]
+            entry = {'ref': weakref.ref(movies_df, _evict), 'structures': {}, 'locks': {}, 'generation': 0}
+            _derived_cache[key] = entry
+        structures = entry['structures']
+        record_cache(f'derived_{name}', name in structures)
+        if name in structures:
+            return structures[name]
+        build_lock = entry['locks'].setdefault(name, threading.Lock())
+    
+    with build_lock:
+        with _derived_cache_lock:
+            if name in structures:
+                return structures[name]
+            generation = entry['generation']
+        with timer('structure_build', structure=name):
+            structure = builder(movies_df)
+        with _derived_cache_lock:
+            # Si el DataFrame cambió mientras se construía, no se guarda
+            if entry['generation'] == generation:
+                structures[name] = structure
+        return structure
+
+def invalidate_derived_structures(movies_df, names=None):
+    """
+    Descartar las estructuras derivadas de un DataFrame que se ha modificado
+    
+    Args:
+        movies_df (pd.DataFrame): DataFrame con datos de películas
+        names (list): Estructuras a descartar (None para todas), p. ej. solo
+            las que dependen de las calificaciones
+    """
+    with _derived_cache_lock:
+        entry = _derived_cache.get(id(movies_df))
+        if entry is not None and entry['ref']() is movies_df:
+            entry['generation'] += 1
+            if names is None:
+                entry['structures'].clear()
+            for name in names or ():
+                entry['structures'].pop(name, None)
+
+def update_rating_columns(movies_df, positions, avg_ratings, rating_counts, structures):
+    """
+    Escribir promedios y conteos nuevos en el DataFrame compartido
+    
+    La escritura y el descarte de las estructuras afectadas se hacen bajo el
+    candado de las estructuras derivadas. El índice de búsqueda solo usa
+    rating_count para desempatar, así que se le actualiza la popularidad en
+    su sitio en vez de reconstruirlo.
+    
+    Args:
+        movies_df (pd.DataFrame): DataFrame con avg_rating y rating_count
+        positions (np.ndarray): Posiciones de las películas actualizadas
+        avg_ratings (np.ndarray): Promedio nuevo de cada posición
+        rating_counts (np.ndarray): Conteo nuevo de cada posición
+        structures (tuple): Estructuras derivadas que dependen de las calificaciones
+    """
+    avg_column = movies_df.columns.get_loc('avg_rating')
+    count_column = movies_df.columns.get_loc('rating_count')
+    with _derived_cache_lock:
+        movies_df.iloc[positions, avg_column] = np.asarray(avg_ratings).astype(movies_df.dtypes.iloc[avg_column])
+        movies_df.iloc[positions, count_column] = np.asarray(rating_counts).astype(
+            movies_df.dtypes.iloc[count_column]
+        )
+        invalidate_derived_structures(movies_df, structures)
+        entry = _derived_cache.get(id(movies_df))
+        if entry is not None and entry['ref']() is movies_df and 'search' in entry['structures']:
+            entry['structures']['search'].set_popularity(movies_df['rating_count'].to_numpy())
+
+def get_title_index(movies_df):
+    """
+    Obtener el índice de títulos normalizados del DataFrame
+    
+    Args:
+        movies_df (pd.DataFrame): DataFrame con datos de películas
+        
+    Returns:
+        TitleIndex: Índice de títulos (se construye una sola vez por DataFrame)
+    """
+    return _derived_structure(movies_df, 'titles', TitleIndex)
+
+def get_search_index(movies_df):
+    """
+    Obtener el índice de trigramas para buscar títulos
+    
+    Args:
+        movies_df (pd.DataFrame): DataFrame con datos de películas
+        
+    Returns:
+        SearchIndex: Índice de búsqueda (se construye una sola vez por DataFrame)
+    """
+    return _derived_structure(movies_df, 'search', SearchIndex)
+
+@timed()
+def create_collaborative_index(movies_df, ratings_path=RATINGS_PATH, k=50, block_size=None, n_jobs=None):
+    """
+    Crear índice de vecinos con filtrado colaborativo ítem-ítem
+    
+    Args:
+        movies_df (pd.DataFrame): DataFrame con datos de películas
+        ratings_path (str): Ruta a ratings.csv
+        k (int): Número de vecinos a guardar por película
+        block_size (int): Películas por bloque (None para calcularlo automáticamente)
+        n_jobs (int): Hilos de trabajo (None para usar todos los núcleos)
+        
+    Returns:
+        NeighborIndex: Índice de vecinos alineado con las filas de movies_df
+    """
+    from .collaborative import build_item_similarity_index, build_rating_matrix, load_ratings
+
+    rating_matrix, _ = build_rating_matrix(load_ratings(ratings_path), movies_df['movieId'].to_numpy())
+    return build_item_similarity_index(rating_matrix, k=k, block_size=block_size, n_jobs=n_jobs)
+
+def get_user_ratings(movies_df, ratings_path=RATINGS_PATH):
+    """
+    Obtener las calificaciones de cada usuario (ratings.csv y el registro de
+    calificaciones nuevas que aún no se ha compactado)
+    
+    Args:
+        movies_df (pd.DataFrame): DataFrame con datos de películas
+        ratings_path (str): Ruta a ratings.csv
+        
+    Returns:
+        UserRatings: Calificaciones por userId (se construyen una sola vez por DataFrame)
+    """
+    def build(movies_df):
+        from .collaborative import UserRatings, load_ratings
+        from .updates import log_path, read_log
+        
+        ratings = load_ratings(ratings_path)
+        pending, _ = read_log(log_path(os.path.dirname(ratings_path)))
+        if len(pending):
+            # Si un usuario vuelve a calificar una película vale la última calificación
+            ratings = pd.concat([ratings, pending[ratings.columns]], ignore_index=True)
+            ratings = ratings.drop_duplicates(['userId', 'movieId'], keep='last')
+        return UserRatings(ratings, movies_df['movieId'].to_numpy(), ratings_path)
+    
+    user_ratings = _derived_structure(movies_df, 'user_ratings', build)
+    if user_ratings.ratings_path != ratings_path:
+        return build(movies_df)
+    return user_ratings
+
+def get_genre_index(movies_df):
+    """
+    Obtener el índice de géneros (máscaras de bits) del DataFrame
+    
+    Args:
+        movies_df (pd.DataFrame): DataFrame con datos de películas
+        
+    Returns:
+        GenreIndex: Índice de géneros (se construye una sola vez por DataFrame)
+    """
+    return _derived_structure(movies_df, 'genres', GenreIndex)
+
+def get_ranking_index(movies_df):
+    """
+    Obtener los rankings precalculados de películas populares
+    
+    Args:
+        movies_df (pd.DataFrame): DataFrame con datos de películas
+        
+    Returns:
+        RankingIndex: Rankings (se construyen una sola vez por DataFrame)
+    """
+    return _derived_structure(movies_df, 'ranking', RankingIndex)
+
+def _rating_order(movies_df):
+    """Posiciones de las películas ordenadas por avg_rating descendente (estable)."""
+    return np.argsort(-movies_df['avg_rating'].to_numpy(dtype=np.float64), kind='stable')
+
+def _find_movie_position(movies_df, movie, year=None):
+    """
+    Encontrar la posición de una película por título o por movieId
+    
+    Args:
+        movies_df (pd.DataFrame): DataFrame con datos de películas
+        movie (str | int): Título (con o sin año) o movieId
+        year (int): Año para desambiguar títulos repetidos
+        
+    Returns:
+        int: Posición de la película en el DataFrame, o None si no existe
+    """
+    title_index = get_title_index(movies_df)
+    if isinstance(movie, (int, np.integer)):
+        return title_index.position_of_id(movie)
+    return title_index.resolve(movie, year)
+
+def _find_movie_positions(movies_df, movies):
+    """
+    Encontrar las posiciones de varias películas por título o por movieId
+    
+    Los movieId se buscan de una vez; solo los títulos se resuelven uno a uno.
+    
+    Args:
+        movies_df (pd.DataFrame): DataFrame con datos de películas
+        movies (list): Títulos o movieIds
+        
+    Returns:
+        np.ndarray: Posición de cada película (-1 si no existe)
+    """
+    title_index = get_title_index(movies_df)
+    movies = list(movies)
+    positions = np.full(len(movies), -1, dtype=np.int64)
+    is_id = np.fromiter((isinstance(movie, (int, np.integer)) for movie in movies), dtype=bool, count=len(movies))
+    if is_id.any():
+        positions[is_id] = title_index.positions_of_ids([movie for movie, flag in zip(movies, is_id) if flag])
+    for i in np.flatnonzero(~is_id):
+        position = title_index.resolve(movies[i])
+        positions[i] = -1 if position is None else position
+    return positions
+
+@timed()
 def get_movie_recommendations(movies_df, movie_title, similarity_matrix, n_recommendations=5):
     """
     Obtener recomendaciones de películas basadas en similitud
     
     Args:
         movies_df (pd.DataFrame): DataFrame con datos de películas
-        movie_title (str): Título de la película de referencia
-        similarity_matrix (np.ndarray): Matriz de similitud
+        movie_title (str | int): Título de la película de referencia o su movieId
+        similarity_matrix (np.ndarray | NeighborIndex | IVFIndex): Matriz de similitud o índice de vecinos
         n_recommendations (int): Número de recomendaciones a devolver
         
     Returns:
         pd.DataFrame: DataFrame con las películas recomendadas
     """
     try:
-        # Buscar película por título (ignorando año)
-        movie_title_clean = re.sub(r'\s*\(\d{4}\)', '', movie_title).strip()
-        movies_df['title_clean'] = movies_df['title'].str.replace(r'\s*\(\d{4}\)', '', regex=True)
-        
-        # Buscar coincidencia exacta o parcial
-        movie_idx = movies_df[movies_df['title_clean'].str.contains(movie_title_clean, case=False, na=False)].index
-        
-        if len(movie_idx) == 0:
+        movie_idx = _find_movie_position(movies_df, movie_title)
+        if movie_idx is None:
             return pd.DataFrame()
         
-        movie_idx = movie_idx[0]
-        
-        # Obtener similitudes para la película
-        sim_scores = list(enumerate(similarity_matrix[movie_idx]))
-        sim_scores = sorted(sim_scores, key=lambda x: x[1], reverse=True)
-        
-        # Obtener las películas más similares (excluyendo la misma)
-        sim_scores = sim_scores[1:n_recommendations+1]
-        movie_indices = [i[0] for i in sim_scores]
+        # Selección parcial de las más similares (excluyendo la misma)
+        indices, _ = top_k_neighbors(similarity_matrix, [movie_idx], n_recommendations)
+        movie_indices = indices[0][indices[0] >= 0]
         
         return movies_df.iloc[movie_indices]
     except (IndexError, KeyError):
         return pd.DataFrame()
 
+@timed()
+def get_batch_recommendations(movies_df, movies, similarity_matrix, n_recommendations=5):
+    """
+    Obtener recomendaciones para muchas películas en una sola pasada
+    
+    Pensado para precalcular "películas similares" de todo el catálogo: la
+    selección de los K vecinos se hace de forma vectorizada para todas las
+    consultas a la vez.
+    
+    Args:
+        movies_df (pd.DataFrame): DataFrame con datos de películas
+        movies (list): Títulos o movieIds de referencia (None para todo el catálogo)
+        similarity_matrix (np.ndarray | NeighborIndex | IVFIndex): Matriz de similitud o índice de vecinos
+        n_recommendations (int): Número de recomendaciones por película
+        
+    Returns:
+        pd.DataFrame: Una fila por recomendación con las columnas
+        query, query_movieId, rank, movieId, title y score
+    """
+    if movies is None:
+        movies = movies_df['movieId'].tolist()
+        positions = np.arange(len(movies_df))
+    else:
+        movies = list(movies)
+        positions = _find_movie_positions(movies_df, movies)
+    
+    found = positions >= 0
+    queries = np.asarray(movies, dtype=object)[found]
+    positions = positions[found]
+    indices, scores = top_k_neighbors(similarity_matrix, positions, n_recommendations)
+    
+    valid = indices >= 0
+    query_rows, ranks = np.nonzero(valid)
+    neighbor_positions = indices[valid]
+    return pd.DataFrame({
+        'query': queries[query_rows],
+        'query_movieId': movies_df['movieId'].to_numpy()[positions[query_rows]],
+        'rank': ranks + 1,
+        'movieId': movies_df['movieId'].to_numpy()[neighbor_positions],
+        'title': movies_df['title'].to_numpy()[neighbor_positions],
+        'score': scores[valid]
+    })
+
+@timed()
+def get_multi_seed_recommendations(movies_df, seeds, similarity_matrix, n_recommendations=10, exclude=None):
+    """
+    Recomendar películas parecidas a un conjunto de películas ("más como estas")
+    
+    Las filas de similitud de las semillas se suman, ponderadas, en un único
+    producto disperso, así que la latencia apenas crece con el número de
+    semillas. Las semillas y las películas excluidas nunca se recomiendan.
+    
+    Args:
+        movies_df (pd.DataFrame): DataFrame con datos de películas
+        seeds (dict | list): {título o movieId: peso} o lista de títulos o movieIds (peso 1);
+            un peso negativo aleja las recomendaciones de esa película
+        similarity_matrix (np.ndarray | NeighborIndex | IVFIndex): Matriz de similitud o índice de vecinos
+        n_recommendations (int): Número de recomendaciones a devolver
+        exclude (list): Títulos o movieIds que no se deben recomendar
+        
+    Returns:
+        pd.DataFrame: Películas recomendadas (vacío si ninguna semilla existe)
+    """
+    if not isinstance(seeds, dict):
+        seeds = dict.fromkeys(seeds, 1.0)
+    positions = _find_movie_positions(movies_df, seeds.keys())
+    weights = np.fromiter(seeds.values(), dtype=np.float32, count=len(seeds))
+    found = positions >= 0
+    if not found.any():
+        return pd.DataFrame()
+    
+    excluded = _find_movie_positions(movies_df, exclude or ())
+    scores = seed_scores(similarity_matrix, positions[found], weights[found])
+    movie_indices, _ = top_k_scores(
+        scores, n_recommendations, exclude=np.concatenate([positions[found], excluded[excluded >= 0]])
+    )
+    return movies_df.iloc[movie_indices]
+
+@timed()
+def get_user_recommendations(movies_df, user_id, similarity_matrix, ratings_path=RATINGS_PATH, n_recommendations=10):
+    """
+    Recomendar películas a un usuario de ratings.csv a partir de lo que ya calificó
+    
+    Cada película calificada es una semilla con peso igual a su calificación
+    menos el promedio del usuario (las que le gustaron menos que su media
+    restan); si todas tienen la misma calificación pesan lo mismo. Las
+    películas ya calificadas se excluyen.
+    
+    Args:
+        movies_df (pd.DataFrame): DataFrame con datos de películas
+        user_id (int): userId de ratings.csv
+        similarity_matrix (np.ndarray | NeighborIndex | IVFIndex): Matriz de similitud o índice de vecinos
+        ratings_path (str): Ruta a ratings.csv
+        n_recommendations (int): Número de recomendaciones a devolver
+        
+    Returns:
+        pd.DataFrame: Películas recomendadas (vacío si el usuario no existe)
+    """
+    user_ratings = get_user_ratings(movies_df, ratings_path).ratings(user_id)
+    if user_ratings is None or len(user_ratings[0]) == 0:
+        return pd.DataFrame()
+    
+    positions, ratings = user_ratings
+    weights = ratings - ratings.mean()
+    if not np.any(weights):
+        weights = np.ones_like(ratings)
+    scores = seed_scores(similarity_matrix, positions, weights)
+    movie_indices, _ = top_k_scores(scores, n_recommendations, exclude=positions)
+    return movies_df.iloc[movie_indices]
+
+@timed()
 def search_movies(movies_df, query, limit=10):
     """
     Buscar películas por título
     
+    Los resultados se ordenan por similitud de trigramas con la consulta
+    (tolerando errores de escritura) y, a igualdad, por número de calificaciones.
+    
     Args:
         movies_df (pd.DataFrame): DataFrame con datos de películas
         query (str): Término de búsqueda
@@ -142,13 +565,11 @@ def search_movies(movies_df, query, limit=10):
     Returns:
         pd.DataFrame: Películas que coinciden con la búsqueda
     """
-    query_lower = query.lower()
-    matches = movies_df[
-        movies_df['title'].str.lower().str.contains(query_lower, na=False)
-    ].head(limit)
-    return matches
+    positions, _ = get_search_index(movies_df).search(query, limit=limit)
+    return movies_df.iloc[positions]
 
-def get_popular_movies(movies_df, min_ratings=10, limit=20):
+@timed()
+def get_popular_movies(movies_df, min_ratings=10, limit=20, score='avg_rating'):
     """
     Obtener películas populares basadas en calificaciones
     
@@ -156,65 +577,412 @@ def get_popular_movies(movies_df, min_ratings=10, limit=20):
         movies_df (pd.DataFrame): DataFrame con datos de películas
         min_ratings (int): Número mínimo de calificaciones
         limit (int): Número máximo de resultados
+        score (str): 'avg_rating' (promedio) o 'weighted' (promedio bayesiano)
         
     Returns:
         pd.DataFrame: DataFrame con las películas populares
     """
-    # Verificar si rating_count existe
-    if 'rating_count' in movies_df.columns:
-        popular = movies_df[
-            (movies_df['rating_count'] >= min_ratings) & 
-            (movies_df['avg_rating'] > 0)
-        ].sort_values('avg_rating', ascending=False).head(limit)
-    else:
-        # Si no hay rating_count, usar solo avg_rating
-        popular = movies_df[
-            (movies_df['avg_rating'] > 0)
-        ].sort_values('avg_rating', ascending=False).head(limit)
-    
-    return popular
+    # Si no hay rating_count el índice usa solo avg_rating
+    positions = get_ranking_index(movies_df).top(min_ratings=min_ratings, limit=limit, score=score)
+    return movies_df.iloc[positions]
 
-def get_movies_by_genre(movies_df, genre, limit=20):
+@timed()
+def get_movies_by_genre(movies_df, genre, limit=20, match='any', exclude=None):
     """
     Obtener películas por género
     
+    Los géneros se resuelven sin distinguir mayúsculas; un nombre parcial
+    ("sci") equivale a todos los géneros que lo contienen.
+    
     Args:
         movies_df (pd.DataFrame): DataFrame con datos de películas
-        genre (str): Género a buscar
+        genre (str | list): Género o lista de géneros a buscar
         limit (int): Número máximo de resultados
+        match (str): 'any' (alguno de los géneros) o 'all' (todos)
+        exclude (str | list): Géneros que las películas no deben tener
         
     Returns:
-        pd.DataFrame: Películas del género especificado
+        pd.DataFrame: Películas del género especificado, por calificación
     """
-    genre_movies = movies_df[
-        movies_df['genres'].str.contains(genre, case=False, na=False)
-    ].sort_values('avg_rating', ascending=False).head(limit)
-    return genre_movies
+    genre_index = get_genre_index(movies_df)
+    names = [genre] if isinstance(genre, str) else list(genre)
+    excluded = [exclude] if isinstance(exclude, str) else list(exclude or [])
+    
+    if match == 'all':
+        selected = np.ones(len(movies_df), dtype=bool)
+        for name in names:
+            selected &= genre_index.select(any_of=genre_index.resolve(name))
+    else:
+        selected = genre_index.select(any_of=[g for name in names for g in genre_index.resolve(name)])
+    if excluded:
+        selected &= genre_index.select(none_of=[g for name in excluded for g in genre_index.resolve(name)])
+    
+    # Recorrer el orden por calificación precalculado en lugar de ordenar en cada llamada
+    order = _derived_structure(movies_df, 'rating_order', _rating_order)
+    return movies_df.iloc[order[selected[order]][:limit]]
 
-def save_model(model, file_path):
+def dataset_fingerprint(movies_df, config=None, columns=('movieId', 'title', 'genres')):
+    """
+    Calcular una huella del contenido del dataset y de la configuración
+    
+    Args:
+        movies_df (pd.DataFrame): DataFrame con datos de películas
+        config (dict): Parámetros con los que se construye el modelo
+        columns (tuple): Columnas que forman parte de la huella
+        
+    Returns:
+        str: Huella hexadecimal (SHA-1)
+    """
+    digest = hashlib.sha1()
+    digest.update(str(MODEL_FORMAT_VERSION).encode())
+    present = [col for col in columns if col in movies_df.columns]
+    digest.update('|'.join(present).encode())
+    digest.update(pd.util.hash_pandas_object(movies_df[present], index=False).values.tobytes())
+    digest.update(json.dumps(config or {}, sort_keys=True).encode())
+    return digest.hexdigest()
+
+@timed()
+def save_model(model, file_path, fingerprint=None):
     """
     Guardar modelo entrenado en un archivo
     
+    Los índices de vecinos (exactos y aproximados) se guardan como arreglos
+    NumPy (.npz sin comprimir) para que la carga sea rápida; el resto de
+    modelos se guardan con pickle.
+    La escritura es atómica para no dejar artefactos a medias.
+    
     Args:
         model: Modelo a guardar
         file_path (str): Ruta donde guardar el modelo
+        fingerprint (str): Huella del dataset con el que se construyó
     """
-    with open(file_path, 'wb') as f:
-        pickle.dump(model, f)
+    directory = os.path.dirname(file_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    
+    tmp_path = f"{file_path}.tmp-{os.getpid()}"
+    with open(tmp_path, 'wb') as f:
+        if isinstance(model, (NeighborIndex, IVFIndex)):
+            np.savez(
+                f,
+                format_version=np.array(MODEL_FORMAT_VERSION),
+                fingerprint=np.array(fingerprint or ''),
+                model_kind=np.array('ivf' if isinstance(model, IVFIndex) else 'neighbors'),
+                **model.to_arrays()
+            )
+        else:
+            pickle.dump({
+                'format_version': MODEL_FORMAT_VERSION,
+                'fingerprint': fingerprint,
+                'model': model
+            }, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, file_path)
+    record_size('model_artifact_bytes', os.path.getsize(file_path))
 
-def load_model(file_path):
+@timed()
+def load_model(file_path, fingerprint=None):
     """
     Cargar modelo desde un archivo
     
     Args:
         file_path (str): Ruta del archivo del modelo
+        fingerprint (str): Huella esperada; si no coincide el modelo se considera obsoleto
         
     Returns:
-        Modelo cargado
+        Modelo cargado, o None si el artefacto es obsoleto
     """
+    record_size('model_artifact_bytes', os.path.getsize(file_path))
     with open(file_path, 'rb') as f:
-        return pickle.load(f)
+        is_npz = f.read(4) == b'PK\x03\x04'
+        f.seek(0)
+        if is_npz:
+            with np.load(f, allow_pickle=False) as arrays:
+                version = int(arrays['format_version'])
+                stored_fingerprint = str(arrays['fingerprint']) or None
+                # Los artefactos sin model_kind son anteriores al índice aproximado
+                kind = str(arrays['model_kind']) if 'model_kind' in arrays else 'neighbors'
+                model = (IVFIndex if kind == 'ivf' else NeighborIndex).from_arrays(arrays)
+        else:
+            payload = pickle.load(f)
+            if isinstance(payload, dict) and 'format_version' in payload:
+                version = payload['format_version']
+                stored_fingerprint = payload['fingerprint']
+                model = payload['model']
+            else:
+                # Formato antiguo: pickle del modelo sin metadatos
+                version, stored_fingerprint, model = None, None, payload
+    
+    if fingerprint is not None and (version != MODEL_FORMAT_VERSION or stored_fingerprint != fingerprint):
+        return None
+    return model
+
+def _file_signature(file_path):
+    """Tamaño y fecha de modificación de un archivo (para detectar cambios)."""
+    stat = os.stat(file_path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+def get_similarity_model(movies_df, feature_column='genres', k=50, model_dir=MODEL_DIR,
+                         engine='content', ratings_path=RATINGS_PATH, content_features='hashed',
+                         tags_path=TAGS_PATH, score_dtype=SCORE_DTYPE):
+    """
+    Obtener el índice de vecinos de un motor, construyéndolo una sola vez
+    
+    Primero se busca en la caché del proceso, después en disco (``model_dir``)
+    y solo si no existe un artefacto vigente se construye y se guarda.
+    
+    Args:
+        movies_df (pd.DataFrame): DataFrame con datos de películas
+        feature_column (str): Columna a usar para calcular similitud (motor de contenido)
+        k (int): Número de vecinos a guardar por película
+        model_dir (str): Directorio de los artefactos (None para no usar disco)
+        engine (str): 'content' (géneros) o 'collaborative' (ítem-ítem sobre ratings.csv)
+        ratings_path (str): Ruta a ratings.csv (motor colaborativo)
+        content_features (str): 'hashed' (géneros, etiquetas y títulos) o 'tfidf' (feature_column)
+        tags_path (str): Ruta a tags.csv (motor de contenido con 'hashed')
+        score_dtype (str): None (float32), 'float16' o 'int8' para guardar las
+            similitudes cuantizadas (menos memoria; ver app/quantization.py)
+        
+    Returns:
+        NeighborIndex: Índice de vecinos
+    """
+    fingerprint, model_path = similarity_model_key(
+        movies_df, feature_column, k, model_dir, engine, ratings_path, content_features, tags_path, score_dtype
+    )
+    
+    def build():
+        if engine == 'content':
+            index = create_neighbor_index(movies_df, feature_column=feature_column, k=k,
+                                          content_features=content_features, tags_path=tags_path)
+        else:
+            index = create_collaborative_index(movies_df, ratings_path=ratings_path, k=k)
+        return index.quantize(score_dtype) if score_dtype else index
+    
+    return _get_cached_model(fingerprint, model_path, build)
+
+def similarity_model_key(movies_df, feature_column='genres', k=50, model_dir=MODEL_DIR, engine='content',
+                         ratings_path=RATINGS_PATH, content_features='hashed', tags_path=TAGS_PATH,
+                         score_dtype=SCORE_DTYPE):
+    """
+    Huella y ruta en disco del índice de vecinos de un motor
+    
+    Los argumentos son los de get_similarity_model.
+    
+    Returns:
+        tuple: (huella, ruta del artefacto o None)
+    """
+    if engine == 'content' and content_features == 'hashed':
+        config = {
+            'engine': engine, 'features': content_features, 'k': k,
+            'tags': _file_signature(tags_path) if os.path.exists(tags_path) else None
+        }
+    elif engine == 'content':
+        config = {'engine': engine, 'feature_column': feature_column, 'k': k}
+    elif engine == 'collaborative':
+        config = {'engine': engine, 'k': k, 'ratings': _file_signature(ratings_path)}
+    else:
+        raise ValueError(f"Motor desconocido: {engine}")
+    if score_dtype:
+        # Sin la clave los índices en float32 conservan su huella de siempre
+        config['scores'] = score_dtype
+    fingerprint = dataset_fingerprint(movies_df, config)
+    model_path = os.path.join(model_dir, f"{engine}-{fingerprint[:16]}.npz") if model_dir else None
+    return fingerprint, model_path
+
+def _get_cached_model(fingerprint, model_path, build):
+    """
+    Buscar un modelo en la caché del proceso y en disco, o construirlo
+    
+    Cada huella tiene su propio candado, así que construir un modelo lento no
+    bloquea las consultas a otros modelos ya cargados.
+    
+    Args:
+        fingerprint (str): Huella del dataset y la configuración
+        model_path (str): Ruta del artefacto en disco (None para no usar disco)
+        build (callable): Función sin argumentos que construye el modelo
+        
+    Returns:
+        Modelo cargado o construido
+    """
+    with _model_cache_lock:
+        model = _model_cache.get(fingerprint)
+        record_cache('model_memory', model is not None)
+        if model is not None:
+            return model
+        build_lock = _model_build_locks.setdefault(fingerprint, threading.Lock())
+    
+    with build_lock:
+        with _model_cache_lock:
+            model = _model_cache.get(fingerprint)
+        if model is not None:
+            return model
+        
+        if model_path and os.path.exists(model_path):
+            try:
+                model = load_model(model_path, fingerprint)
+            except (OSError, ValueError, KeyError, EOFError, pickle.UnpicklingError):
+                model = None
+        if model_path:
+            record_cache('model_disk', model is not None)
+        
+        if model is None:
+            model = build()
+            if model_path:
+                try:
+                    save_model(model, model_path, fingerprint)
+                except OSError:
+                    pass
+        
+        with _model_cache_lock:
+            _model_cache[fingerprint] = model
+        return model
+
+def store_model(fingerprint, model_path, model):
+    """
+    Publicar un modelo actualizado fuera de get_similarity_model (p. ej. tras
+    una actualización incremental), en la caché del proceso y en disco
+    
+    Args:
+        fingerprint (str): Huella con la que lo buscará get_similarity_model
+        model_path (str): Ruta del artefacto en disco (None para no usar disco)
+        model: Modelo a publicar
+    """
+    if model_path:
+        try:
+            save_model(model, model_path, fingerprint)
+        except OSError:
+            pass
+    with _model_cache_lock:
+        _model_cache[fingerprint] = model
+
+def get_ann_index(movies_df, engine='content', n_lists=None, dim=DEFAULT_DIM, rerank=DEFAULT_RERANK,
+                  model_dir=MODEL_DIR, ratings_path=RATINGS_PATH, tags_path=TAGS_PATH):
+    """
+    Obtener el índice aproximado (IVF) de un motor, construyéndolo una sola vez
+    
+    Se puede pasar como similarity_matrix a get_movie_recommendations y
+    get_batch_recommendations. Las listas recorridas por consulta se ajustan
+    con ``index.n_probe`` o el argumento n_probe de ``search``.
+    
+    Args:
+        movies_df (pd.DataFrame): DataFrame con datos de películas
+        engine (str): 'content' (géneros, etiquetas y títulos) o 'als' (factores latentes)
+        n_lists (int): Número de listas (None para ~4·√N)
+        dim (int): Dimensión de la proyección de las características de contenido
+        rerank (int): Candidatos por vecino reordenados con la similitud exacta (solo contenido)
+        model_dir (str): Directorio de los artefactos (None para no usar disco)
+        ratings_path (str): Ruta a ratings.csv (motor 'als')
+        tags_path (str): Ruta a tags.csv (motor 'content')
+        
+    Returns:
+        IVFIndex: Índice aproximado con las filas en el orden de movies_df
+    """
+    if engine == 'content':
+        config = {
+            'engine': 'ann-content', 'n_lists': n_lists, 'dim': dim, 'rerank': rerank,
+            'tags': _file_signature(tags_path) if os.path.exists(tags_path) else None
+        }
+    elif engine == 'als':
+        config = {'engine': 'ann-als', 'n_lists': n_lists, 'ratings': _file_signature(ratings_path)}
+    else:
+        raise ValueError(f"Motor desconocido: {engine}")
+    fingerprint = dataset_fingerprint(movies_df, config)
+    model_path = os.path.join(model_dir, f"ann-{engine}-{fingerprint[:16]}.npz") if model_dir else None
+    
+    def build():
+        if engine == 'content':
+            features = _hashed_content_features(movies_df, tags_path)
+            return build_ann_index(project_features(features, dim=dim), n_lists=n_lists,
+                                   exact_features=features, rerank=rerank)
+        # Los factores ya son densos: reordenar con ellos mismos no cambia nada
+        model = get_factorization_model(movies_df, ratings_path=ratings_path, model_dir=model_dir)
+        return build_ann_index(model.item_factors, n_lists=n_lists, rerank=1)
+    
+    return _get_cached_model(fingerprint, model_path, build)
 
+def get_available_engines(ratings_path=RATINGS_PATH):
+    """
+    Motores de recomendación que se pueden usar con los datos disponibles
+    
+    Args:
+        ratings_path (str): Ruta a ratings.csv
+        
+    Returns:
+        list: Nombres de motor ('content' siempre; 'collaborative' si hay calificaciones)
+    """
+    return [engine for engine in ENGINES if engine == 'content' or os.path.exists(ratings_path)]
+
+@timed()
+def get_factorization_model(movies_df, ratings_path=RATINGS_PATH, n_factors=32, regularization=0.05,
+                            n_iterations=10, n_jobs=None, model_dir=MODEL_DIR, factor_dtype=SCORE_DTYPE):
+    """
+    Obtener el modelo de factores latentes (ALS), entrenándolo una sola vez
+    
+    Args:
+        movies_df (pd.DataFrame): DataFrame con datos de películas
+        ratings_path (str): Ruta a ratings.csv
+        n_factors (int): Dimensión de los vectores latentes
+        regularization (float): Regularización (λ)
+        n_iterations (int): Iteraciones de ALS
+        n_jobs (int): Hilos de trabajo (None para usar todos los núcleos)
+        model_dir (str): Directorio de los artefactos (None para no usar disco)
+        factor_dtype (str): None (float32), 'float16' o 'int8' para guardar los factores cuantizados
+        
+    Returns:
+        ALSModel: Modelo entrenado; sus filas de item_factors siguen el orden de movies_df
+    """
+    config = {
+        'engine': 'als', 'n_factors': n_factors, 'regularization': regularization,
+        'n_iterations': n_iterations, 'ratings': _file_signature(ratings_path)
+    }
+    if factor_dtype:
+        config['factors'] = factor_dtype
+    fingerprint = dataset_fingerprint(movies_df, config)
+    model_path = os.path.join(model_dir, f"als-{fingerprint[:16]}.pkl") if model_dir else None
+    
+    def build():
+        from .collaborative import build_rating_matrix, load_ratings
+        from .factorization import ALSModel
+
+        rating_matrix, user_ids = build_rating_matrix(load_ratings(ratings_path), movies_df['movieId'].to_numpy())
+        model = ALSModel(n_factors=n_factors, regularization=regularization,
+                         n_iterations=n_iterations, n_jobs=n_jobs).fit(rating_matrix)
+        model.user_ids = user_ids
+        return model.quantize(factor_dtype) if factor_dtype else model
+    
+    return _get_cached_model(fingerprint, model_path, build)
+
+@timed()
+def get_personalized_recommendations(movies_df, model, ratings, n_recommendations=10):
+    """
+    Recomendar películas a un usuario nuevo a partir de unas pocas calificaciones
+    
+    El usuario se incorpora al modelo (fold-in) resolviendo un único sistema
+    de n_factors × n_factors, sin reentrenar.
+    
+    Args:
+        movies_df (pd.DataFrame): DataFrame con datos de películas
+        model (ALSModel): Modelo de factores latentes
+        ratings (dict): Calificaciones del usuario {título o movieId: calificación}
+        n_recommendations (int): Número de recomendaciones a devolver
+        
+    Returns:
+        pd.DataFrame: Películas recomendadas (sin las ya calificadas)
+    """
+    positions, values = [], []
+    for movie, rating in ratings.items():
+        position = _find_movie_position(movies_df, movie)
+        if position is not None:
+            positions.append(position)
+            values.append(rating)
+    
+    if not positions:
+        return pd.DataFrame()
+    
+    user_vector = model.fold_in(positions, values)
+    movie_indices, _ = model.recommend(user_vector, n_recommendations, exclude=positions)
+    return movies_df.iloc[movie_indices]
+
+@timed()
 def calculate_rating_stats(movies_df):
     """
     Calcular estadísticas de calificaciones
@@ -239,6 +1007,7 @@ def calculate_rating_stats(movies_df):
         'total_ratings': movies_df[rating_count_col].sum() if rating_count_col in movies_df.columns else 0
     }
 
+@timed()
 def get_genre_distribution(movies_df):
     """
     Obtener distribución de géneros
@@ -249,10 +1018,30 @@ def get_genre_distribution(movies_df):
     Returns:
         pd.Series: Series con conteo de géneros
     """
-    # Separar géneros múltiples
-    all_genres = []
-    for genres in movies_df['genres']:
-        if pd.notna(genres):
-            all_genres.extend([genre.strip() for genre in genres.split('|')])
+    return get_genre_index(movies_df).counts()
+
+def get_dataset_aggregates(movies_df, model_dir=MODEL_DIR):
+    """
+    Obtener las tablas agregadas de la página de análisis
+    
+    Se calculan una vez por huella del dataset (en memoria y en disco), de
+    modo que los reruns de Streamlit solo leen tablas de tamaño acotado.
+    
+    Args:
+        movies_df (pd.DataFrame): DataFrame con datos de películas
+        model_dir (str): Directorio de los artefactos (None para no usar disco)
+        
+    Returns:
+        DatasetAggregates: Estadísticas, histogramas y conteos por género
+    """
+    def build_for_frame(frame):
+        columns = ('movieId', 'title', 'genres', 'year', 'avg_rating', 'rating_count')
+        fingerprint = dataset_fingerprint(frame, {'aggregates': AGGREGATES_VERSION}, columns=columns)
+        model_path = os.path.join(model_dir, f"aggregates-{fingerprint[:16]}.pkl") if model_dir else None
+        
+        def build():
+            return DatasetAggregates(frame, calculate_rating_stats(frame), get_genre_distribution(frame))
+        
+        return _get_cached_model(fingerprint, model_path, build)
     
-    return pd.Series(all_genres).value_counts() 
\ No newline at end of file
+    return _derived_structure(movies_df, 'aggregates', build_for_frame)
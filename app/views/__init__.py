@@ -0,0 +1,35 @@
+"""
+Páginas de la aplicación de Streamlit
+
+Cada página vive en su propio módulo con una función ``render(movies_df)``.
+main.py solo importa la página seleccionada, de modo que las dependencias
+pesadas de una página (p. ej. Plotly en el análisis) no se cargan al abrir
+las demás. Python guarda los módulos ya importados, así que las
+re-ejecuciones de Streamlit no vuelven a pagar la importación.
+"""
+
+import importlib
+
+# Etiqueta del menú → módulo de la página (en orden de aparición)
+PAGES = {
+    "🏠 Inicio": 'home',
+    "🎯 Recomendaciones": 'recommendations',
+    "🔍 Búsqueda": 'search',
+    "🏆 Películas Populares": 'popular',
+    "🎭 Por Género": 'genres',
+    "📊 Análisis de Datos": 'analysis',
+    "ℹ️ Acerca de": 'about',
+}
+
+
+def load_page(label):
+    """
+    Importar (solo la primera vez) el módulo de una página
+
+    Args:
+        label (str): Etiqueta de la página en el menú
+
+    Returns:
+        module: Módulo con la función render(movies_df)
+    """
+    return importlib.import_module(f"{__name__}.{PAGES[label]}")
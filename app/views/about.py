@@ -0,0 +1,63 @@
+"""
+Página con la información del proyecto
+"""
+
+import streamlit as st
+
+
+def render(movies_df):
+    """
+    Dibujar la página
+
+    Args:
+        movies_df (pd.DataFrame): DataFrame compartido de películas (no se modifica)
+    """
+    st.markdown("""
+    <div style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); 
+                padding: 20px; border-radius: 15px; margin-bottom: 30px;">
+        <h2 style="color: white; text-align: center; margin: 0;">ℹ️ Acerca del Proyecto</h2>
+    </div>
+    """, unsafe_allow_html=True)
+
+    with st.container():
+        st.markdown("""
+        <div class="content-container" style="background-color: #ffffff; padding: 25px; border-radius: 15px; box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);">
+        """, unsafe_allow_html=True)
+
+        st.markdown("### 🎬 Movie Recommender")
+
+        st.markdown("""
+        Este proyecto implementa un sistema de recomendación de películas utilizando técnicas de machine learning.
+        """)
+
+        st.markdown("#### 📊 Dataset:")
+        st.markdown("""
+        - **MovieLens**: Dataset con 9,744 películas y calificaciones de usuarios
+        - **Fuente**: GroupLens Research Group, University of Minnesota
+        """)
+
+        st.markdown("#### 🛠️ Tecnologías utilizadas:")
+        st.markdown("""
+        - **Python**: Lenguaje principal
+        - **Streamlit**: Framework para la interfaz web
+        - **Scikit-learn**: Algoritmos de machine learning
+        - **Pandas**: Manipulación de datos
+        - **Plotly**: Visualizaciones interactivas
+        """)
+
+        st.markdown("#### 🎯 Algoritmos implementados:")
+        st.markdown("""
+        - **Filtrado colaborativo**: Similitud ítem-ítem (coseno ajustado) a partir de las calificaciones
+        - **Análisis de contenido**: Basado en características de las películas
+        - **Hashing de características**: Géneros, etiquetas de usuarios y palabras del título
+        """)
+
+        st.markdown("#### ✨ Características:")
+        st.markdown("""
+        - Búsqueda avanzada de películas
+        - Recomendaciones personalizadas
+        - Análisis de datos y visualizaciones
+        - Películas populares y por género
+        """)
+
+        st.markdown("</div>", unsafe_allow_html=True)
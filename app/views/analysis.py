@@ -0,0 +1,174 @@
+"""
+Página de análisis de datos
+
+Es la única página que usa Plotly, por eso se importa aquí y no en main.py:
+las demás páginas no pagan su tiempo de importación.
+"""
+
+import plotly.express as px
+import plotly.graph_objects as go
+import streamlit as st
+
+from .. import metrics
+from ..utils import get_dataset_aggregates
+
+
+def render(movies_df):
+    """
+    Dibujar la página
+
+    Args:
+        movies_df (pd.DataFrame): DataFrame compartido de películas (no se modifica)
+    """
+    st.markdown("""
+    <div style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); 
+                padding: 20px; border-radius: 15px; margin-bottom: 30px;">
+        <h2 style="color: white; text-align: center; margin: 0;">📊 Análisis de Datos</h2>
+    </div>
+    """, unsafe_allow_html=True)
+
+    # Estadísticas y tablas agregadas (calculadas una vez por dataset, tamaño acotado)
+    aggregates = get_dataset_aggregates(movies_df)
+    metrics.record_size('analysis_payload_bytes', aggregates.nbytes)
+    stats = aggregates.stats
+
+    col1, col2, col3, col4 = st.columns(4)
+
+    with col1:
+        st.markdown(f"""
+        <div style="background: linear-gradient(135deg, #ff6b6b 0%, #ff8e8e 100%); 
+                    padding: 15px; border-radius: 10px; text-align: center; color: white;">
+            <h3 style="margin: 0;">🎬</h3>
+            <h2 style="margin: 5px 0;">{stats['total_movies']:,}</h2>
+            <p style="margin: 0;">Películas</p>
+        </div>
+        """, unsafe_allow_html=True)
+
+    with col2:
+        st.markdown(f"""
+        <div style="background: linear-gradient(135deg, #27ae60 0%, #2ecc71 100%); 
+                    padding: 15px; border-radius: 10px; text-align: center; color: white;">
+            <h3 style="margin: 0;">⭐</h3>
+            <h2 style="margin: 5px 0;">{stats['mean_rating']:.2f}</h2>
+            <p style="margin: 0;">Promedio</p>
+        </div>
+        """, unsafe_allow_html=True)
+
+    with col3:
+        st.markdown(f"""
+        <div style="background: linear-gradient(135deg, #f39c12 0%, #f1c40f 100%); 
+                    padding: 15px; border-radius: 10px; text-align: center; color: white;">
+            <h3 style="margin: 0;">📊</h3>
+            <h2 style="margin: 5px 0;">{stats['total_ratings']:,}</h2>
+            <p style="margin: 0;">Calificaciones</p>
+        </div>
+        """, unsafe_allow_html=True)
+
+    with col4:
+        rated_movies = aggregates.rated_movies
+        st.markdown(f"""
+        <div style="background: linear-gradient(135deg, #9b59b6 0%, #8e44ad 100%); 
+                    padding: 15px; border-radius: 10px; text-align: center; color: white;">
+            <h3 style="margin: 0;">✅</h3>
+            <h2 style="margin: 5px 0;">{rated_movies:,}</h2>
+            <p style="margin: 0;">Con calificaciones</p>
+        </div>
+        """, unsafe_allow_html=True)
+
+    # Gráficos
+    col1, col2 = st.columns(2)
+
+    with col1:
+        # Distribución de calificaciones (histograma precalculado)
+        if aggregates.rated_movies:
+            fig_ratings = px.bar(
+                aggregates.rating_histogram,
+                x='rating',
+                y='count',
+                title="Distribución de Calificaciones",
+                labels={'rating': 'Calificación Promedio', 'count': 'Número de Películas'},
+                color_discrete_sequence=['#ff6b6b']
+            )
+            fig_ratings.update_traces(width=0.25)
+            fig_ratings.update_layout(
+                plot_bgcolor='rgba(0,0,0,0)',
+                paper_bgcolor='rgba(0,0,0,0)',
+                title_font_color='#2c3e50',
+                font_color='#2c3e50'
+            )
+            fig_ratings.update_xaxes(
+                title_font_color='#2c3e50',
+                tickfont_color='#2c3e50'
+            )
+            fig_ratings.update_yaxes(
+                title_font_color='#2c3e50',
+                tickfont_color='#2c3e50'
+            )
+            st.plotly_chart(fig_ratings, use_container_width=True)
+
+    with col2:
+        # Películas por año: densidad año × calificación en lugar de un punto por película
+        density = aggregates.year_rating_density
+        if density.to_numpy().any():
+            fig_years = go.Figure(go.Heatmap(
+                x=density.index,
+                y=density.columns,
+                z=density.to_numpy().T,
+                colorscale='Purples',
+                colorbar={'title': 'Películas'},
+                hovertemplate="Años %{x}: %{y:.2f} ⭐ → %{z} películas<extra></extra>"
+            ))
+            fig_years.update_layout(
+                title="Calificaciones por Año",
+                xaxis_title="Año",
+                yaxis_title="Calificación Promedio"
+            )
+            fig_years.update_layout(
+                plot_bgcolor='rgba(0,0,0,0)',
+                paper_bgcolor='rgba(0,0,0,0)',
+                title_font_color='#2c3e50',
+                font_color='#2c3e50'
+            )
+            fig_years.update_xaxes(
+                title_font_color='#2c3e50',
+                tickfont_color='#2c3e50'
+            )
+            fig_years.update_yaxes(
+                title_font_color='#2c3e50',
+                tickfont_color='#2c3e50'
+            )
+            st.plotly_chart(fig_years, use_container_width=True)
+
+    # Top géneros
+    st.markdown("""
+    <div style="background: linear-gradient(135deg, #27ae60 0%, #2ecc71 100%); 
+                padding: 20px; border-radius: 15px; margin: 30px 0;">
+        <h3 style="color: white; margin: 0;">🎭 Géneros Más Populares</h3>
+    </div>
+    """, unsafe_allow_html=True)
+
+    top_genres = aggregates.genre_counts.head(15)
+
+    fig_genres = px.bar(
+        x=top_genres.values,
+        y=top_genres.index,
+        orientation='h',
+        title="Top 15 Géneros",
+        labels={'x': 'Número de Películas', 'y': 'Género'},
+        color_discrete_sequence=['#ff6b6b']
+    )
+    fig_genres.update_layout(
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        title_font_color='#2c3e50',
+        font_color='#2c3e50'
+    )
+    fig_genres.update_xaxes(
+        title_font_color='#2c3e50',
+        tickfont_color='#2c3e50'
+    )
+    fig_genres.update_yaxes(
+        title_font_color='#2c3e50',
+        tickfont_color='#2c3e50'
+    )
+    st.plotly_chart(fig_genres, use_container_width=True)
@@ -0,0 +1,63 @@
+"""
+Recursos compartidos por las páginas: datos en caché, modelos y tarjetas
+"""
+
+import streamlit as st
+
+from .. import metrics
+from ..cards import DEFAULT_PAGE_SIZE, movie_cards_html, page_count, paginate
+from ..utils import (
+    get_dataset_aggregates, get_genre_index, get_ranking_index, get_search_index, get_similarity_model,
+    get_title_index, load_movie_data
+)
+
+ENGINE_LABELS = {
+    'content': "🎭 Contenido (géneros, etiquetas y títulos)",
+    'collaborative': "👥 Filtrado colaborativo (calificaciones)"
+}
+
+
+# Cargar datos (un único DataFrame compartido; las funciones de utils no lo modifican,
+# salvo IncrementalRatings, que actualiza avg_rating y rating_count con update_rating_columns)
+@st.cache_resource
+def load_data():
+    movies_df = load_movie_data()
+    get_title_index(movies_df)
+    get_search_index(movies_df)
+    get_genre_index(movies_df)
+    get_ranking_index(movies_df)
+    get_dataset_aggregates(movies_df)
+    return movies_df
+
+
+@st.cache_resource
+def load_rating_updates():
+    # Importación diferida: updates trae scipy.sparse, que el arranque no necesita
+    from ..updates import IncrementalRatings
+
+    movies_df = load_data()
+    return IncrementalRatings(movies_df) if 'rating_count' in movies_df.columns else None
+
+
+def refresh_ratings():
+    """Aplicar las calificaciones nuevas del registro (ratings-log.csv) antes de dibujar la página."""
+    updates = load_rating_updates()
+    return updates.refresh() if updates is not None else None
+
+
+@st.cache_resource
+def load_similarity_model(engine='content'):
+    return get_similarity_model(load_data(), engine=engine)
+
+
+def show_movie_cards(movies, key, detail='year', page_size=DEFAULT_PAGE_SIZE):
+    """Mostrar una lista de tarjetas como un único elemento, paginada en el servidor."""
+    pages = page_count(len(movies), page_size)
+    page_number = 1
+    if pages > 1:
+        page_number = st.number_input(
+            f"📄 Página (de {pages}):", min_value=1, max_value=pages, value=1, step=1, key=f"page_{key}_{pages}"
+        )
+    cards_html = movie_cards_html(paginate(movies, page_number, page_size), detail=detail)
+    metrics.record_size('cards_html_bytes', len(cards_html))
+    st.markdown(cards_html, unsafe_allow_html=True)
@@ -0,0 +1,61 @@
+"""
+Página de películas por género (combinación y exclusión de géneros)
+"""
+
+import streamlit as st
+
+from ..utils import get_dataset_aggregates, get_movies_by_genre
+from .common import show_movie_cards
+
+
+def render(movies_df):
+    """
+    Dibujar la página
+
+    Args:
+        movies_df (pd.DataFrame): DataFrame compartido de películas (no se modifica)
+    """
+    st.markdown("""
+    <div style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); 
+                padding: 20px; border-radius: 15px; margin-bottom: 30px;">
+        <h2 style="color: white; text-align: center; margin: 0;">🎭 Películas por Género</h2>
+    </div>
+    """, unsafe_allow_html=True)
+
+    # Obtener géneros únicos
+    genre_dist = get_dataset_aggregates(movies_df).genre_counts
+    available_genres = genre_dist.index.tolist()
+
+    st.markdown("""
+    <div style="background-color: #ffffff; padding: 15px; border-radius: 10px; box-shadow: 0 2px 4px rgba(0, 0, 0, 0.1); margin-bottom: 20px;">
+        <h4 style="color: #2c3e50; margin: 0 0 15px 0;">⚙️ Configuración de filtros:</h4>
+    """, unsafe_allow_html=True)
+    col1, col2 = st.columns(2)
+    with col1:
+        selected_genre = st.selectbox("🎭 Selecciona un género:", available_genres)
+    with col2:
+        limit = st.slider("🎬 Número de películas:", 5, 50, 20)
+    col1, col2 = st.columns(2)
+    with col1:
+        also_genres = st.multiselect("➕ Que también sean de:", available_genres)
+    with col2:
+        excluded_genres = st.multiselect("🚫 Excluir géneros:", available_genres)
+    st.markdown("</div>", unsafe_allow_html=True)
+
+    if selected_genre:
+        genre_movies = get_movies_by_genre(
+            movies_df, [selected_genre] + also_genres, limit=limit,
+            match='all', exclude=excluded_genres
+        )
+
+        if not genre_movies.empty:
+            st.markdown(f"""
+            <div style="background: linear-gradient(135deg, #ff6b6b 0%, #ff8e8e 100%); 
+                        padding: 20px; border-radius: 15px; margin: 20px 0;">
+                <h3 style="color: white; margin: 0;">🎭 Películas de {selected_genre}:</h3>
+            </div>
+            """, unsafe_allow_html=True)
+
+            show_movie_cards(genre_movies, key='genre', detail='year')
+        else:
+            st.warning(f"❌ No se encontraron películas del género {selected_genre}.")
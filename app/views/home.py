@@ -0,0 +1,68 @@
+"""
+Página de inicio: bienvenida, estadísticas y películas más populares
+"""
+
+import streamlit as st
+
+from ..utils import get_dataset_aggregates, get_popular_movies
+from .common import show_movie_cards
+
+
+def render(movies_df):
+    """
+    Dibujar la página
+
+    Args:
+        movies_df (pd.DataFrame): DataFrame compartido de películas (no se modifica)
+    """
+    st.markdown("""
+    <div style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); 
+                padding: 30px; border-radius: 15px; margin-bottom: 30px;">
+        <h2 style="color: white; text-align: center; margin: 0;">Bienvenido al Sistema de Recomendación</h2>
+    </div>
+    """, unsafe_allow_html=True)
+
+    col1, col2 = st.columns([2, 1])
+
+    with col1:
+        st.markdown("""
+        <div style="background-color: #ffffff; padding: 25px; border-radius: 15px; box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);">
+            <h3 style="color: #2c3e50; margin-top: 0;">✨ Características principales:</h3>
+            <ul style="color: #34495e; font-size: 1.1rem;">
+                <li><strong>🎯 Recomendaciones personalizadas</strong> basadas en géneros y calificaciones</li>
+                <li><strong>🔍 Búsqueda avanzada</strong> de películas</li>
+                <li><strong>📊 Análisis de datos</strong> con visualizaciones interactivas</li>
+                <li><strong>🏆 Películas populares</strong> y por género</li>
+                <li><strong>🎨 Interfaz intuitiva</strong> para explorar películas</li>
+            </ul>
+        </div>
+        """, unsafe_allow_html=True)
+
+    with col2:
+        stats = get_dataset_aggregates(movies_df).stats
+        st.markdown("""
+        <div style="background: linear-gradient(135deg, #ff6b6b 0%, #ff8e8e 100%); 
+                    padding: 20px; border-radius: 15px; color: white;">
+            <h3 style="color: white; margin-top: 0;">📊 Estadísticas</h3>
+        </div>
+        """, unsafe_allow_html=True)
+        st.markdown("""
+        <div class="metric-container" style="background-color: #ffffff; padding: 15px; border-radius: 10px; box-shadow: 0 2px 4px rgba(0, 0, 0, 0.1);">
+        """, unsafe_allow_html=True)
+        st.metric("🎬 Películas", f"{stats['total_movies']:,}")
+        st.metric("⭐ Calificaciones", f"{stats['total_ratings']:,}")
+        st.metric("📈 Promedio", f"{stats['mean_rating']:.2f}")
+        st.markdown("</div>", unsafe_allow_html=True)
+
+    # Mostrar algunas películas populares
+    st.markdown("""
+    <div style="background: linear-gradient(135deg, #ff6b6b 0%, #ff8e8e 100%); 
+                padding: 20px; border-radius: 15px; margin: 30px 0;">
+        <h3 style="color: white; margin: 0;">🏆 Películas Más Populares</h3>
+    </div>
+    """, unsafe_allow_html=True)
+
+    popular_movies = get_popular_movies(movies_df, min_ratings=50, limit=10)
+
+    if not popular_movies.empty:
+        show_movie_cards(popular_movies, key='popular_home', detail='votes')
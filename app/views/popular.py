@@ -0,0 +1,47 @@
+"""
+Página de películas populares con filtros de votos y puntuación
+"""
+
+import streamlit as st
+
+from ..utils import get_popular_movies
+from .common import show_movie_cards
+
+
+def render(movies_df):
+    """
+    Dibujar la página
+
+    Args:
+        movies_df (pd.DataFrame): DataFrame compartido de películas (no se modifica)
+    """
+    st.markdown("""
+    <div style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); 
+                padding: 20px; border-radius: 15px; margin-bottom: 30px;">
+        <h2 style="color: white; text-align: center; margin: 0;">🏆 Películas Más Populares</h2>
+    </div>
+    """, unsafe_allow_html=True)
+
+    st.markdown("""
+    <div style="background-color: #ffffff; padding: 15px; border-radius: 10px; box-shadow: 0 2px 4px rgba(0, 0, 0, 0.1); margin-bottom: 20px;">
+        <h4 style="color: #2c3e50; margin: 0 0 15px 0;">⚙️ Configuración de filtros:</h4>
+    """, unsafe_allow_html=True)
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        min_ratings = st.slider("📊 Mínimo de calificaciones:", 1, 1000, 50)
+    with col2:
+        limit = st.slider("🎬 Número de películas:", 5, 50, 20)
+    with col3:
+        score = st.selectbox(
+            "⭐ Ordenar por:",
+            ['avg_rating', 'weighted'],
+            format_func={'avg_rating': "Promedio", 'weighted': "Promedio bayesiano (ponderado por votos)"}.get
+        )
+    st.markdown("</div>", unsafe_allow_html=True)
+
+    popular_movies = get_popular_movies(movies_df, min_ratings=min_ratings, limit=limit, score=score)
+
+    if not popular_movies.empty:
+        show_movie_cards(popular_movies, key='popular', detail='votes')
+    else:
+        st.warning("❌ No se encontraron películas con los criterios especificados.")
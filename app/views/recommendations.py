@@ -0,0 +1,95 @@
+"""
+Página de recomendaciones: buscar una película y mostrar las similares
+"""
+
+import pandas as pd
+import streamlit as st
+
+from ..utils import get_available_engines, get_movie_recommendations, search_movies
+from .common import ENGINE_LABELS, load_similarity_model, show_movie_cards
+
+
+def render(movies_df):
+    """
+    Dibujar la página
+
+    Args:
+        movies_df (pd.DataFrame): DataFrame compartido de películas (no se modifica)
+    """
+    st.markdown("""
+    <div style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); 
+                padding: 20px; border-radius: 15px; margin-bottom: 30px;">
+        <h2 style="color: white; text-align: center; margin: 0;">🎯 Obtener Recomendaciones</h2>
+    </div>
+    """, unsafe_allow_html=True)
+
+    # Búsqueda de película con mejor diseño
+    st.markdown("""
+    <div style="background-color: #ffffff; padding: 15px; border-radius: 10px; box-shadow: 0 2px 4px rgba(0, 0, 0, 0.1); margin-bottom: 20px;">
+        <h4 style="color: #2c3e50; margin: 0 0 10px 0;">🔍 Busca una película para obtener recomendaciones:</h4>
+    """, unsafe_allow_html=True)
+    search_query = st.text_input(
+        "🔍 Busca una película para obtener recomendaciones:",
+        placeholder="Ej: Toy Story, The Matrix, Pulp Fiction..."
+    )
+    engine = st.radio(
+        "⚙️ Motor de recomendación:",
+        get_available_engines(),
+        format_func=ENGINE_LABELS.get,
+        horizontal=True
+    )
+    st.markdown("</div>", unsafe_allow_html=True)
+
+    if search_query:
+        search_results = search_movies(movies_df, search_query, limit=10)
+
+        if not search_results.empty:
+            st.markdown("""
+            <div style="background-color: #e8f5e8; padding: 15px; border-radius: 10px; margin: 20px 0;">
+                <h4 style="color: #27ae60; margin: 0;">✅ Películas encontradas:</h4>
+            </div>
+            """, unsafe_allow_html=True)
+
+            # Crear opciones para el selectbox (el título ya incluye el año)
+            titles_by_id = dict(zip(search_results['movieId'], search_results['title']))
+
+            selected_movie_id = st.selectbox(
+                "🎬 Selecciona una película:",
+                list(titles_by_id),
+                format_func=titles_by_id.get
+            )
+
+            if selected_movie_id is not None:
+                # Mostrar información de la película seleccionada
+                movie_info = search_results[search_results['movieId'] == selected_movie_id].iloc[0]
+
+                st.markdown(f"""
+                <div style="background: linear-gradient(135deg, #ff6b6b 0%, #ff8e8e 100%); 
+                            padding: 20px; border-radius: 15px; margin: 20px 0;">
+                    <h3 style="color: white; margin: 0;">🎬 {movie_info['title']}</h3>
+                    <p style="color: white; margin: 10px 0;">{movie_info['genres']}</p>
+                    <div style="display: flex; gap: 20px;">
+                        <span style="color: white;">📅 {movie_info['year'] if pd.notna(movie_info['year']) else 'N/A'}</span>
+                        <span style="color: white;">⭐ {movie_info['avg_rating']:.1f}</span>
+                    </div>
+                </div>
+                """, unsafe_allow_html=True)
+
+                # Obtener recomendaciones
+                with st.spinner("🔍 Buscando recomendaciones..."):
+                    similarity_matrix = load_similarity_model(engine)
+                    recommendations = get_movie_recommendations(movies_df, int(selected_movie_id), similarity_matrix, 5)
+
+                if not recommendations.empty:
+                    st.markdown("""
+                    <div style="background: linear-gradient(135deg, #27ae60 0%, #2ecc71 100%); 
+                                padding: 20px; border-radius: 15px; margin: 20px 0;">
+                        <h3 style="color: white; margin: 0;">🎬 Películas recomendadas para ti:</h3>
+                    </div>
+                    """, unsafe_allow_html=True)
+
+                    show_movie_cards(recommendations, key='recommendations', detail='year')
+                else:
+                    st.warning("❌ No se encontraron recomendaciones para esta película.")
+        else:
+            st.error("❌ No se encontraron películas con ese nombre.")
@@ -0,0 +1,47 @@
+"""
+Página de búsqueda de películas por título
+"""
+
+import streamlit as st
+
+from ..utils import search_movies
+from .common import show_movie_cards
+
+
+def render(movies_df):
+    """
+    Dibujar la página
+
+    Args:
+        movies_df (pd.DataFrame): DataFrame compartido de películas (no se modifica)
+    """
+    st.markdown("""
+    <div style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); 
+                padding: 20px; border-radius: 15px; margin-bottom: 30px;">
+        <h2 style="color: white; text-align: center; margin: 0;">🔍 Búsqueda de Películas</h2>
+    </div>
+    """, unsafe_allow_html=True)
+
+    st.markdown("""
+    <div style="background-color: #ffffff; padding: 15px; border-radius: 10px; box-shadow: 0 2px 4px rgba(0, 0, 0, 0.1); margin-bottom: 20px;">
+        <h4 style="color: #2c3e50; margin: 0 0 10px 0;">🔍 Busca películas por título:</h4>
+    """, unsafe_allow_html=True)
+    search_query = st.text_input(
+        "🔍 Busca películas por título:",
+        placeholder="Ej: Star Wars, Harry Potter, Batman..."
+    )
+    st.markdown("</div>", unsafe_allow_html=True)
+
+    if search_query:
+        results = search_movies(movies_df, search_query, limit=20)
+
+        if not results.empty:
+            st.markdown(f"""
+            <div style="background-color: #e8f5e8; padding: 15px; border-radius: 10px; margin: 20px 0;">
+                <h4 style="color: #27ae60; margin: 0;">✅ Resultados para '{search_query}':</h4>
+            </div>
+            """, unsafe_allow_html=True)
+
+            show_movie_cards(results, key='search', detail='year')
+        else:
+            st.error("❌ No se encontraron películas con ese nombre.")
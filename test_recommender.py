@@ -6,14 +6,32 @@ Script de prueba para el sistema de recomendación de películas
 import sys
 import os
 
+import pandas as pd
+
 # Agregar el directorio actual al path para importar módulos
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from app.utils import (
-    load_movie_data, create_similarity_matrix, get_movie_recommendations,
+    load_movie_data, create_similarity_matrix, create_neighbor_index, get_movie_recommendations,
     search_movies, get_popular_movies, get_movies_by_genre,
-    calculate_rating_stats, get_genre_distribution
+    calculate_rating_stats, get_genre_distribution,
+    get_similarity_model, dataset_fingerprint, save_model, load_model,
+    get_batch_recommendations, get_available_engines,
+    get_factorization_model, get_personalized_recommendations, get_dataset_aggregates,
+    create_collaborative_index, get_ann_index, get_multi_seed_recommendations, get_user_recommendations,
+    get_user_ratings, get_search_index
 )
+from app import metrics
+from app.batching import neighbor_batcher
+from app.build_index import build_index_parallel, engine_features
+from app.dataset import load_movielens
+from app.features import build_hashed_features
+from app.quantization import neighbor_index_agreement
+from app.synthetic import write_synthetic_dataset
+from app.updates import IncrementalRatings, append_ratings, log_path
+from app.evaluation import evaluate_engines
+from app.utils import RATINGS_PATH
+import tempfile
 
 def test_recommendation_system():
     """Probar el sistema de recomendación"""
@@ -31,13 +49,56 @@ def test_recommendation_system():
     print(f"   • Total de películas: {stats['total_movies']:,}")
     print(f"   • Calificaciones totales: {stats['total_ratings']:,}")
     print(f"   • Calificación promedio: {stats['mean_rating']:.2f}")
-    print(f"   • Películas con calificaciones: {len(movies_df[movies_df.get('rating_count', 0) > 0]):,}")
+    rated_movies = int((movies_df['rating_count'] > 0).sum()) if 'rating_count' in movies_df.columns else 0
+    print(f"   • Películas con calificaciones: {rated_movies:,}")
     
     # Crear matriz de similitud
     print("\n🔍 Creando matriz de similitud...")
     similarity_matrix = create_similarity_matrix(movies_df)
     print("✅ Matriz de similitud creada")
     
+    print("\n🔍 Creando índice de vecinos...")
+    neighbor_index = create_neighbor_index(movies_df, k=20)
+    print(f"✅ Índice de vecinos creado ({neighbor_index.nbytes / 1024:.1f} KB)")
+    
+    # Las características con hashing se pueden ampliar sin reajustar un vocabulario
+    features = build_hashed_features(movies_df.iloc[:5])
+    features.add_movies(movies_df)
+    assert abs(features.matrix() - build_hashed_features(movies_df).matrix()).max() < 1e-6
+    hashed_index = create_neighbor_index(movies_df, k=20, content_features='hashed')
+    print(f"✅ Índice con géneros, etiquetas y títulos ({hashed_index.nbytes / 1024:.1f} KB)")
+    
+    # La construcción en varios procesos (memoria compartida) da el mismo índice
+    with tempfile.TemporaryDirectory() as work_dir:
+        parallel_index = build_index_parallel(engine_features(movies_df), k=20, work_dir=work_dir, n_workers=2, progress=None)
+    assert (parallel_index.indices == hashed_index.indices).all()
+    print(f"✅ Construcción en paralelo: {parallel_index.n_items:,} películas")
+    
+    # Las similitudes cuantizadas ocupan menos y conservan el orden de los vecinos
+    int8_index = hashed_index.quantize('int8')
+    assert int8_index.nbytes < hashed_index.nbytes
+    assert (int8_index.indices == hashed_index.indices).all()
+    agreement = neighbor_index_agreement(hashed_index, 'int8', [([0, 1, 2], [1.0, 1.0, 1.0])], k=10)
+    print(f"✅ Índice int8: {int8_index.nbytes / 1024:.1f} KB, overlap@10 {agreement['overlap']:.2f}")
+    
+    # Probar el artefacto persistente del modelo
+    with tempfile.TemporaryDirectory() as model_dir:
+        model = get_similarity_model(movies_df, k=20, model_dir=model_dir)
+        fingerprint = dataset_fingerprint(movies_df, {'engine': 'content', 'feature_column': 'genres', 'k': 20})
+        model_path = os.path.join(model_dir, "model.npz")
+        save_model(model, model_path, fingerprint)
+        assert load_model(model_path, fingerprint) is not None
+        assert load_model(model_path, "obsoleto") is None
+        
+        # El índice aproximado se guarda, se recarga y sirve recomendaciones
+        ann_index = get_ann_index(movies_df, model_dir=model_dir)
+        save_model(ann_index, model_path, fingerprint)
+        reloaded = load_model(model_path, fingerprint)
+        assert (reloaded.search_items([0, 1], 5)[0] == ann_index.search_items([0, 1], 5)[0]).all()
+        ann_recommendations = get_movie_recommendations(movies_df, int(movies_df['movieId'].iloc[0]), ann_index, 5)
+        print(f"🧭 Índice aproximado: {ann_index.n_lists} listas, {len(ann_recommendations)} recomendaciones")
+    print("✅ Artefacto del modelo guardado y validado")
+    
     # Probar búsqueda
     print("\n🔍 Probando búsqueda de películas...")
     test_searches = ['Toy Story', 'Matrix', 'Star Wars', 'Batman', 'Harry Potter']
@@ -49,6 +110,11 @@ def test_recommendation_system():
         else:
             print(f"   • '{search_term}': No se encontraron resultados")
     
+    # El año también se puede buscar
+    year = str(int(movies_df['year'].dropna().iloc[0]))
+    year_results = search_movies(movies_df, year, limit=3)
+    assert len(year_results) and year_results['title'].str.contains(year).all()
+    
     # Probar recomendaciones
     print("\n🎯 Probando recomendaciones...")
     test_movies = ['Toy Story (1995)', 'The Matrix (1999)', 'Pulp Fiction (1994)']
@@ -65,6 +131,102 @@ def test_recommendation_system():
                 print(f"   • {row['title']}{year_str} - {row['genres']}{rating_str}")
         else:
             print("❌ No se encontraron recomendaciones")
+        
+        index_recommendations = get_movie_recommendations(movies_df, movie, neighbor_index, 3)
+        print(f"   • Índice de vecinos: {len(index_recommendations)} recomendaciones")
+    
+    # Probar el motor de filtrado colaborativo si hay calificaciones
+    if 'collaborative' in get_available_engines():
+        with tempfile.TemporaryDirectory() as model_dir:
+            cf_index = get_similarity_model(movies_df, k=20, model_dir=model_dir, engine='collaborative')
+        cf_recommendations = get_movie_recommendations(movies_df, test_movies[0], cf_index, 3)
+        print(f"\n👥 Filtrado colaborativo para {test_movies[0]}: {len(cf_recommendations)} recomendaciones")
+        
+        # Con una sola semilla coincide con get_movie_recommendations; con varias se suman sus vecinos
+        single = get_multi_seed_recommendations(movies_df, [test_movies[0]], cf_index, 3)
+        assert list(single['movieId']) == list(cf_recommendations['movieId'])
+        seeds = movies_df['movieId'].iloc[:5].tolist()
+        multi = get_multi_seed_recommendations(movies_df, seeds, cf_index, 5)
+        assert not set(multi['movieId']) & set(seeds)
+        user_id = int(get_user_ratings(movies_df).user_ids[0])
+        seen, _ = get_user_ratings(movies_df).ratings(user_id)
+        for_user = get_user_recommendations(movies_df, user_id, cf_index, n_recommendations=5)
+        assert not set(movies_df['movieId'].iloc[seen]) & set(for_user['movieId'])
+        print(f"🧑 Varias semillas: {len(multi)} recomendaciones; usuario {user_id}: {len(for_user)}")
+        
+        # Probar el modelo de factores latentes con un usuario nuevo
+        with tempfile.TemporaryDirectory() as model_dir:
+            als_model = get_factorization_model(movies_df, n_iterations=3, model_dir=model_dir)
+        personalized = get_personalized_recommendations(
+            movies_df, als_model, {test_movies[0]: 5.0, test_movies[1]: 4.5}, 5
+        )
+        print(f"🧠 Recomendaciones personalizadas (ALS): {len(personalized)} películas")
+        
+        # Probar la evaluación offline con división temporal
+        report = evaluate_engines(movies_df, RATINGS_PATH, engines=['popularity'], n_jobs=1)
+        print(f"📏 Evaluación (popularidad): NDCG@10 = {report[0]['ndcg']:.4f} sobre {report[0]['users']} usuarios")
+    
+    # Probar las actualizaciones incrementales sobre un dataset sintético pequeño
+    with tempfile.TemporaryDirectory() as data_dir:
+        write_synthetic_dataset(data_dir, 300, seed=1)
+        cache_dir = os.path.join(data_dir, "cache")
+        live_df = load_movielens(data_dir, cache_dir=cache_dir)
+        updates = IncrementalRatings(
+            live_df, data_dir, track_neighbors=True, k=10, model_dir=None, cache_dir=cache_dir
+        )
+        new_ratings = pd.DataFrame({
+            'userId': [1, 2, 10_000], 'movieId': live_df['movieId'].iloc[:3].to_numpy(), 'rating': [5.0, 4.0, 3.5]
+        })
+        append_ratings(log_path(data_dir), new_ratings)
+        summary = updates.refresh()
+        combined_path = os.path.join(data_dir, "combined.csv")
+        pd.concat([pd.read_csv(os.path.join(data_dir, "ratings.csv")), new_ratings]).to_csv(combined_path, index=False)
+        rebuilt = create_collaborative_index(live_df, combined_path, k=10)
+        assert (rebuilt.indptr == updates.neighbor_index.indptr).all()
+        assert abs(rebuilt.scores - updates.neighbor_index.scores).max() < 1e-5
+        
+        # Volver a calificar una película (del registro o de ratings.csv) sustituye la calificación anterior
+        base = pd.read_csv(os.path.join(data_dir, "ratings.csv")).iloc[0]
+        rerated = pd.DataFrame({
+            'userId': [1, int(base['userId'])], 'movieId': [live_df['movieId'].iloc[0], int(base['movieId'])],
+            'rating': [2.0, 1.0 if base['rating'] != 1.0 else 1.5]
+        })
+        count = live_df['rating_count'].iloc[0]
+        search_index = get_search_index(live_df)
+        append_ratings(log_path(data_dir), rerated)
+        assert updates.refresh()['replaced'] == 2
+        assert updates.rating_matrix[updates._users.get_loc(1), 0] == 2.0
+        assert live_df['rating_count'].iloc[0] == count
+        # El índice de búsqueda no se reconstruye: solo cambia su popularidad
+        assert get_search_index(live_df) is search_index
+        
+        # Sin índice colaborativo no se carga la matriz y el resultado es el mismo
+        light_df = load_movielens(data_dir, cache_dir=cache_dir)
+        light = IncrementalRatings(light_df, data_dir, model_dir=None, cache_dir=cache_dir)
+        assert light.rating_matrix is None and light.refresh()['replaced'] >= 2
+        assert (light_df['rating_count'].to_numpy() == live_df['rating_count'].to_numpy()).all()
+        assert abs(light_df['avg_rating'].to_numpy() - live_df['avg_rating'].to_numpy()).max() < 1e-4
+        assert updates.compact() == 5
+        reloaded = load_movielens(data_dir, cache_dir=cache_dir)
+        assert (reloaded['rating_count'].to_numpy() == live_df['rating_count'].to_numpy()).all()
+        reloaded = load_movielens(data_dir, cache_dir=cache_dir, use_cache=False)
+        assert (reloaded['rating_count'].to_numpy() == live_df['rating_count'].to_numpy()).all()
+        assert abs(reloaded['avg_rating'].to_numpy() - live_df['avg_rating'].to_numpy()).max() < 1e-4
+    print(f"\n🔄 Actualización incremental: {summary['ratings']} calificaciones, "
+          f"{summary['neighbor_rows']} filas de vecinos recalculadas")
+    
+    # Probar recomendaciones en lote para todo el catálogo
+    batch = get_batch_recommendations(movies_df, None, neighbor_index, 3)
+    print(f"\n📦 Recomendaciones en lote: {batch['query'].nunique():,} películas, {len(batch):,} filas")
+    
+    # Probar el micro-batching: mismo resultado que la consulta individual
+    batcher = neighbor_batcher(neighbor_index, window_ms=1, max_batch=8)
+    futures = [batcher.submit((position, 3)) for position in range(min(len(movies_df), 20))]
+    for position, future in enumerate(futures):
+        expected = get_movie_recommendations(movies_df, int(movies_df['movieId'].iloc[position]), neighbor_index, 3)
+        assert list(movies_df['movieId'].iloc[future.result()]) == list(expected['movieId'])
+    batcher.close()
+    print(f"🧺 Micro-batching: {batcher.metrics()['batches']} lotes para {len(futures)} peticiones")
     
     # Probar películas populares
     print("\n🏆 Probando películas populares...")
@@ -83,6 +245,11 @@ def test_recommendation_system():
     for genre, count in top_genres.items():
         print(f"   • {genre}: {count} películas")
     
+    # Probar los agregados de la página de análisis (tamaño acotado)
+    aggregates = get_dataset_aggregates(movies_df, model_dir=None)
+    assert aggregates.year_rating_density.to_numpy().sum() == movies_df['year'].notna().sum()
+    print(f"\n📊 Agregados de análisis: {aggregates.nbytes:,} bytes para {len(movies_df):,} películas")
+    
     # Probar películas por género
     test_genre = "Action"
     genre_movies = get_movies_by_genre(movies_df, test_genre, limit=3)
@@ -93,6 +260,24 @@ def test_recommendation_system():
             rating_str = f" - ⭐ {row['avg_rating']:.1f}" if row['avg_rating'] > 0 else ""
             print(f"   • {row['title']}{year_str}{rating_str}")
     
+    # Probar la instrumentación: latencias por función y exportación a Prometheus
+    metrics.enable()
+    search_movies(movies_df, "matrix", limit=5)
+    get_genre_distribution(movies_df)
+    metrics.enable(False)
+    timed_functions = {row['function'] for row in metrics.latency_summary()}
+    assert {'search_movies', 'get_genre_distribution'} <= timed_functions
+    assert 'function_latency_ms_bucket' in metrics.registry.to_prometheus()
+    print(f"\n⏱️  Métricas registradas para {len(timed_functions)} funciones")
+    
+    # Probar que las dependencias pesadas no se importan al cargar la aplicación
+    import subprocess
+    probe = "import sys, app.utils, app.views.common; print(sorted({'sklearn', 'plotly.express'} & set(sys.modules)))"
+    loaded = subprocess.run([sys.executable, "-c", probe], capture_output=True, text=True,
+                            cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    assert loaded == "[]", loaded
+    print("\n🚀 Arranque sin scikit-learn ni plotly.express")
+    
     print("\n✅ Prueba completada exitosamente!")
     print("🚀 El sistema está listo para usar con el dataset de MovieLens!")
 